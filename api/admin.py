@@ -1,3 +1,26 @@
 # api/admin.py
 from django.contrib import admin
 
+from .impression_utils import UserIdBitset
+from .models import RecommendImpression
+
+
+# 추천 노출 기록 (비트셋은 크기만 표시)
+@admin.register(RecommendImpression)
+class RecommendImpressionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'seen_count', 'skipped_count', 'stored_bytes', 'updated_at']
+    search_fields = ['user__username']
+    exclude = ['seen', 'skipped']
+    readonly_fields = ['user', 'seen_count', 'skipped_count', 'stored_bytes']
+
+    @admin.display(description='본 상대 수')
+    def seen_count(self, obj):
+        return len(UserIdBitset.from_bytes(obj.seen))
+
+    @admin.display(description='건너뛴 상대 수')
+    def skipped_count(self, obj):
+        return len(UserIdBitset.from_bytes(obj.skipped))
+
+    @admin.display(description='저장 크기(바이트)')
+    def stored_bytes(self, obj):
+        return len(obj.seen) + len(obj.skipped)
@@ -0,0 +1,127 @@
+# api/bench_utils.py
+
+import json
+import math
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 가짜 카카오 좌표 (주소 문자열로 정해지므로 같은 주소면 항상 같은 좌표)
+_KOREA_LAT = (33.2, 38.6)
+_KOREA_LON = (126.1, 129.6)
+
+
+def percentile(sorted_values, p):
+    """정렬된 값에서 p(0~100) 백분위 (선형 보간)"""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lower = math.floor(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def summarize(latencies, errors, elapsed):
+    """
+    시나리오 하나의 결과 (시간은 ms)
+    latencies: 요청별 응답 시간(초), errors: 실패한 요청 수, elapsed: 전체 걸린 시간(초)
+    """
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(values) / elapsed, 2) if elapsed else None,
+        "mean_ms": _ms(sum(values) / len(values)) if values else None,
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+        "max_ms": _ms(values[-1]) if values else None,
+    }
+
+
+def compare(previous, current):
+    """
+    이전 결과와 비교 (시나리오별 rps / p95 변화율)
+    Return: [(시나리오, rps 변화율, p95 변화율)], 한쪽에만 있는 시나리오는 제외
+    """
+    rows = []
+    for name, now in current.get("scenarios", {}).items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before or not before.get("rps") or not before.get("p95_ms") or not now.get("rps"):
+            continue
+        rows.append((name, now["rps"] / before["rps"] - 1, now["p95_ms"] / before["p95_ms"] - 1))
+    return rows
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    """카카오 로컬 API / OpenAI chat completions 흉내 (응답 형식만 맞춤)"""
+
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if not self.path.startswith("/v2/local/search/address.json"):
+            return self._reply({"error": "not found"}, 404)
+        # 주소별로 고정된 한국 안 좌표
+        seed = zlib.crc32(self.path.encode())
+        lat = _KOREA_LAT[0] + (seed % 10000) / 10000 * (_KOREA_LAT[1] - _KOREA_LAT[0])
+        lon = _KOREA_LON[0] + (seed // 10000 % 10000) / 10000 * (_KOREA_LON[1] - _KOREA_LON[0])
+        self._reply({"documents": [{"y": f"{lat:.6f}", "x": f"{lon:.6f}"}], "meta": {"total_count": 1}})
+
+    def do_POST(self):
+        if self.latency:
+            time.sleep(self.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            return self._reply({"error": {"message": "not found"}}, 404)
+        self._reply({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "bench"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "함께 있으면 편안한 두 사람이에요. 대화가 잘 통할 것 같아요!"},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+
+@contextmanager
+def fake_external_server(latency=0.0, port=0):
+    """
+    카카오/OpenAI 대신 응답하는 로컬 HTTP 서버 (별도 스레드)
+    latency: 요청마다 기다릴 시간(초, 실제 외부 API 지연 흉내)
+    Yield: 서버 주소 (http://127.0.0.1:포트)
+    """
+    handler = type("FakeHandler", (_FakeHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="bench-fake-external", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,33 @@
+# api/etag_utils.py
+
+import hashlib
+from datetime import date
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+
+def make_etag(request, *parts, daily=False):
+    """
+    응답 버전 값들(수정 시각, 마지막 ID 등)로 만든 ETag
+    - 같은 URL이라도 형식(JSON / Browsable API)이 다르면 다른 ETag가 되도록 Accept 헤더 포함
+    - daily=True: 날짜도 포함 (나이처럼 날짜에 따라 바뀌는 값이 응답에 있을 때)
+    """
+    if daily:
+        parts += (date.today().isoformat(),)
+    raw = "|".join(str(part) for part in (request.META.get("HTTP_ACCEPT", ""), *parts))
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+def conditional_get(etag_func):
+    """
+    APIView.get에 붙이는 조건부 GET 데코레이터
+    If-None-Match가 etag_func 결과와 같으면 뷰(시리얼라이저)를 실행하지 않고 304 반환
+    (인증/권한 검사는 DRF가 먼저 하므로 etag_func 안에서 request.user 사용 가능)
+    캐시는 사용자별로만 하고 매번 서버에 확인하도록 Cache-Control: private, no-cache
+    """
+    def decorator(view_method):
+        view_method = method_decorator(condition(etag_func=etag_func))(view_method)
+        return method_decorator(cache_control(private=True, no_cache=True))(view_method)
+    return decorator
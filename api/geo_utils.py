@@ -3,6 +3,8 @@
 import math, requests
 from django.conf import settings
 
+from . import metrics
+
 
 def get_lat_lon(city, district):
     """
@@ -20,7 +22,8 @@ def get_lat_lon(city, district):
     query = f"{city} {district}"
 
     # 3. 카카오 API URL 및 헤더 설정
-    url = "https://dapi.kakao.com/v2/local/search/address.json"
+    base_url = getattr(settings, 'KAKAO_LOCAL_API_URL', "https://dapi.kakao.com")
+    url = f"{base_url}/v2/local/search/address.json"
     headers = {
         "Authorization": f"KakaoAK {rest_api_key}"
     }
@@ -30,7 +33,8 @@ def get_lat_lon(city, district):
 
     try:
         # 4. 요청 보내기
-        response = requests.get(url, headers=headers, params=params, timeout=5)
+        with metrics.span("kakao", "geocode"):
+            response = requests.get(url, headers=headers, params=params, timeout=5)
 
         if response.status_code == 200:
             result = response.json()
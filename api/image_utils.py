@@ -0,0 +1,180 @@
+# api/image_utils.py
+
+import hashlib
+import io
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import metrics
+
+# 허용하는 업로드 형식 (Pillow가 인식한 실제 형식 기준, 확장자는 믿지 않음)
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF", "MPO"}
+
+# 채팅 이미지 변환본: 이름 -> 긴 변 최대 픽셀
+CHAT_IMAGE_VARIANTS = {
+    "original": 2560,
+    "display": 1280,
+    "thumbnail": 320,
+}
+
+# 프로필 사진 변환본: 전체 화면 / 상세 화면 / 목록 썸네일
+PROFILE_IMAGE_VARIANTS = {
+    "full": 1920,
+    "detail": 1080,
+    "thumbnail": 320,
+}
+
+
+class ImageRejected(ValueError):
+    """이미지로 읽을 수 없거나 제한을 넘는 업로드"""
+
+
+def _encode(image, max_side, quality):
+    """긴 변을 max_side 이하로 줄여 메타데이터 없이 다시 인코딩 -> (bytes, 확장자)"""
+    if max(image.size) > max_side:
+        image = image.copy()
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    # exif/icc/텍스트 청크를 넘기지 않으므로 원본 메타데이터(GPS 등)는 모두 제거됨
+    if image.mode in ("RGBA", "LA"):
+        image.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue(), "png"
+    image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue(), "jpg"
+
+
+def process_image_bytes(data, variants, max_pixels, quality=85):
+    """
+    (작업 프로세스에서 실행) 업로드 바이트를 검증하고 변환본들을 생성
+    variants: 이름 -> 긴 변 최대 픽셀
+    Return: 이름 -> (bytes, 확장자), 실패 시 ImageRejected
+    """
+    # 1. 헤더만 읽어 형식/크기 확인 (디코딩 전에 거름)
+    try:
+        image = Image.open(io.BytesIO(data))
+    except (UnidentifiedImageError, OSError) as e:
+        raise ImageRejected("이미지 파일이 아닙니다.") from e
+    except Image.DecompressionBombError as e:
+        raise ImageRejected("이미지 해상도가 너무 큽니다.") from e
+
+    if image.format not in ALLOWED_FORMATS:
+        raise ImageRejected(f"지원하지 않는 이미지 형식입니다: {image.format}")
+    width, height = image.size
+    if width * height > max_pixels:
+        raise ImageRejected("이미지 해상도가 너무 큽니다.")
+
+    # 2. 디코딩 + EXIF 회전 정보 반영 (회전 정보를 지우기 전에 실제 픽셀에 적용)
+    try:
+        image.load()
+        image = ImageOps.exif_transpose(image)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageRejected("손상된 이미지입니다.") from e
+
+    # 3. 색 공간 정리 (투명도가 있으면 RGBA, 아니면 RGB)
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    # 4. 변환본 생성
+    return {name: _encode(image, max_side, quality) for name, max_side in variants.items()}
+
+
+_pool = None
+_pool_lock = Lock()
+
+
+def get_pool():
+    """이미지 처리용 프로세스 풀 (처음 사용할 때 생성, 워커 프로세스마다 하나)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = getattr(settings, "IMAGE_PROCESS_WORKERS", None) or min(4, os.cpu_count() or 1)
+            # fork 대신 spawn: 서버 프로세스의 스레드/DB 연결 상태를 복제하지 않음
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool():
+    """작업 프로세스가 비정상 종료돼 풀이 깨졌을 때 다음 요청에서 새로 만들도록 버림"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def read_upload(uploaded_file):
+    """업로드 파일 용량 확인 후 바이트로 읽음"""
+    max_bytes = getattr(settings, "IMAGE_MAX_UPLOAD_BYTES", 10 * 1024 * 1024)
+    if uploaded_file.size > max_bytes:
+        raise ImageRejected(f"이미지 용량은 {max_bytes // (1024 * 1024)}MB 이하여야 합니다.")
+    return uploaded_file.read()
+
+
+def content_hash(data):
+    """이미지 원본 바이트의 sha256 (같은 사진이면 같은 값)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def process_many(datas, variants):
+    """
+    여러 이미지를 프로세스 풀에 한꺼번에 넣고 결과를 입력 순서대로 반환
+    Return: [이름 -> (bytes, 확장자), ...]
+    """
+    max_pixels = getattr(settings, "IMAGE_MAX_PIXELS", 40_000_000)
+    timeout = getattr(settings, "IMAGE_PROCESS_TIMEOUT", 30)
+
+    futures = []
+    try:
+        pool = get_pool()
+        with metrics.span("image_pool", "process"):
+            futures = [pool.submit(process_image_bytes, data, variants, max_pixels) for data in datas]
+            return [future.result(timeout=timeout) for future in futures]
+    except BrokenProcessPool:
+        _reset_pool()
+        raise
+    except (FutureTimeoutError, ImageRejected):
+        for future in futures:
+            future.cancel()
+        raise
+
+
+def process_upload(uploaded_file, variants=CHAT_IMAGE_VARIANTS):
+    """
+    업로드 파일을 프로세스 풀에서 처리하고 변환본을 ContentFile로 반환
+    Return: 이름 -> ContentFile (파일명은 변환본마다 같은 무작위 이름 + 접미사)
+    """
+    # 요청 스레드는 CPU 작업 없이 결과만 기다림
+    results = process_many([read_upload(uploaded_file)], variants)[0]
+
+    base_name = uuid.uuid4().hex
+    return {
+        name: ContentFile(content, name=f"{base_name}_{name}.{ext}")
+        for name, (content, ext) in results.items()
+    }
+
+
+def store_content_addressed(results, digest, prefix):
+    """
+    변환본을 내용 해시 기반 경로(prefix/ab/abcd..._이름.확장자)에 저장
+    같은 해시의 파일이 이미 있으면 다시 쓰지 않음 (여러 레코드가 같은 파일을 공유)
+    공유 파일은 쓰던 레코드가 모두 삭제될 때 지움 (profiles.image_files, 남은 파일은 sweep_profile_images 명령)
+    Return: 이름 -> 저장소 상대 경로
+    """
+    names = {}
+    for name, (content, ext) in results.items():
+        path = f"{prefix}/{digest[:2]}/{digest}_{name}.{ext}"
+        if not default_storage.exists(path):
+            path = default_storage.save(path, ContentFile(content))
+        names[name] = path
+    return names
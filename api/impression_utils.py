@@ -0,0 +1,57 @@
+# api/impression_utils.py
+
+import zlib
+
+import numpy as np
+
+
+class UserIdBitset:
+    """
+    유저 ID 집합을 비트 배열로 보관 (ID n번 비트가 1이면 포함)
+    - 저장할 때는 비트를 8개씩 묶은 뒤 zlib 압축 (ID 10만 개 범위에서 원본 12.5KB, 대부분 비어 있어 압축 후 수백 바이트~수 KB)
+    - mask(ids): 후보 ID 배열 전체를 한 번에 검사 (numpy 인덱싱)
+    """
+
+    def __init__(self, bits=None):
+        self.bits = np.zeros(0, dtype=bool) if bits is None else bits
+
+    @classmethod
+    def from_bytes(cls, blob):
+        if not blob:
+            return cls()
+        packed = np.frombuffer(zlib.decompress(bytes(blob)), dtype=np.uint8)
+        return cls(np.unpackbits(packed, bitorder='little').astype(bool))
+
+    def to_bytes(self):
+        # 마지막 1 비트 뒤쪽은 잘라서 저장
+        used = np.flatnonzero(self.bits)
+        if used.size == 0:
+            return b''
+        packed = np.packbits(self.bits[: used[-1] + 1], bitorder='little')
+        return zlib.compress(packed.tobytes(), 9)
+
+    def add(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        if ids.size == 0:
+            return
+        size = int(ids.max()) + 1
+        if size > self.bits.size:
+            # 자주 늘어나지 않도록 8비트 단위로 여유 있게 확장
+            grown = np.zeros((max(size, self.bits.size * 2) + 7) & ~7, dtype=bool)
+            grown[: self.bits.size] = self.bits
+            self.bits = grown
+        self.bits[ids] = True
+
+    def mask(self, ids):
+        """ids 배열과 같은 길이의 bool 배열 (각 ID가 집합에 있는지)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        inside = ids < self.bits.size
+        result = np.zeros(ids.shape, dtype=bool)
+        result[inside] = self.bits[ids[inside]]
+        return result
+
+    def __contains__(self, user_id):
+        return 0 <= user_id < self.bits.size and bool(self.bits[user_id])
+
+    def __len__(self):
+        return int(np.count_nonzero(self.bits))
@@ -0,0 +1,130 @@
+# api/invalidation_utils.py
+
+import asyncio
+import os
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import DEFAULT_CHANNEL_LAYER, channel_layers, get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+# 프로세스 내 캐시(차단 관계, 인증 유저 등)의 무효화를 모든 워커에 알리는 채널 레이어 그룹
+# - 각 워커는 백그라운드 스레드에서 이 그룹을 구독하고, 알림을 받으면 자기 캐시를 지움
+# - 구독이 확인되기 전(또는 끊긴 뒤)에는 캐시를 쓰지 않고 DB를 직접 조회 (can_cache)
+GROUP = "cache_invalidation"
+# 그룹 가입 갱신 간격(초). 채널 레이어의 group_expiry보다 짧아야 함
+RENEW_INTERVAL = getattr(settings, 'CACHE_INVALIDATION_RENEW_INTERVAL', 3600)
+# 구독이 끊긴 뒤 다시 시도하기까지 기다리는 시간(초)
+RETRY_INTERVAL = 30
+
+# 이름 -> (알림 처리 함수(payload), 캐시 전체 비우기 함수)
+_handlers = {}
+_lock = threading.Lock()
+_ready = threading.Event()
+_listener_pid = None
+_failed_at = 0.0
+
+
+def enabled():
+    """
+    False면 알림을 쓰지 않음 (단일 프로세스 배포 등). 이때 다른 워커의 변경은 각 캐시의 TTL 안에 반영됨
+    """
+    return getattr(settings, 'CACHE_INVALIDATION_BROADCAST', True)
+
+
+def register(name, handler, reset):
+    """
+    캐시 등록
+    handler: 다른 워커에서 온 알림의 payload를 받아 해당 항목을 지우는 함수
+    reset: 구독이 끊겼을 때 캐시 전체를 비우는 함수 (그 사이의 알림을 놓쳤을 수 있으므로)
+    """
+    _handlers[name] = (handler, reset)
+
+
+def can_cache():
+    """
+    지금 프로세스 내 캐시를 써도 되는지 (다른 워커의 무효화 알림을 받고 있거나, 알림을 끈 설정)
+    처음 호출될 때 구독 스레드를 시작함
+    """
+    if not enabled():
+        return True
+    _ensure_listener()
+    return _ready.is_set()
+
+
+def publish(name, payload):
+    """커밋된 뒤 모든 워커(이 프로세스 포함)에 무효화 알림. 이 프로세스의 캐시는 호출한 쪽에서 바로 지워야 함"""
+    if enabled():
+        transaction.on_commit(lambda: _send(name, payload))
+
+
+def _send(name, payload):
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            GROUP, {"type": "cache.invalidate", "name": name, "payload": payload}
+        )
+    except Exception as e:
+        print(f"[캐시 무효화] {name} 알림 전송 실패: {e}")
+
+
+def dispatch(event):
+    """받은 알림을 등록된 캐시에 전달"""
+    entry = _handlers.get(event.get("name"))
+    if entry is not None:
+        entry[0](event.get("payload"))
+
+
+def _reset_all():
+    for _, reset in list(_handlers.values()):
+        reset()
+
+
+def _ensure_listener():
+    global _listener_pid
+    with _lock:
+        # fork된 워커는 부모의 스레드를 물려받지 않으므로 프로세스마다 새로 시작
+        if _listener_pid == os.getpid() or time.monotonic() - _failed_at < RETRY_INTERVAL:
+            return
+        _listener_pid = os.getpid()
+        _ready.clear()
+    threading.Thread(target=_run, name="cache-invalidation", daemon=True).start()
+
+
+def _run():
+    global _listener_pid, _failed_at
+    try:
+        asyncio.run(listen(channel_layers.make_backend(DEFAULT_CHANNEL_LAYER), _ready))
+    except Exception as e:
+        print(f"[캐시 무효화] 구독 중단: {e}")
+    finally:
+        _ready.clear()
+        _reset_all()
+        with _lock:
+            _listener_pid = None
+            _failed_at = time.monotonic()
+
+
+async def listen(layer, ready):
+    """layer의 무효화 그룹을 구독하며 알림을 처리 (ready: 가입을 마치면 set)"""
+    channel = await layer.new_channel()
+    await layer.group_add(GROUP, channel)
+    renewed = time.monotonic()
+    ready.set()
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(layer.receive(channel), RENEW_INTERVAL)
+            except asyncio.TimeoutError:
+                event = None
+            if event is not None:
+                dispatch(event)
+            if time.monotonic() - renewed > RENEW_INTERVAL:
+                await layer.group_add(GROUP, channel)
+                renewed = time.monotonic()
+    finally:
+        ready.clear()
+        close = getattr(layer, "close", None)
+        if close is not None:
+            await close()
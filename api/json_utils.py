@@ -0,0 +1,107 @@
+# api/json_utils.py
+
+import json
+import math
+import re
+
+import ujson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# ujson이 직접 처리하지 못하는 값(datetime, UUID, 지연 번역 문자열 등)은 DRF 인코더 규칙을 그대로 따름
+_encoder = JSONEncoder()
+
+# 지수가 세 자리 이상이거나 자릿수가 매우 긴 수 (float로 바꾸면 inf가 될 수 있음, 예: 1e400)
+_HUGE_NUMBER_RE = re.compile(r"[eE][+-]?\d{3}|\d{309}")
+# 한 자리 음수 지수 (ujson은 1e-7, 표준 json 모듈/DRF는 1e-07로 씀)
+_SHORT_EXPONENT_RE = re.compile(r"\de-\d(?!\d)")
+
+
+def _reject_constant(value):
+    raise ValueError(f"{value} is not valid JSON")
+
+
+def _parse_float(text):
+    value = float(text)
+    if not math.isfinite(value):
+        raise ValueError(f"{text} is out of range")
+    return value
+
+
+def _needs_strict_parser(text):
+    """NaN/Infinity나 범위를 넘는 수가 들어 있을 수 있는 입력 (ujson.loads는 inf/nan으로 그대로 받아들임)"""
+    return "NaN" in text or "Infinity" in text or _HUGE_NUMBER_RE.search(text) is not None
+
+
+def dumps(obj):
+    """
+    ujson으로 JSON 문자열 생성 (웹소켓 프레임 등)
+    - 한글은 그대로, '/'는 이스케이프하지 않음 (표준 json 모듈과 같은 결과)
+    - 64비트를 넘는 정수 등 ujson이 거부하는 값은 표준 json 모듈로 처리
+    """
+    try:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, default=_encoder.default)
+    except (OverflowError, TypeError):
+        return json.dumps(obj, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(text):
+    """JSON 문자열 파싱 (NaN/Infinity와 inf가 되는 수는 거부). 잘못된 입력이면 ValueError"""
+    if _needs_strict_parser(text):
+        # 문자열 안의 단어일 수도 있으므로 표준 파서로 정확히 판단
+        return json.loads(text, parse_constant=_reject_constant, parse_float=_parse_float)
+    return ujson.loads(text)
+
+
+class UJSONRenderer(JSONRenderer):
+    """
+    ujson 기반 JSON 렌더러 (DRF 기본 JSONRenderer와 같은 출력)
+    - 들여쓰기가 필요한 경우(브라우저블 API, Accept: application/json; indent=4)나
+      ujson이 처리하지 못하는 값이 있으면 기본 렌더러 사용
+    - ujson은 한 자리 음수 지수를 1e-7처럼 써서 DRF(1e-07)와 다르므로, 그런 수가 보이면 기본 렌더러 사용
+      (문자열 안의 같은 글자도 걸리지만 기본 렌더러로 같은 결과를 낼 뿐임)
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = ujson.dumps(
+                data,
+                ensure_ascii=False,
+                escape_forward_slashes=False,
+                allow_nan=not self.strict,
+                default=_encoder.default,
+            )
+        except (OverflowError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+        if _SHORT_EXPONENT_RE.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        # ujson은 U+2028/U+2029를 그대로 내보내므로 기본 렌더러처럼 이스케이프 (JS 안에 넣어도 안전하도록)
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
+
+
+class UJSONParser(JSONParser):
+    """ujson 기반 JSON 파서 (DRF 기본 JSONParser와 같은 에러 처리, strict면 inf/nan이 되는 값도 거부)"""
+    renderer_class = UJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            text = stream.read().decode(encoding)
+            if self.strict:
+                return loads(text)
+            return ujson.loads(text)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
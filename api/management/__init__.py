@@ -0,0 +1 @@
+# api/management/__init__.py
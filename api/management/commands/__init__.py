@@ -0,0 +1 @@
+# api/management/commands/__init__.py
@@ -0,0 +1,102 @@
+# api/management/commands/bench_image_pool.py
+
+import io
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from api.image_utils import CHAT_IMAGE_VARIANTS, process_image_bytes
+
+MAX_PIXELS = 40_000_000
+
+
+def make_photo(width, height, seed):
+    """사진과 비슷한 테스트 이미지(그라데이션 + 노이즈, EXIF 회전/GPS 정보 포함) JPEG 바이트 생성"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    noise = rng.normal(0, 25, size=(height, width, 3)).astype(np.float32)
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: 90도 회전
+    exif[0x010F] = "BenchCamera"  # Make
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=92, exif=exif)
+    return buffer.getvalue()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_inline(images):
+    latencies = []
+    started = time.perf_counter()
+    for data in images:
+        t0 = time.perf_counter()
+        process_image_bytes(data, CHAT_IMAGE_VARIANTS, MAX_PIXELS)
+        latencies.append(time.perf_counter() - t0)
+    return time.perf_counter() - started, latencies
+
+
+def run_pool(images, workers):
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        # 프로세스 기동 비용은 측정에서 제외
+        list(pool.map(abs, range(workers)))
+
+        started = time.perf_counter()
+        submitted = {}
+        for data in images:
+            submitted[pool.submit(process_image_bytes, data, CHAT_IMAGE_VARIANTS, MAX_PIXELS)] = time.perf_counter()
+        latencies = []
+        for future in as_completed(submitted):
+            future.result()
+            latencies.append(time.perf_counter() - submitted[future])
+        return time.perf_counter() - started, latencies
+
+
+class Command(BaseCommand):
+    help = "채팅 이미지 처리(검증/재인코딩/썸네일) 처리량 벤치마크: 같은 프로세스 vs 프로세스 풀"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--images", type=int, default=24, help="처리할 이미지 수")
+        parser.add_argument("--width", type=int, default=4032)
+        parser.add_argument("--height", type=int, default=3024)
+        parser.add_argument("--workers", default="1,2,4", help="프로세스 풀 크기 목록 (쉼표 구분)")
+
+    def handle(self, *args, **options):
+        count = options["images"]
+        worker_counts = [int(w) for w in options["workers"].split(",") if w.strip()]
+
+        self.stdout.write(f"generating {count} test photos ({options['width']}x{options['height']}) ...")
+        images = [make_photo(options["width"], options["height"], seed) for seed in range(count)]
+
+        sample = process_image_bytes(images[0], CHAT_IMAGE_VARIANTS, MAX_PIXELS)
+        sizes = ", ".join(f"{name} {len(content) / 1024:.0f}KB" for name, (content, _) in sample.items())
+        self.stdout.write(f"input {statistics.mean(len(d) for d in images) / 1024:.0f}KB -> {sizes}\n")
+
+        rows = [("inline", *run_inline(images))]
+        for workers in worker_counts:
+            rows.append((f"pool x{workers}", *run_pool(images, workers)))
+
+        header = f"{'mode':<12}{'images/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, elapsed, latencies in rows:
+            ms = [lat * 1000 for lat in latencies]
+            self.stdout.write(
+                f"{name:<12}{count / elapsed:>10.2f}{percentile(ms, 50):>10.0f}"
+                f"{percentile(ms, 95):>10.0f}{max(ms):>10.0f}"
+            )
@@ -0,0 +1,161 @@
+# api/management/commands/bench_json.py
+
+import io
+import json
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.json_utils import UJSONParser, UJSONRenderer, dumps
+from chat.models import Message
+from chat.serializers import MessageSerializer
+
+HOBBIES = ["등산", "독서", "영화", "요리", "여행", "러닝", "사진", "게임", "카페", "음악"]
+CITIES = [("서울", "강남구"), ("서울", "마포구"), ("부산", "해운대구"), ("대구", "수성구"), ("인천", "연수구")]
+
+
+def recommend_payload(rows, rng):
+    """추천 목록 응답과 같은 형태"""
+    return [
+        {
+            "user_id": i,
+            "nickname": f"사용자{i}",
+            "gender": rng.choice(["남성", "여성"]),
+            "age": rng.randint(20, 40),
+            "mbti": rng.choice(["INTJ", "ENFP", "ISTP", "ESFJ"]),
+            "job": "개발자",
+            "location": " ".join(rng.choice(CITIES)),
+            "total_score": round(rng.uniform(40, 95), 1),
+            "scores": {"saju": rng.randint(0, 100), "interest": rng.randint(0, 100), "distance": rng.randint(0, 100)},
+            "info": {
+                "distance_km": f"{rng.uniform(0, 300):.1f}km",
+                "common_hobbies": rng.sample(HOBBIES, 3),
+            },
+            "profile_image": f"/media/profile_images/{i:08x}_thumbnail.jpg",
+        }
+        for i in range(rows)
+    ]
+
+
+def room_list_payload(rows, rng):
+    """채팅방 목록 응답과 같은 형태 (datetime, Decimal, 지연 번역 문자열 포함)"""
+    now = timezone.now()
+    return [
+        {
+            "room_id": i,
+            "other_user_id": i + 1000,
+            "other_nickname": f"상대{i}",
+            "other_image": f"/media/profile_images/{i:08x}_thumbnail.jpg",
+            "last_message": "오늘 저녁에 시간 괜찮으세요? 근처 카페에서 봬요 :)",
+            "last_timestamp": now - timedelta(minutes=rng.randint(0, 100000)),
+            "unread_count": rng.randint(0, 30),
+            "last_read_message_id": rng.randint(1, 10 ** 6),
+            "score": Decimal(f"{rng.uniform(0, 100):.2f}"),
+            "status": gettext_lazy("대화 중"),
+        }
+        for i in range(rows)
+    ]
+
+
+def history_payload(rows, rng):
+    """과거 메시지 응답 (MessageSerializer 출력 그대로)"""
+    now = timezone.now()
+    messages = [
+        Message(
+            id=i,
+            room_id=1,
+            sender_id=rng.choice([1, 2]),
+            content=rng.choice(["안녕하세요!", "네 좋아요 ㅎㅎ", "주말에 뭐 하세요?", "사진 보내드릴게요"]) * rng.randint(1, 4),
+            timestamp=now - timedelta(seconds=(rows - i) * 30),
+        )
+        for i in range(rows)
+    ]
+    return MessageSerializer(messages, many=True).data
+
+
+def frame_payloads(rows, rng):
+    """웹소켓 메시지 프레임"""
+    return [
+        {
+            "type": "chat_message",
+            "message_id": i,
+            "message": "네 좋아요 ㅎㅎ 그럼 7시에 봬요",
+            "sender": 1,
+            "sender_name": "user1",
+            "image": None,
+            "image_thumbnail": None,
+            "image_display": None,
+            "timestamp": str(timezone.now()),
+        }
+        for i in range(rows)
+    ]
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+class Command(BaseCommand):
+    help = "JSON 렌더링/파싱 벤치마크: DRF 기본(json) vs ujson (추천/채팅방 목록/과거 메시지 응답, 웹소켓 프레임)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200, help="응답 하나에 담을 항목 수")
+        parser.add_argument("--iterations", type=int, default=200, help="측정 한 번에 반복할 횟수")
+        parser.add_argument("--repeat", type=int, default=5, help="측정 횟수 (가장 빠른 값 사용)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        rows = options["rows"]
+        iterations = options["iterations"]
+        repeat = options["repeat"]
+
+        payloads = [
+            ("recommend", recommend_payload(rows, rng)),
+            ("room list", room_list_payload(rows, rng)),
+            ("history", history_payload(rows, rng)),
+        ]
+        std_renderer, fast_renderer = JSONRenderer(), UJSONRenderer()
+        std_parser, fast_parser = JSONParser(), UJSONParser()
+
+        header = f"{'payload':<14}{'size KB':>9}{'render json':>13}{'render ujson':>14}{'parse json':>12}{'parse ujson':>13}{'saved':>8}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for name, data in payloads:
+            expected = std_renderer.render(data)
+            rendered = fast_renderer.render(data)
+            if json.loads(rendered) != json.loads(expected):
+                self.stderr.write(self.style.ERROR(f"{name}: ujson 출력이 기본 렌더러와 다릅니다"))
+
+            render_std = best_of(lambda: [std_renderer.render(data) for _ in range(iterations)], repeat)
+            render_fast = best_of(lambda: [fast_renderer.render(data) for _ in range(iterations)], repeat)
+            parse_std = best_of(lambda: [std_parser.parse(io.BytesIO(expected)) for _ in range(iterations)], repeat)
+            parse_fast = best_of(lambda: [fast_parser.parse(io.BytesIO(expected)) for _ in range(iterations)], repeat)
+
+            # 요청 하나당 시간(ms)
+            per = 1000 / iterations
+            saved = 1 - (render_fast + parse_fast) / (render_std + parse_std)
+            self.stdout.write(
+                f"{name:<14}{len(expected) / 1024:>9.1f}{render_std * per:>13.3f}{render_fast * per:>14.3f}"
+                f"{parse_std * per:>12.3f}{parse_fast * per:>13.3f}{saved:>8.0%}"
+            )
+
+        frames = frame_payloads(rows, rng)
+        frame_std = best_of(lambda: [json.dumps(frame) for frame in frames], repeat)
+        frame_fast = best_of(lambda: [dumps(frame) for frame in frames], repeat)
+        self.stdout.write(
+            f"\nwebsocket frame dumps: json {frame_std / rows * 1e6:.2f}us, "
+            f"ujson {frame_fast / rows * 1e6:.2f}us ({1 - frame_fast / frame_std:.0%} saved)"
+        )
@@ -0,0 +1,350 @@
+# api/management/commands/bench_load.py
+
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager, redirect_stdout
+from unittest import mock
+
+import django
+import httpx
+import openai
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import get_resolver
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api import bench_utils
+from chat import throttling
+from chat.models import ChatRoom
+
+User = get_user_model()
+
+# 지역 변경 시나리오에서 번갈아 쓰는 주소 (카카오 가짜 서버로 좌표 변환)
+LOCATIONS = [("서울", "강남구"), ("부산", "해운대구"), ("대전", "유성구")]
+
+
+class VirtualUser:
+    """가상 유저 하나 (JWT + 대화 상대)"""
+
+    __slots__ = ("user_id", "username", "password", "target_id", "token", "refresh", "headers")
+
+    def __init__(self, user, password, target_id):
+        refresh = RefreshToken.for_user(user)
+        self.user_id = user.id
+        self.username = user.username
+        self.password = password
+        self.target_id = target_id
+        self.token = str(refresh.access_token)
+        self.refresh = str(refresh)
+        self.headers = {"Authorization": f"Bearer {self.token}"}
+
+
+# 가상 유저 비밀번호 기본값 (seed_synthetic_data가 모든 유저에게 넣는 값)
+DEFAULT_PASSWORD = "synthetic"
+
+# 시나리오 이름 -> (vu, 순번) -> (method, path, JSON 본문)
+HTTP_SCENARIOS = {
+    # 비밀번호 확인 + 토큰 발급 + last_login 갱신
+    "login": lambda vu, seq: ("POST", "/api/users/login/", {"username": vu.username, "password": vu.password}),
+    "token_refresh": lambda vu, seq: ("POST", "/api/users/token/refresh/", {"refresh": vu.refresh}),
+    # 순위 스냅샷이 있으면 스냅샷에서 응답 (첫 요청만 전체 점수 계산)
+    "recommend": lambda vu, seq: ("GET", "/api/match/recommend/", None),
+    # 매번 스냅샷을 버리고 전체 점수 계산
+    "recommend_refresh": lambda vu, seq: ("GET", "/api/match/recommend/?refresh=1", None),
+    # 나이 범위 조건 (gender, birth_date 인덱스 범위 검색)
+    "recommend_age": lambda vu, seq: ("GET", "/api/match/recommend/?min_age=25&max_age=32", None),
+    "profile": lambda vu, seq: ("GET", f"/api/users/{vu.target_id}/", None),
+    "room_list": lambda vu, seq: ("GET", "/chat/api/rooms/", None),
+    "history": lambda vu, seq: ("GET", f"/chat/api/history-messages/{vu.target_id}/", None),
+    "send": lambda vu, seq: ("POST", f"/chat/api/send-messages/{vu.target_id}/", {"message": f"bench {seq}"}),
+    # 같은 상대에게 보내기/취소가 번갈아 일어남
+    "like_toggle": lambda vu, seq: ("POST", f"/api/interaction/like/{vu.target_id}/", None),
+    # 카카오 좌표 변환을 거치는 프로필 수정
+    "profile_update": lambda vu, seq: (
+        "PATCH", "/api/users/profile/",
+        dict(zip(("location_city", "location_district"), LOCATIONS[seq % len(LOCATIONS)])),
+    ),
+    # OpenAI 호출을 거치는 매칭 한 줄 평
+    "match_summary": lambda vu, seq: ("POST", f"/api/users/match-summary/{vu.target_id}/", None),
+}
+WS_SCENARIOS = ["ws_fanout"]
+ALL_SCENARIOS = list(HTTP_SCENARIOS) + WS_SCENARIOS
+
+
+def load_virtual_users(count, password=DEFAULT_PASSWORD):
+    """
+    프로필이 있는 두 사람이 참여한 채팅방에서 가상 유저를 뽑음 (둘이 서로의 대화 상대)
+    Return: [a, b, a, b, ...] (짝수 번째와 그다음이 같은 방)
+    """
+    Participant = ChatRoom.participants.through
+    rows = (
+        Participant.objects.filter(user__profile__isnull=False)
+        .order_by("chatroom_id", "user_id")
+        .values_list("chatroom_id", "user_id")
+    )
+    pairs = []
+    for _, members in itertools.groupby(rows.iterator(), key=lambda row: row[0]):
+        members = [user_id for _, user_id in members]
+        if len(members) == 2:
+            pairs.append(members)
+            if len(pairs) * 2 >= count:
+                break
+
+    users = User.objects.in_bulk([user_id for pair in pairs for user_id in pair])
+    vus = []
+    for a, b in pairs:
+        vus.append(VirtualUser(users[a], password, b))
+        vus.append(VirtualUser(users[b], password, a))
+    return vus
+
+
+@contextmanager
+def fake_openai(base_url):
+    """OpenAI 클라이언트가 가짜 서버로 요청하도록 (뷰 모듈이 import 시 넣는 키를 덮어쓰므로 URLconf를 먼저 불러옴)"""
+    get_resolver().url_patterns
+    saved = (openai.api_key, openai.base_url, openai.max_retries)
+    openai.api_key, openai.base_url, openai.max_retries = "bench-fake", f"{base_url}/v1/", 0
+    try:
+        yield
+    finally:
+        openai.api_key, openai.base_url, openai.max_retries = saved
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+async def run_http(client, build, vus, total, concurrency):
+    """동시에 concurrency개씩 total번 요청 (가상 유저를 돌아가며 사용)"""
+    latencies, statuses = [], Counter()
+    counter = itertools.count()
+
+    async def worker():
+        while True:
+            seq = next(counter)
+            if seq >= total:
+                return
+            vu = vus[seq % len(vus)]
+            method, path, body = build(vu, seq)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers=vu.headers)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {**bench_utils.summarize(latencies, errors, elapsed), "statuses": dict(statuses)}
+
+
+async def receive_message(communicator, text, timeout):
+    """text 메시지 프레임이 올 때까지 받음 (읽음 표시 등 다른 프레임은 건너뜀)"""
+    while True:
+        frame = json.loads(await communicator.receive_from(timeout))
+        if frame.get("message") == text:
+            return
+
+
+async def run_ws_fanout(application, vus, total, concurrency, timeout):
+    """
+    방 concurrency개에 두 사람씩 연결하고, 한쪽이 보낸 메시지가 상대 연결에 도착할 때까지의 시간 측정
+    Return: (연결 결과, 전달 결과)
+    """
+    pairs = list(zip(vus[0::2], vus[1::2]))[:concurrency]
+    connect_latencies, connect_errors = [], 0
+    sockets = []
+    started = time.perf_counter()
+    for a, b in pairs:
+        pair = []
+        for vu in (a, b):
+            communicator = WebsocketCommunicator(application, f"/ws/chat/{vu.target_id}/?token={vu.token}")
+            connect_started = time.perf_counter()
+            connected, _ = await communicator.connect(timeout)
+            connect_latencies.append(time.perf_counter() - connect_started)
+            if not connected:
+                connect_errors += 1
+            pair.append(communicator)
+        sockets.append(pair)
+    connect_result = bench_utils.summarize(connect_latencies, connect_errors, time.perf_counter() - started)
+    if connect_errors:
+        for pair in sockets:
+            for communicator in pair:
+                await communicator.disconnect()
+        return connect_result, None
+
+    latencies, errors = [], 0
+    counter = itertools.count()
+
+    async def worker(sender, receiver):
+        nonlocal errors
+        while True:
+            seq = next(counter)
+            if seq >= total:
+                return
+            text = f"bench ws {seq}"
+            sent = time.perf_counter()
+            await sender.send_to(text_data=json.dumps({"message": text}))
+            try:
+                await receive_message(receiver, text, timeout)
+                latencies.append(time.perf_counter() - sent)
+                # 보낸 쪽에도 같은 메시지가 오므로 비워 둠
+                await receive_message(sender, text, timeout)
+            except asyncio.TimeoutError:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(sender, receiver) for sender, receiver in sockets))
+    fanout_result = bench_utils.summarize(latencies, errors, time.perf_counter() - started)
+
+    for pair in sockets:
+        for communicator in pair:
+            await communicator.disconnect()
+    return connect_result, fanout_result
+
+
+class Command(BaseCommand):
+    help = (
+        "REST/웹소켓 부하 테스트: 가상 유저(JWT)가 동시에 요청을 보내고 시나리오별 p50/p95/p99 지연과 초당 요청 수를 측정. "
+        "카카오/OpenAI는 로컬 가짜 서버가 응답. 메시지/관심/프로필을 실제로 쓰므로 seed_synthetic_data로 만든 DB에서 실행"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenarios", default=",".join(ALL_SCENARIOS), help=f"쉼표로 구분 (기본: 전부 = {','.join(ALL_SCENARIOS)})"
+        )
+        parser.add_argument("--users", type=int, default=20, help="가상 유저 수")
+        parser.add_argument("--concurrency", type=int, default=10, help="동시에 진행 중인 요청 수 (웹소켓은 방 수)")
+        parser.add_argument("--requests", type=int, default=200, help="시나리오당 측정 요청 수")
+        parser.add_argument("--warmup", type=int, default=10, help="시나리오마다 측정 전에 버릴 요청 수")
+        parser.add_argument("--fake-latency", type=float, default=0.0, help="가짜 카카오/OpenAI 응답 지연(ms)")
+        parser.add_argument("--ws-timeout", type=float, default=5.0, help="웹소켓 연결/수신 제한 시간(초)")
+        parser.add_argument(
+            "--base-url", default=None,
+            help="이미 떠 있는 서버(예: http://127.0.0.1:8000)로 HTTP 요청. 없으면 같은 프로세스에서 ASGI 앱 실행 (웹소켓은 이 경우만)",
+        )
+        parser.add_argument("--password", default=DEFAULT_PASSWORD, help="login 시나리오에서 쓸 가상 유저 비밀번호")
+        parser.add_argument("--keep-rate-limits", action="store_true", help="채팅 전송 속도 제한을 그대로 둠 (기본은 측정 중 해제)")
+        parser.add_argument("--output", default=None, help="결과 JSON 파일 경로 ('-'면 표 대신 JSON만 출력)")
+        parser.add_argument("--compare", default=None, help="이전 결과 JSON과 비교해 변화율 출력")
+        parser.add_argument("--verbose", action="store_true", help="뷰/컨슈머의 print 출력을 숨기지 않음")
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options["scenarios"].split(",") if name.strip()]
+        unknown = set(scenarios) - set(ALL_SCENARIOS)
+        if unknown:
+            raise CommandError(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+        if options["base_url"] and set(scenarios) & set(WS_SCENARIOS):
+            self.stderr.write("--base-url에서는 웹소켓 시나리오를 건너뜁니다 (같은 프로세스 ASGI 앱에서만 측정)")
+            scenarios = [name for name in scenarios if name not in WS_SCENARIOS]
+
+        vus = load_virtual_users(options["users"], options["password"])
+        if len(vus) < 2:
+            raise CommandError("두 사람이 참여한 채팅방이 없습니다. seed_synthetic_data로 데이터를 먼저 만드세요.")
+
+        quiet = options["output"] == "-"
+        with ExitStack() as stack:
+            fake_url = stack.enter_context(bench_utils.fake_external_server(options["fake_latency"] / 1000))
+            if options["base_url"]:
+                self.stderr.write(
+                    f"가짜 외부 API: {fake_url} (서버 쪽 KAKAO_LOCAL_API_URL / OPENAI_BASE_URL을 이 주소로 설정해야 함)"
+                )
+            else:
+                stack.enter_context(override_settings(KAKAO_API_KEY="bench-fake", KAKAO_LOCAL_API_URL=fake_url))
+                stack.enter_context(fake_openai(fake_url))
+            if not options["keep_rate_limits"]:
+                unlimited = {"rate": 1_000_000, "burst": 1_000_000}
+                stack.enter_context(mock.patch.dict(throttling.RATE_LIMITS, {"socket": unlimited, "user": unlimited}))
+            if not options["verbose"]:
+                stack.enter_context(redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+
+            from config.asgi import application
+            results = asyncio.run(self.run(application, scenarios, vus, options, quiet))
+
+        report = {
+            "meta": {
+                "revision": git_revision(),
+                "started_at": timezone.now().isoformat(),
+                "mode": options["base_url"] or "asgi-in-process",
+                "users": len(vus),
+                "concurrency": options["concurrency"],
+                "requests": options["requests"],
+                "warmup": options["warmup"],
+                "fake_latency_ms": options["fake_latency"],
+                "rate_limits": options["keep_rate_limits"],
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+            },
+            "scenarios": results,
+        }
+
+        if options["output"] == "-":
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        elif options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"결과 저장: {options['output']}"))
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                previous = json.load(f)
+            self.stderr.write(f"\n비교 대상: {previous.get('meta', {}).get('revision')}")
+            for name, rps_change, p95_change in bench_utils.compare(previous, report):
+                self.stderr.write(f"  {name:<16} rps {rps_change:+.1%}  p95 {p95_change:+.1%}")
+
+    async def run(self, application, scenarios, vus, options, quiet):
+        results = {}
+        if not quiet:
+            header = f"{'scenario':<16}{'reqs':>7}{'errors':>8}{'rps':>9}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}"
+            self.stdout.write(header)
+            self.stdout.write("-" * len(header))
+
+        if options["base_url"]:
+            transport, base_url = None, options["base_url"]
+        else:
+            transport, base_url = httpx.ASGITransport(app=application), "http://localhost"
+
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=30) as client:
+            for name in scenarios:
+                if name == "ws_fanout":
+                    await run_ws_fanout(application, vus, options["warmup"], options["concurrency"], options["ws_timeout"])
+                    results["ws_connect"], results[name] = await run_ws_fanout(
+                        application, vus, options["requests"], options["concurrency"], options["ws_timeout"]
+                    )
+                else:
+                    build = HTTP_SCENARIOS[name]
+                    await run_http(client, build, vus, options["warmup"], options["concurrency"])
+                    results[name] = await run_http(client, build, vus, options["requests"], options["concurrency"])
+
+        if not quiet:
+            for name, result in results.items():
+                if result is None:
+                    self.stdout.write(f"{name:<16}  (연결 실패로 측정 안 함)")
+                    continue
+                self.stdout.write(
+                    f"{name:<16}{result['requests']:>7}{result['errors']:>8}{str(result['rps']):>9}"
+                    f"{str(result['p50_ms']):>12}{str(result['p95_ms']):>12}{str(result['p99_ms']):>12}"
+                )
+        return results
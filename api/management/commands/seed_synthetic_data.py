@@ -0,0 +1,298 @@
+# api/management/commands/seed_synthetic_data.py
+
+import hashlib
+import json
+import random
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.db.models import Max
+
+from chat import search
+from chat.models import Block, ChatRoom, Message, RoomReadState
+from interaction.models import UserLike
+from profiles.models import ProfileImage, UserProfile
+
+User = get_user_model()
+
+USERNAME_PREFIX = "synth_"
+
+# (시/도, 시/군/구, 위도, 경도)
+DISTRICTS = [
+    ("서울", "강남구", 37.5172, 127.0473), ("서울", "마포구", 37.5663, 126.9019),
+    ("서울", "송파구", 37.5145, 127.1059), ("서울", "관악구", 37.4784, 126.9516),
+    ("서울", "노원구", 37.6542, 127.0568), ("서울", "종로구", 37.5730, 126.9794),
+    ("부산", "해운대구", 35.1631, 129.1636), ("부산", "부산진구", 35.1631, 129.0530),
+    ("대구", "수성구", 35.8582, 128.6306), ("대구", "달서구", 35.8299, 128.5326),
+    ("인천", "연수구", 37.4101, 126.6783), ("인천", "부평구", 37.5070, 126.7219),
+    ("광주", "북구", 35.1740, 126.9120), ("대전", "유성구", 36.3622, 127.3561),
+    ("울산", "남구", 35.5437, 129.3300), ("경기", "성남시", 37.4200, 127.1265),
+    ("경기", "수원시", 37.2636, 127.0286), ("경기", "고양시", 37.6584, 126.8320),
+    ("경기", "용인시", 37.2411, 127.1776), ("강원", "춘천시", 37.8813, 127.7298),
+    ("충북", "청주시", 36.6424, 127.4890), ("충남", "천안시", 36.8151, 127.1139),
+    ("전북", "전주시", 35.8242, 127.1480), ("전남", "여수시", 34.7604, 127.6622),
+    ("경북", "포항시", 36.0190, 129.3435), ("경남", "창원시", 35.2280, 128.6811),
+    ("제주", "제주시", 33.4996, 126.5312),
+]
+HOBBIES = ["등산", "독서", "영화", "요리", "여행", "러닝", "사진", "게임", "카페", "음악", "요가", "캠핑", "전시회", "필라테스", "자전거"]
+MBTIS = ["INTJ", "INTP", "ENTJ", "ENTP", "INFJ", "INFP", "ENFJ", "ENFP",
+         "ISTJ", "ISFJ", "ESTJ", "ESFJ", "ISTP", "ISFP", "ESTP", "ESFP"]
+JOBS = ["개발자", "디자이너", "교사", "간호사", "회계사", "마케터", "연구원", "공무원", "자영업", "학생"]
+PHRASES = [
+    "안녕하세요!", "반가워요 :)", "주말에 뭐 하세요?", "저도 그 영화 좋아해요", "커피 좋아하세요?",
+    "오늘 날씨 정말 좋네요", "퇴근하셨어요?", "사진 잘 봤어요 ㅎㅎ", "다음 주에 시간 괜찮으세요?", "네 좋아요!",
+    "맛집 추천해 주실 수 있어요?", "요즘 운동 시작했어요", "ㅋㅋㅋ 진짜요?", "저녁 맛있게 드세요", "잘 자요~",
+]
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+def _utc_text(value):
+    """aware datetime -> UTC 문자열 (adapt_datetimefield_value와 같은 결과, 생성 데이터는 모두 UTC라 검사 생략)"""
+    return None if value is None else str(value.astimezone(dt_timezone.utc).replace(tzinfo=None))
+
+
+def _converter(field):
+    """필드 값 -> DB에 넣을 값 (bulk_create가 행마다 하는 변환을 필드 종류별로 한 번만 정해 둠)"""
+    if isinstance(field, models.DateTimeField):
+        return _utc_text if connection.vendor == "sqlite" else connection.ops.adapt_datetimefield_value
+    if isinstance(field, models.DateField):
+        return connection.ops.adapt_datefield_value
+    if isinstance(field, models.JSONField):
+        return lambda value: None if value is None else json.dumps(value)
+    if isinstance(field, models.FileField):
+        return lambda value: value or ""
+    return None
+
+
+class BulkWriter:
+    """
+    모델별 버퍼 -> batch_size마다 INSERT ... executemany (테이블별 행 수/시간 집계)
+    - bulk_create는 객체마다 필드 값을 준비하는 비용 때문에 초당 1만 행 정도에서 막혀서,
+      모델 필드 정보로 컬럼 순서/값 변환을 한 번만 정해 두고 행마다 튜플만 만듦
+    - save()/시그널/auto_now를 거치지 않으므로 시간 필드도 직접 넣어야 함
+    - id를 넘기지 않으면 DB의 마지막 id 다음부터 차례로 매김
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.plans = {}
+        self.next_ids = {}
+        self.buffers = {}
+        self.counts = {}
+        self.seconds = {}
+
+    def plan(self, model):
+        plan = self.plans.get(model)
+        if plan is None:
+            fields = model._meta.concrete_fields
+            quote = connection.ops.quote_name
+            sql = (
+                f"INSERT INTO {quote(model._meta.db_table)} "
+                f"({', '.join(quote(field.column) for field in fields)}) "
+                f"VALUES ({', '.join(['%s'] * len(fields))})"
+            )
+            columns = [
+                (field.attname, _converter(field), field.get_default())
+                for field in fields
+            ]
+            plan = self.plans[model] = (sql, columns)
+            self.next_ids[model] = next_id(model)
+        return plan
+
+    def add(self, model, **values):
+        _, columns = self.plan(model)
+        if "id" not in values:
+            values["id"] = self.next_ids[model]
+        self.next_ids[model] = max(self.next_ids[model], values["id"] + 1)
+
+        get = values.get
+        row = [
+            convert(get(name, default)) if convert else get(name, default)
+            for name, convert, default in columns
+        ]
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            # 참조되는 쪽(먼저 추가된 모델)부터 모두 저장해야 외래 키 검사를 통과함
+            self.flush()
+        return values["id"]
+
+    def flush(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model, buffer in self.buffers.items():
+                if not buffer:
+                    continue
+                model_started = time.perf_counter()
+                cursor.executemany(self.plans[model][0], buffer)
+                self.seconds[model] = self.seconds.get(model, 0.0) + time.perf_counter() - model_started
+                self.counts[model] = self.counts.get(model, 0) + len(buffer)
+                buffer.clear()
+
+
+class Command(BaseCommand):
+    help = (
+        "벤치마크용 대량 데이터 생성 (유저/프로필/사진/관심/차단/채팅방/메시지). "
+        "같은 --seed면 같은 데이터. save()/시그널을 거치지 않고 큰 배치로 INSERT"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=1.0, help="규모 배수 (1.0 = 유저 10만 명)")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000, help="INSERT 한 번(executemany)에 넣을 행 수")
+        parser.add_argument("--likes-per-user", type=int, default=5)
+        parser.add_argument("--rooms-per-user", type=float, default=1.0, help="유저 한 명당 평균 채팅방 수")
+        parser.add_argument("--messages-per-room", type=int, default=40, help="채팅방 하나당 평균 메시지 수")
+        parser.add_argument("--block-rate", type=float, default=0.05, help="유저 한 명이 누군가를 차단할 확률")
+        parser.add_argument("--days", type=int, default=365, help="데이터가 퍼져 있는 기간(일)")
+        parser.add_argument("--end-date", default="2026-10-01", help="가장 최근 데이터 날짜 (YYYY-MM-DD, 재현성을 위해 고정)")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError(f"이미 '{USERNAME_PREFIX}' 유저가 있습니다. 빈 DB에서 실행하세요.")
+
+        rng = random.Random(options["seed"])
+        user_count = max(2, int(100_000 * options["scale"]))
+        end = datetime.strptime(options["end_date"], "%Y-%m-%d").replace(tzinfo=dt_timezone.utc)
+        start = end - timedelta(days=options["days"])
+        span_seconds = int((end - start).total_seconds())
+        writer = BulkWriter(options["batch_size"])
+
+        if connection.vendor == "sqlite":
+            # 생성 중에만 디스크 동기화를 줄임 (중간에 죽으면 DB를 다시 만들면 됨)
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous = OFF")
+
+        started = time.perf_counter()
+        # 메시지 검색 색인은 행마다 트리거로 하지 않고 끝에 한 번에
+        with search.deferred_indexing():
+            user_ids, genders = self.seed_users(rng, user_count, start, span_seconds, writer)
+            self.seed_likes_and_blocks(rng, user_ids, genders, options, start, span_seconds, writer)
+            self.seed_rooms(rng, user_ids, genders, options, start, span_seconds, writer)
+            writer.flush()
+
+        elapsed = time.perf_counter() - started
+        total = sum(writer.counts.values())
+        for model, count in writer.counts.items():
+            seconds = writer.seconds[model]
+            self.stdout.write(f"  {model._meta.db_table:<28}{count:>10} rows {count / seconds:>10.0f} rows/s (INSERT)")
+        self.stdout.write(
+            self.style.SUCCESS(f"{total}행 생성 ({elapsed:.1f}초, 전체 {total / elapsed:.0f} rows/s)")
+        )
+        self.stdout.write(
+            "증분 동기화(SyncEvent)는 만들지 않으므로 "
+            "클라이언트는 처음 동기화(reset)부터 시작"
+        )
+
+    def seed_users(self, rng, count, start, span_seconds, writer):
+        """유저 + 프로필 + 사진 2~3장"""
+        password = make_password("synthetic")  # 해시 계산은 한 번만
+        user_ids, genders = [], []
+
+        for i in range(count):
+            joined = start + timedelta(seconds=rng.randrange(span_seconds))
+            gender = "남성" if rng.random() < 0.5 else "여성"
+            city, district, lat, lon = rng.choice(DISTRICTS)
+            user_id = writer.add(
+                User, username=f"{USERNAME_PREFIX}{i:07d}", password=password, date_joined=joined,
+            )
+            year, month, day = rng.randint(1985, 2003), rng.randint(1, 12), rng.randint(1, 28)
+            profile_id = writer.add(
+                UserProfile,
+                user_id=user_id,
+                gender=gender,
+                year=year, month=month, day=day, birth_date=date(year, month, day),
+                hour=rng.randint(0, 23), minute=rng.randint(0, 59),
+                birth_time_unknown=rng.random() < 0.1,
+                hobbies=rng.sample(HOBBIES, rng.randint(2, 5)),
+                mbti=rng.choice(MBTIS),
+                job=rng.choice(JOBS),
+                location_city=city,
+                location_district=district,
+                latitude=round(lat + rng.uniform(-0.03, 0.03), 6),
+                longitude=round(lon + rng.uniform(-0.03, 0.03), 6),
+                profile_text=f"{rng.choice(HOBBIES)}을(를) 좋아하는 {city} {district} 사람입니다.",
+                nickname=f"사용자{i}",
+                is_matchable=True,  # 성별/생년월일/소개글/사진(2~3장)이 모두 있음
+                updated_at=joined,
+            )
+            for order in range(rng.randint(2, 3)):
+                digest = hashlib.sha256(f"{user_id}-{order}".encode()).hexdigest()
+                name = f"profile_images/synthetic/{digest[:2]}/{digest}"
+                writer.add(
+                    ProfileImage, profile_id=profile_id, image=f"{name}.jpg", detail=f"{name}_detail.jpg",
+                    thumbnail=f"{name}_thumbnail.jpg", content_hash=digest, order=order, created_at=joined,
+                )
+            user_ids.append(user_id)
+            genders.append(gender)
+        return user_ids, genders
+
+    def seed_likes_and_blocks(self, rng, user_ids, genders, options, start, span_seconds, writer):
+        by_gender = {
+            g: [uid for uid, gender in zip(user_ids, genders) if gender == g] for g in ("남성", "여성")
+        }
+        for uid, gender in zip(user_ids, genders):
+            pool = by_gender["여성" if gender == "남성" else "남성"]
+            if not pool:
+                continue
+            for receiver in set(rng.choice(pool) for _ in range(options["likes_per_user"])):
+                writer.add(
+                    UserLike, sender_id=uid, receiver_id=receiver,
+                    created_at=start + timedelta(seconds=rng.randrange(span_seconds)),
+                )
+            if rng.random() < options["block_rate"]:
+                writer.add(
+                    Block, blocker_id=uid, blocked_id=rng.choice(pool),
+                    created_at=start + timedelta(seconds=rng.randrange(span_seconds)),
+                )
+
+    def seed_rooms(self, rng, user_ids, genders, options, start, span_seconds, writer):
+        """채팅방 + 참여자 + 메시지 + 읽음 상태 (방 안에서는 메시지 id와 시간이 함께 증가)"""
+        Participant = ChatRoom.participants.through
+        men = [uid for uid, gender in zip(user_ids, genders) if gender == "남성"]
+        women = [uid for uid, gender in zip(user_ids, genders) if gender == "여성"]
+        if not men or not women:
+            return
+        room_count = min(int(len(user_ids) * options["rooms_per_user"] / 2), len(men) * len(women))
+        pairs = set()
+        while len(pairs) < room_count:
+            pairs.add((rng.choice(men), rng.choice(women)))
+
+        end_seconds = start.timestamp() + span_seconds
+        for a, b in sorted(pairs):
+            created = start + timedelta(seconds=rng.randrange(span_seconds))
+            room_id = writer.add(ChatRoom, created_at=created)
+            writer.add(Participant, chatroom_id=room_id, user_id=a)
+            writer.add(Participant, chatroom_id=room_id, user_id=b)
+
+            # 메시지 수는 방마다 다르게 (대부분 짧고 일부만 긴 대화)
+            count = max(1, int(rng.expovariate(1 / options["messages_per_room"])))
+            t = created.timestamp()
+            gap = max(1.0, (end_seconds - t) / (count + 1))
+            messages = []
+            for _ in range(count):
+                t = min(end_seconds, t + rng.expovariate(1 / gap))
+                sender = a if rng.random() < 0.5 else b
+                message_id = writer.add(
+                    Message, room_id=room_id, sender_id=sender,
+                    content=rng.choice(PHRASES),
+                    timestamp=datetime.fromtimestamp(t, tz=dt_timezone.utc),
+                )
+                messages.append((message_id, sender))
+
+            # 읽음 상태: 참여자마다 마지막 몇 개를 안 읽은 상태로
+            for user in (a, b):
+                unread_tail = rng.choice([0, 0, 0, 1, 2, 5])
+                read_upto = messages[:len(messages) - unread_tail]
+                last_read = read_upto[-1][0] if read_upto else 0
+                unread = sum(1 for mid, sender in messages if mid > last_read and sender != user)
+                writer.add(
+                    RoomReadState, room_id=room_id, user_id=user, last_read_message_id=last_read,
+                    unread_count=unread, updated_at=created,
+                )
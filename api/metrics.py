@@ -0,0 +1,266 @@
+# api/metrics.py
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+# 응답 시간 / 외부 호출 시간 구간(초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 요청 하나당 DB 쿼리 수 구간
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Server-Timing 응답 헤더 추가 여부 (브라우저 개발자 도구에서 DB/외부 호출 시간 확인용)
+SERVER_TIMING = getattr(settings, 'METRICS_SERVER_TIMING', False)
+
+
+class Histogram:
+    """라벨별 누적 히스토그램 (Prometheus histogram 형식)"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}  # labels -> [구간별 개수..., 합계, 개수]
+        self.lock = Lock()
+
+    def observe(self, labels, value):
+        with self.lock:
+            row = self.series.get(labels)
+            if row is None:
+                row = self.series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = {labels: list(row) for labels, row in self.series.items()}
+        for labels, row in sorted(series.items()):
+            base = _labels(self.label_names, labels)
+            for bound, count in zip(self.buckets, row):
+                lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="+Inf"}} {row[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {row[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {row[-1]}")
+        return lines
+
+
+class Counter:
+    """라벨별 누적 카운터"""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series = {}
+        self.lock = Lock()
+
+    def inc(self, labels, value=1):
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            series = dict(self.series)
+        for labels, value in sorted(series.items()):
+            lines.append(f"{self.name}{{{_labels(self.label_names, labels)}}} {value:g}")
+        return lines
+
+
+class Gauge(Counter):
+    """라벨별 현재 값 (증감)"""
+
+    kind = "gauge"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+http_duration = Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간", ("endpoint", "method", "status"), LATENCY_BUCKETS
+)
+http_queries = Histogram(
+    "http_request_db_queries", "HTTP 요청 하나당 DB 쿼리 수", ("endpoint", "method"), QUERY_BUCKETS
+)
+http_db_seconds = Counter(
+    "http_request_db_seconds_total", "HTTP 요청에서 DB 쿼리에 쓴 시간 합계", ("endpoint", "method")
+)
+external_duration = Histogram(
+    "external_call_duration_seconds", "외부 호출(카카오/OpenAI/TensorFlow) 시간", ("service", "operation"), LATENCY_BUCKETS
+)
+external_errors = Counter(
+    "external_call_errors_total", "예외로 끝난 외부 호출 수", ("service", "operation")
+)
+ws_duration = Histogram(
+    "websocket_event_duration_seconds", "웹소켓 이벤트 처리 시간", ("consumer", "event"), LATENCY_BUCKETS
+)
+ws_queries = Counter(
+    "websocket_event_db_queries_total", "웹소켓 이벤트 처리 중 DB 쿼리 수", ("consumer", "event")
+)
+ws_connections = Gauge(
+    "websocket_connections", "현재 열려 있는 웹소켓 연결 수 (이 워커 기준)", ("consumer",)
+)
+
+REGISTRY = [
+    http_duration, http_queries, http_db_seconds,
+    external_duration, external_errors,
+    ws_duration, ws_queries, ws_connections,
+]
+
+
+class Trace:
+    """요청/이벤트 하나에서 쓴 DB 시간과 외부 호출 시간"""
+
+    __slots__ = ("db_queries", "db_seconds", "spans")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.spans = {}  # "service.operation" -> 누적 시간
+
+    def server_timing(self, total):
+        """Server-Timing 헤더 값 (ms)"""
+        parts = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"']
+        for name, seconds in self.spans.items():
+            parts.append(f"{name.replace('.', '-')};dur={seconds * 1000:.1f}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+# 현재 요청/이벤트의 Trace (스레드/코루틴마다 따로, database_sync_to_async 스레드로도 전달됨)
+_current = ContextVar("metrics_trace", default=None)
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    trace = _current.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        trace.db_queries += 1
+        trace.db_seconds += time.perf_counter() - started
+
+
+def _install_db_wrapper(sender, connection, **kwargs):
+    """새 DB 연결마다 쿼리 시간 측정 래퍼 등록 (측정 중인 요청이 없으면 그대로 실행)"""
+    if _db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_wrapper)
+
+
+connection_created.connect(_install_db_wrapper, dispatch_uid="api.metrics.db_wrapper")
+
+
+@contextmanager
+def trace():
+    """이 블록 안의 DB 쿼리/외부 호출을 새 Trace에 기록"""
+    current = Trace()
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(service, operation):
+    """
+    외부 호출 시간 측정
+    with metrics.span("openai", "profile_text"):
+        openai.chat.completions.create(...)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        external_errors.inc((service, operation))
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        external_duration.observe((service, operation), elapsed)
+        current = _current.get()
+        if current is not None:
+            key = f"{service}.{operation}"
+            current.spans[key] = current.spans.get(key, 0.0) + elapsed
+
+
+def render():
+    """Prometheus 텍스트 형식 (이 워커 프로세스 기준)"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _endpoint(request):
+    """URL 패턴 기준 엔드포인트 이름 (ID마다 따로 집계되지 않도록)"""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return "/" + match.route.lstrip("^") if match.route else match.view_name
+
+
+class MetricsMiddleware:
+    """
+    HTTP 요청별 처리 시간 / DB 쿼리 수·시간 / 외부 호출 시간 기록
+    METRICS_SERVER_TIMING = True면 Server-Timing 응답 헤더 추가
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with trace() as current:
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        endpoint = _endpoint(request)
+        http_duration.observe((endpoint, request.method, str(response.status_code)), elapsed)
+        http_queries.observe((endpoint, request.method), current.db_queries)
+        http_db_seconds.inc((endpoint, request.method), current.db_seconds)
+
+        if SERVER_TIMING:
+            response["Server-Timing"] = current.server_timing(elapsed)
+        return response
+
+
+class InstrumentedConsumerMixin:
+    """
+    웹소켓 컨슈머 이벤트(연결/수신/그룹 메시지 등)별 처리 시간과 DB 쿼리 수 기록
+    class ChatConsumer(InstrumentedConsumerMixin, AsyncWebsocketConsumer): ...
+    """
+
+    async def dispatch(self, message):
+        consumer = type(self).__name__
+        event = message.get("type", "unknown")
+        if event == "websocket.connect":
+            ws_connections.inc((consumer,))
+        elif event == "websocket.disconnect":
+            ws_connections.inc((consumer,), -1)
+
+        started = time.perf_counter()
+        with trace() as current:
+            try:
+                await super().dispatch(message)
+            finally:
+                ws_duration.observe((consumer, event), time.perf_counter() - started)
+                if current.db_queries:
+                    ws_queries.inc((consumer, event), current.db_queries)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendSnapshot',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommend_snapshot', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('params', models.CharField(blank=True, default='', max_length=50)),
+                ('user_ids', models.BinaryField(default=bytes)),
+                ('scores', models.BinaryField(default=bytes)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -1 +1,66 @@
-# api/models.py
\ No newline at end of file
+# api/models.py
+
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class RecommendImpression(models.Model):
+    """
+    유저별 추천 노출 기록
+    - seen: 추천 결과로 보여준 상대 (다음 추천에서 점수를 낮춤)
+    - skipped: 건너뛴 상대 (다음 추천부터 제외)
+    둘 다 유저 ID 비트셋(zlib 압축, api.impression_utils.UserIdBitset)으로 저장
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        primary_key=True,
+        related_name='recommend_impression',
+        on_delete=models.CASCADE,
+    )
+    seen = models.BinaryField(default=bytes)
+    skipped = models.BinaryField(default=bytes)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.user_id}의 추천 기록'
+
+
+
+class RecommendSnapshot(models.Model):
+    """
+    유저별 추천 순위 스냅샷 (후보 ID와 점수만 저장, 짧게 유지)
+    - 다음 페이지는 점수를 다시 계산하지 않고 스냅샷에서 잘라서 응답
+    - user_ids: int64 배열, scores: float64 배열 (후보 수 x [총점, 사주, 취향, 거리]), 둘 다 점수 순
+    - params: 스냅샷을 만든 조건 (나이 범위). 조건이 다르면 새로 계산
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        primary_key=True,
+        related_name='recommend_snapshot',
+        on_delete=models.CASCADE,
+    )
+    params = models.CharField(max_length=50, blank=True, default='')
+    user_ids = models.BinaryField(default=bytes)
+    scores = models.BinaryField(default=bytes)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'{self.user_id}의 추천 스냅샷'
+
+    @property
+    def stamp(self):
+        """스냅샷 구분 값 (커서에 넣어, 새로 계산된 스냅샷에 예전 커서가 섞이지 않게 함)"""
+        return int(self.computed_at.timestamp() * 1_000_000)
+
+    def is_fresh(self, ttl):
+        return timezone.now() - self.computed_at < timedelta(seconds=ttl)
+
+    def ranking(self):
+        """Return: (유저 ID 배열, 점수 배열 [총점, 사주, 취향, 거리])"""
+        user_ids = np.frombuffer(bytes(self.user_ids), dtype=np.int64)
+        scores = np.frombuffer(bytes(self.scores), dtype=np.float64).reshape(-1, 4)
+        return user_ids, scores
@@ -9,6 +9,7 @@ import tensorflow as tf
 from tensorflow.keras.models import load_model
 from tensorflow.keras.metrics import MeanSquaredError
 
+from api import metrics
 from api.saju_calculator import calculate_saju
 
 MODEL_DIR = os.path.join(settings.BASE_DIR, 'api', 'ml_models')
@@ -37,14 +38,16 @@ def load_dl_models():
     if _sky_model is None:
         print("[System] Sky 모델 로드 중...")
         try:
-            _sky_model = load_model(SKY_MODEL_PATH, custom_objects=custom_objects)
+            with metrics.span("tensorflow", "load_model"):
+                _sky_model = load_model(SKY_MODEL_PATH, custom_objects=custom_objects)
         except Exception as e:
             print(f"Sky 모델 로드 실패: {e}")
 
     if _earth_model is None:
         print("⏳ [System] Earth 모델 로드 중...")
         try:
-            _earth_model = load_model(EARTH_MODEL_PATH, custom_objects=custom_objects)
+            with metrics.span("tensorflow", "load_model"):
+                _earth_model = load_model(EARTH_MODEL_PATH, custom_objects=custom_objects)
         except Exception as e:
             print(f"Earth 모델 로드 실패: {e}")
 
@@ -115,7 +118,8 @@ def calculate_compatibility_score(user1_profile, user2_profile):
     if _sky_model is not None:
         try:
             sample_input = np.array([[u1_vec['ds'], u2_vec['ds']]])
-            _ = _sky_model.predict(sample_input, verbose=0)
+            with metrics.span("tensorflow", "sky_predict"):
+                _ = _sky_model.predict(sample_input, verbose=0)
         except:
             pass
 
@@ -0,0 +1,148 @@
+# api/test_utils.py
+
+import re
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from chat.models import ChatRoom, Message
+from interaction.models import UserLike
+from profiles.matchable import refresh_matchable
+from profiles.models import ProfileImage, UserProfile
+
+User = get_user_model()
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_IN_LIST_RE = re.compile(r"IN \(\?(?:, \?)*\)")
+
+
+def normalize_sql(sql):
+    """숫자/문자열 값을 ?로 바꾼 SQL (같은 모양의 쿼리끼리 묶기 위함, IN 목록 길이도 무시)"""
+    return _IN_LIST_RE.sub("IN (...)", _LITERAL_RE.sub("?", sql))
+
+
+class Fixture:
+    """
+    쿼리 수 테스트용 데이터
+    - me: 남성, 프로필/사진 2장
+    - grow(n): 상대 유저(여성, 프로필/사진 2장)를 n명까지 늘리고, 각각과 채팅방(메시지 3개) / 서로 관심 표시
+    - send_likes=False: 내가 보내는 관심은 만들지 않음 (추천 후보에서 빠지지 않도록)
+    """
+
+    send_likes = True
+
+    def __init__(self):
+        self.me = self.make_user("me", "남성", 0)
+        self.others = []
+
+    def make_user(self, name, gender, index):
+        user = User.objects.create_user(username=f"budget_{name}")
+        profile = UserProfile.objects.create(
+            user=user,
+            nickname=f"닉네임{index}",
+            gender=gender,
+            year=1990 + index % 10, month=1 + index % 12, day=1 + index % 28,
+            hour=12, minute=0,
+            hobbies=["등산", "독서", "영화"][: 1 + index % 3],
+            mbti="INTJ",
+            job="개발자",
+            location_city="서울",
+            location_district="강남구",
+            latitude=37.5 + index * 0.01,
+            longitude=127.0 + index * 0.01,
+            profile_text="안녕하세요",
+        )
+        ProfileImage.objects.bulk_create([
+            ProfileImage(profile=profile, image=f"profile_images/{user.id}_{order}.jpg",
+                         thumbnail=f"profile_images/{user.id}_{order}_thumb.jpg", order=order)
+            for order in range(2)
+        ])
+        refresh_matchable([profile.pk])  # bulk_create는 시그널이 없음 (sync_profile_images와 같음)
+        return user
+
+    def grow(self, n):
+        while len(self.others) < n:
+            index = len(self.others) + 1
+            other = self.make_user(f"other{index}", "여성", index)
+            room = ChatRoom.objects.create()
+            room.participants.add(self.me, other)
+            for i, sender in enumerate((self.me, other, other)):
+                Message.objects.create(room=room, sender=sender, content=f"안녕하세요 {i}")
+            if self.send_likes:
+                UserLike.objects.create(sender=self.me, receiver=other)
+            UserLike.objects.create(sender=other, receiver=self.me)
+            self.others.append(other)
+        return self
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    엔드포인트별 쿼리 수 회귀 테스트
+    - 데이터 크기(sizes)를 바꿔가며 같은 요청을 보내고, 쿼리 수가 데이터 양과 상관없이 같은지(N+1 없음) 확인
+    - query_budgets: {URL 이름: 최대 쿼리 수} (뷰마다 선언)
+    - 실패하면 늘어난 쿼리 / 전체 SQL을 메시지로 보여줌
+    """
+
+    sizes = (2, 6)
+    query_budgets = {}
+
+    def setUp(self):
+        self.fixture = Fixture()
+        self.client = APIClient()
+        self.client.force_authenticate(self.fixture.me)
+
+    def measure(self, call):
+        """call(fixture)을 한 번 실행해 캐시를 채운 뒤, 다시 실행하며 쿼리 기록"""
+        call(self.fixture)
+        with CaptureQueriesContext(connection) as captured:
+            response = call(self.fixture)
+        self.assertLess(
+            response.status_code, 400,
+            f"{response.status_code}: {getattr(response, 'data', response.content)}"
+        )
+        return [query["sql"] for query in captured.captured_queries]
+
+    def assertQueryBudget(self, name, call):
+        """
+        name: query_budgets의 URL 이름
+        call: fixture를 받아 요청을 보내고 응답을 반환하는 함수 (여러 번 호출될 수 있어야 함)
+        """
+        budget = self.query_budgets[name]
+        runs = []
+        for size in self.sizes:
+            self.fixture.grow(size)
+            runs.append((size, self.measure(call)))
+
+        (small_size, small), (large_size, large) = runs[0], runs[-1]
+        if len(small) != len(large):
+            grown = Counter(map(normalize_sql, large)) - Counter(map(normalize_sql, small))
+            detail = "\n".join(f"  +{count} x {sql}" for sql, count in grown.most_common())
+            self.fail(
+                f"{name}: 쿼리 수가 데이터 양에 따라 늘어남 "
+                f"(N={small_size}: {len(small)}개, N={large_size}: {len(large)}개)\n"
+                f"늘어난 쿼리:\n{detail}"
+            )
+        if len(large) > budget:
+            detail = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(large, 1))
+            self.fail(f"{name}: 쿼리 {len(large)}개 (예산 {budget}개 초과)\n{detail}")
+
+    def assertNotModified(self, get):
+        """
+        get: If-None-Match 헤더(없으면 None)를 받아 GET 요청을 보내는 함수
+        첫 응답의 ETag로 다시 요청하면 304 + 빈 본문이고, 확인에 쿼리는 1번만 써야 함
+        Return: ETag (이후 변경 시 ETag가 바뀌는지 비교용)
+        """
+        self.fixture.grow(self.sizes[-1])
+        response = get(None)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        with CaptureQueriesContext(connection) as captured:
+            response = get(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertLessEqual(len(captured.captured_queries), 1, [q["sql"] for q in captured.captured_queries])
+        return etag
@@ -1,2 +1,187 @@
 # api/tests.py
+import io
+import random
+from unittest.mock import patch
 
+import numpy as np
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from django.urls import reverse
+
+from api import json_utils
+from api.impression_utils import UserIdBitset
+from api.json_utils import UJSONParser, UJSONRenderer
+from api.models import RecommendImpression, RecommendSnapshot
+from api.test_utils import QueryBudgetTestCase
+from chat.models import Block
+from interaction.models import UserLike
+from profiles.models import UserProfile
+
+
+class MatchQueryBudgetTests(QueryBudgetTestCase):
+    """매칭 API 쿼리 수 (후보 수와 상관없이 일정해야 함)"""
+
+    query_budgets = {
+        # 스냅샷에서 응답: 노출 기록 읽기 + 스냅샷 + 페이지 프로필/사진
+        # + 노출 기록 갱신 (SAVEPOINT / 잠금 읽기 / UPDATE / RELEASE)
+        'recommend_matches': 8,
+        'check_saju': 2,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.fixture.send_likes = False
+
+    def test_recommend(self):
+        self.assertQueryBudget('recommend_matches', lambda f: self.client.get(reverse('recommend_matches')))
+
+    def test_compatibility(self):
+        self.assertQueryBudget(
+            'check_saju',
+            lambda f: self.client.get(reverse('check_saju', args=[f.others[0].id])),
+        )
+
+    def test_recommend_age_range(self):
+        self.fixture.grow(10)
+        ages = {p.user_id: p.age for p in UserProfile.objects.filter(user__in=self.fixture.others)}
+        low, high = sorted(set(ages.values()))[2:4]
+
+        response = self.client.get(reverse('recommend_matches'), {'min_age': low, 'max_age': high})
+        self.assertEqual(response.status_code, 200)
+        expected = {user_id for user_id, age in ages.items() if low <= age <= high}
+        self.assertEqual({match['user_id'] for match in response.data}, expected)
+
+        response = self.client.get(reverse('recommend_matches'), {'min_age': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_recommend_excludes_liked_blocked_and_incomplete(self):
+        self.fixture.grow(5)
+        liked, blocked, blocker, incomplete, *rest = self.fixture.others
+        UserLike.objects.create(sender=self.fixture.me, receiver=liked)
+        Block.objects.create(blocker=self.fixture.me, blocked=blocked)
+        Block.objects.create(blocker=blocker, blocked=self.fixture.me)
+        incomplete.profile.images.all().delete()
+
+        response = self.client.get(reverse('recommend_matches'))
+        self.assertEqual({match['user_id'] for match in response.data}, {user.id for user in rest})
+
+    def test_recommend_skip_and_seen(self):
+        self.fixture.grow(12)
+        url = reverse('recommend_matches')
+        first = [match['user_id'] for match in self.client.get(url).data]
+        self.assertEqual(len(first), 10)
+
+        # 보여준 10명은 기록되고, 다음 추천에서는 못 본 2명이 앞쪽으로 올라옴
+        impression = RecommendImpression.objects.get(user=self.fixture.me)
+        self.assertEqual(len(UserIdBitset.from_bytes(impression.seen)), 10)
+        unseen = {user.id for user in self.fixture.others} - set(first)
+        second = self.client.get(url, {'refresh': 1}).data
+        self.assertTrue(unseen <= {match['user_id'] for match in second})
+
+        response = self.client.post(reverse('skip_recommend', args=[first[0]]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(first[0], {match['user_id'] for match in self.client.get(url).data})
+        self.assertEqual(self.client.post(reverse('skip_recommend', args=[self.fixture.me.id])).status_code, 400)
+
+    def test_recommend_seen_merges_concurrent_writes(self):
+        self.fixture.grow(3)
+        other_page = 999999
+
+        def concurrent_request(profiles):
+            # 응답을 만드는 사이 다른 요청이 노출/건너뛰기 기록을 저장한 상황
+            RecommendImpression.objects.update_or_create(
+                user=self.fixture.me,
+                defaults={'seen': self.bitset([other_page]), 'skipped': self.bitset([other_page])},
+            )
+
+        with patch('api.views.profile_cache.warm', side_effect=concurrent_request):
+            shown = [match['user_id'] for match in self.client.get(reverse('recommend_matches')).data]
+
+        impression = RecommendImpression.objects.get(user=self.fixture.me)
+        seen = UserIdBitset.from_bytes(impression.seen)
+        self.assertTrue(all(user_id in seen for user_id in shown + [other_page]))
+        self.assertIn(other_page, UserIdBitset.from_bytes(impression.skipped))
+
+    def bitset(self, ids):
+        bits = UserIdBitset()
+        bits.add(ids)
+        return bits.to_bytes()
+
+    def test_recommend_pages_from_snapshot(self):
+        self.fixture.grow(12)
+        url = reverse('recommend_matches')
+        first = self.client.get(url)
+        cursor = first['X-Next-Cursor']
+        snapshot = RecommendSnapshot.objects.get(user=self.fixture.me)
+
+        # 다음 페이지는 점수를 다시 계산하지 않음 (스냅샷 그대로)
+        with patch('api.views.calculate_compatibility_score') as score:
+            second = self.client.get(url, {'cursor': cursor})
+        score.assert_not_called()
+        self.assertNotIn('X-Next-Cursor', second)
+        ids = [match['user_id'] for match in first.data + second.data]
+        self.assertEqual(sorted(ids), sorted(user.id for user in self.fixture.others))
+        self.assertEqual(RecommendSnapshot.objects.get(user=self.fixture.me).computed_at, snapshot.computed_at)
+
+        # 새로 계산하면 예전 커서는 쓸 수 없음
+        self.client.get(url, {'refresh': 1})
+        self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 410)
+        self.assertEqual(self.client.get(url, {'cursor': 'abc'}).status_code, 400)
+
+
+class UserIdBitsetTests(SimpleTestCase):
+    """추천 노출 기록용 유저 ID 비트셋"""
+
+    def test_round_trip_and_mask(self):
+        bitset = UserIdBitset()
+        bitset.add([3, 70, 5000])
+        restored = UserIdBitset.from_bytes(bitset.to_bytes())
+        self.assertEqual(len(restored), 3)
+        self.assertIn(70, restored)
+        self.assertNotIn(71, restored)
+        np.testing.assert_array_equal(
+            restored.mask([3, 4, 5000, 999999]), [True, False, True, False]
+        )
+        self.assertEqual(UserIdBitset().to_bytes(), b"")
+
+    def test_stays_small_with_many_users(self):
+        """10만 명 규모에서 1000명을 본 기록도 몇 KB 이내"""
+        bitset = UserIdBitset()
+        bitset.add(random.Random(0).sample(range(1, 100_000), 1000))
+        self.assertLess(len(bitset.to_bytes()), 4096)
+
+
+class UJSONRendererTests(SimpleTestCase):
+    """ujson 렌더러 출력이 DRF 기본 JSONRenderer와 바이트 단위로 같은지"""
+
+    def assertSameOutput(self, data):
+        self.assertEqual(UJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_unicode_and_slashes(self):
+        self.assertSameOutput({"name": "김철수", "url": "/media/a.jpg", "n": [1, 2.5, None, True]})
+
+    def test_line_separators_escaped(self):
+        data = {"text": "줄\u2028바꿈\u2029문단"}
+        self.assertSameOutput(data)
+        self.assertNotIn("\u2028".encode(), UJSONRenderer().render(data))
+
+    def test_empty(self):
+        self.assertEqual(UJSONRenderer().render(None), b'')
+
+    def test_float_exponents(self):
+        # ujson은 한 자리 음수 지수를 1e-7로 쓰므로 기본 렌더러 결과(1e-07)로 맞춤
+        self.assertSameOutput({"small": 1e-7, "tiny": 5e-324, "big": 1e16, "huge": 1.5e300, "rate": 8.5e-5})
+        self.assertSameOutput({"text": "3e-5", "values": [0.1, 1 / 3, -0.0]})
+        rng = random.Random(0)
+        for _ in range(1000):
+            self.assertSameOutput([rng.random() * 10 ** rng.randint(-30, 30)])
+
+    def test_strict_rejects_non_finite(self):
+        for text in ['1e400', '[-1e400]', '{"a": 1E+999}', 'NaN', '[Infinity]']:
+            with self.assertRaises(ValueError):
+                json_utils.loads(text)
+            with self.assertRaises(ParseError):
+                UJSONParser().parse(io.BytesIO(text.encode()))
+        self.assertEqual(json_utils.loads('{"a": 1e-400, "b": "1e400 NaN"}'), {"a": 0.0, "b": "1e400 NaN"})
+        self.assertEqual(json_utils.loads('[1e300]'), [1e300])
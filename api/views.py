@@ -1,8 +1,16 @@
 # api/views.py
 
+import hmac
 import json
+
+import numpy as np
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -10,13 +18,26 @@ from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.request import Request
 
-from profiles.models import UserProfile
+from chat.models import Block
+from interaction.models import UserLike
+from profiles import profile_cache
+from profiles.models import UserProfile, birth_date_range
+from .impression_utils import UserIdBitset
+from .models import RecommendImpression, RecommendSnapshot
 from .saju_compatibility import calculate_compatibility_score
 from .geo_utils import get_lat_lon, calculate_distance, get_distance_score
 from .interest_utils import get_interest_score
+from . import metrics
 
 User = get_user_model()
 
+# 이미 추천으로 보여준 상대의 점수에 곱하는 값 (같은 상위 10명이 매번 반복되지 않도록)
+SEEN_SCORE_FACTOR = getattr(settings, 'RECOMMEND_SEEN_SCORE_FACTOR', 0.8)
+# 추천 순위 스냅샷 유효 시간(초) / 보관할 최대 인원 / 한 페이지 인원
+SNAPSHOT_TTL = getattr(settings, 'RECOMMEND_SNAPSHOT_TTL', 600)
+SNAPSHOT_SIZE = getattr(settings, 'RECOMMEND_SNAPSHOT_SIZE', 500)
+PAGE_SIZE = getattr(settings, 'RECOMMEND_PAGE_SIZE', 10)
+
 
 # 1. 사주 궁합 점수 조회 API
 @api_view(['GET'])
@@ -70,17 +91,159 @@ def check_saju_compatibility(request, target_id):
         )
 
 
+def recommend_candidates(user, target_gender, min_age=None, max_age=None):
+    """
+    추천 후보 쿼리 (나 제외 + 이성 + 프로필을 다 채운 유저 + 나이 범위)
+    이미 관심 표시한 상대, 차단 관계(양방향)인 상대는 SQL에서 바로 제외
+    """
+    return (
+        UserProfile.objects.exclude(user=user)
+        .filter(gender=target_gender, is_matchable=True, **birth_date_range(min_age, max_age))
+        .exclude(Exists(UserLike.objects.filter(sender=user, receiver_id=OuterRef('user_id'))))
+        .exclude(Exists(Block.objects.filter(blocker=user, blocked_id=OuterRef('user_id'))))
+        .exclude(Exists(Block.objects.filter(blocker_id=OuterRef('user_id'), blocked=user)))
+        .prefetch_related('images')
+    )
+
+
+def match_distance(me, target):
+    """두 사람 사이 거리(km), 둘 중 하나라도 좌표가 없으면 None"""
+    if me.latitude is None or me.longitude is None or target.latitude is None or target.longitude is None:
+        return None
+    return calculate_distance((me.latitude, me.longitude), (target.latitude, target.longitude))
+
+
+def score_candidate(me, target):
+    """
+    궁합 점수 계산 - 사주(0.4) + 취향(0.5) + 거리(0.1)
+    Return: (총점, 사주 점수, 취향 점수, 거리 점수(100점 만점))
+    """
+    saju_score = calculate_compatibility_score(me, target)
+    interest_score = get_interest_score(me.hobbies, target.hobbies)
+
+    # 거리 점수: 둘 다 좌표가 있을 때만 계산, 없으면 기본 점수
+    dist_km = match_distance(me, target)
+    geo_raw_score = get_distance_score(dist_km) if dist_km is not None else 5
+    geo_score_100 = geo_raw_score * 10
+
+    total_score = (saju_score * 0.4) + (interest_score * 0.5) + (geo_score_100 * 0.1)
+    return total_score, saju_score, interest_score, geo_score_100
+
+
+def match_result(me, target, scores):
+    """추천 결과 한 건 (scores: score_candidate 결과, 스냅샷에 저장된 값도 같은 순서)"""
+    total_score, saju_score, interest_score, geo_score_100 = scores
+    dist_km = match_distance(me, target)
+    # 대표 사진 (prefetch한 목록 사용)
+    images = target.images.all()
+    return {
+        "user_id": target.user_id,
+        "nickname": target.nickname,
+        "gender": target.gender,
+        "age": target.age if target.age else "?",
+        "mbti": target.mbti,
+        "job": target.job,
+        "location": f"{target.location_city} {target.location_district}",
+        "total_score": round(float(total_score), 1),
+        "scores": {
+            "saju": _plain_number(saju_score),
+            "interest": _plain_number(interest_score),
+            "distance": _plain_number(geo_score_100)
+        },
+        "info": {
+            "distance_km": f"{dist_km:.1f}km" if dist_km is not None else "알수없음",
+            "common_hobbies": list(set(me.hobbies or []) & set(target.hobbies or []))
+        },
+        "profile_image": images[0].thumbnail_url if images else None
+    }
+
+
+def _plain_number(value):
+    """스냅샷에서 꺼낸 float 값을 원래처럼 정수는 정수로 (응답 모양 유지)"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def build_recommend_snapshot(user, me, target_gender, min_age, max_age, params, seen, skipped):
+    """
+    후보 전체 점수를 계산해 순위 스냅샷 저장 (최대 RECOMMEND_SNAPSHOT_SIZE명)
+    - 건너뛴 상대는 점수 계산 전에 빼고, 이미 보여준 상대는 점수를 낮춤 (후보 ID 전체를 비트셋으로 한 번에 검사)
+    Return: (스냅샷, 점수를 계산한 후보 프로필 {user_id: 프로필})
+    """
+    candidates = list(recommend_candidates(user, target_gender, min_age, max_age))
+    candidate_ids = np.fromiter((target.user_id for target in candidates), dtype=np.int64, count=len(candidates))
+    keep = ~skipped.mask(candidate_ids)
+    seen_mask = seen.mask(candidate_ids)[keep]
+
+    profiles, ranked_ids, ranked_scores = {}, [], []
+    for target, was_seen in zip([t for t, kept in zip(candidates, keep) if kept], seen_mask):
+        try:
+            scores = score_candidate(me, target)
+        except Exception as e:
+            # 특정 유저 계산 중 에러가 나도 멈추지 않고 건너뜀 (서버 안정성)
+            print(f"[Error] 사용자 {target.user_id} 매칭 계산 중 에러: {e}")
+            continue
+        if was_seen:
+            scores = (scores[0] * SEEN_SCORE_FACTOR, *scores[1:])
+        profiles[target.user_id] = target
+        ranked_ids.append(target.user_id)
+        ranked_scores.append(scores)
+
+    # 점수 높은 순 (같은 점수는 후보 순서 유지)
+    ranked_ids = np.array(ranked_ids, dtype=np.int64)
+    ranked_scores = np.array(ranked_scores, dtype=np.float64).reshape(-1, 4)
+    order = np.argsort(-ranked_scores[:, 0], kind="stable")[:SNAPSHOT_SIZE]
+
+    snapshot, _ = RecommendSnapshot.objects.update_or_create(
+        user=user,
+        defaults={
+            "params": params,
+            "user_ids": ranked_ids[order].tobytes(),
+            "scores": ranked_scores[order].tobytes(),
+            "computed_at": timezone.now(),
+        },
+    )
+    return snapshot, profiles
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_recommend_matches(request):
     """
     [GET] /api/match/recommend/
-    나와 이성인 유저 중
-    가중치 점수(사주+취향+거리)가 가장 높은 상위 10명을 반환
-    [GET] /api/recommend/
-    나와 이성(Opposite Gender)인 유저 중
-    가중치 점수(사주+취향+거리)가 가장 높은 상위 10명을 반환합니다.
+    나와 이성인 유저를 가중치 점수(사주+취향+거리)가 높은 순으로 10명씩 반환
+    - 전체 순위는 스냅샷(후보 ID + 점수)으로 RECOMMEND_SNAPSHOT_TTL초 동안 보관
+    - 다음 페이지: 응답 헤더 X-Next-Cursor 값을 ?cursor=로 전달 (점수 재계산 없음, 마지막 페이지면 헤더 없음)
+    - ?refresh=1: 스냅샷을 버리고 다시 계산 (만료되었거나 조건이 바뀌어도 다시 계산)
+    - ?limit=20: 페이지 크기 (1~50, 기본 10)
+    - ?min_age=25&max_age=32: 만 나이 범위(양 끝 포함)로 후보 제한 (생년월일이 없는 유저는 제외)
     """
+    try:
+        min_age = request.query_params.get("min_age")
+        max_age = request.query_params.get("max_age")
+        min_age = int(min_age) if min_age else None
+        max_age = int(max_age) if max_age else None
+        if (min_age is not None and min_age < 0) or (max_age is not None and max_age < 0):
+            raise ValueError
+        limit = min(50, max(1, int(request.query_params.get("limit", PAGE_SIZE))))
+    except ValueError:
+        return Response(
+            {"error": "min_age, max_age, limit는 0 이상의 숫자여야 합니다."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        try:
+            stamp, offset = (int(part) for part in cursor.split(":"))
+            if offset < 0:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"error": "잘못된 cursor 값입니다."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
     try:
         me = request.user.profile
         # 성별 정보 확인
@@ -97,82 +260,111 @@ def get_recommend_matches(request):
 
     # 1. 이성 필터링 (남 -> 여 / 여 -> 남)
     target_gender = '여성' if me.gender == '남성' else '남성'
+    params = f"{min_age or ''}-{max_age or ''}"
 
-    # 2. 매칭 후보군 가져오기 (나 제외 + 이성만)
-    candidates = UserProfile.objects.exclude(user=request.user).filter(gender=target_gender)
+    impression = RecommendImpression.objects.filter(user=request.user).first()
+    seen = UserIdBitset.from_bytes(impression.seen if impression else b"")
+    skipped = UserIdBitset.from_bytes(impression.skipped if impression else b"")
 
-    match_results = []
+    # 2. 순위 스냅샷 (다음 페이지 요청이면 기존 스냅샷, 아니면 유효한 스냅샷이 없을 때만 새로 계산)
+    snapshot = RecommendSnapshot.objects.filter(user=request.user).first()
+    usable = snapshot is not None and snapshot.params == params and snapshot.is_fresh(SNAPSHOT_TTL)
+    profiles = None
+    if cursor:
+        if not usable or snapshot.stamp != stamp:
+            return Response(
+                {"error": "추천 목록이 만료되었습니다. 처음부터 다시 요청해 주세요."},
+                status=status.HTTP_410_GONE
+            )
+    else:
+        offset = 0
+        if not usable or request.query_params.get("refresh") in ("1", "true"):
+            snapshot, profiles = build_recommend_snapshot(
+                request.user, me, target_gender, min_age, max_age, params, seen, skipped
+            )
 
-    # 3. 점수 계산 Loop
-    for target in candidates:
-        try:
-            # 사주 점수 (0.4)
-            saju_score = calculate_compatibility_score(me, target)
-
-            # 취향 점수 (0.5)
-            interest_score = get_interest_score(me.hobbies, target.hobbies)
-
-            # 거리 점수 (0.1)
-            # 내 좌표 확인
-            if me.latitude is not None and me.longitude is not None:
-                my_coord = (me.latitude, me.longitude)
-            else:
-                my_coord = None
-
-            # 상대 좌표 확인
-            if target.latitude is not None and target.longitude is not None:
-                target_coord = (target.latitude, target.longitude)
-            else:
-                target_coord = None
-
-            # 거리 계산 (둘 다 좌표가 있을 때만)
-            dist_km = 0
-            geo_raw_score = 5 # 기본 점수
-
-            if my_coord and target_coord:
-                dist_km = calculate_distance(my_coord, target_coord)
-                geo_raw_score = get_distance_score(dist_km)
-
-            # 100점 만점 환산
-            geo_score_100 = geo_raw_score * 10
-
-            # 총점 계산
-            # 사주(0.4) + 취향(0.5) + 거리(0.1)
-            total_score = (saju_score * 0.4) + (interest_score * 0.5) + (geo_score_100 * 0.1)
-
-            # 결과 리스트에 추가
-            match_results.append({
-                "user_id": target.user.id,
-                "nickname": target.nickname,
-                "gender": target.gender,
-                "age": target.age if target.age else "?",
-                "mbti": target.mbti,
-                "job": target.job,
-                "location": f"{target.location_city} {target.location_district}",
-                "total_score": round(total_score, 1),
-                "scores": {
-                    "saju": saju_score,
-                    "interest": interest_score,
-                    "distance": geo_score_100
-                },
-                "info": {
-                    "distance_km": f"{dist_km:.1f}km" if (my_coord and target_coord) else "알수없음",
-                    "common_hobbies": list(set(me.hobbies or []) & set(target.hobbies or []))
-                },
-                "profile_image": target.images.first().image.url if target.images.exists() else None
-            })
+    # 3. 이번 페이지 (스냅샷 이후에 건너뛰었거나 후보 조건에서 빠진 상대는 제외)
+    ranked_ids, ranked_scores = snapshot.ranking()
+    page_ids = ranked_ids[offset:offset + limit]
+    page_scores = ranked_scores[offset:offset + limit]
+    keep = ~skipped.mask(page_ids)
+    if profiles is None:
+        profiles = {
+            target.user_id: target
+            for target in recommend_candidates(request.user, target_gender, min_age, max_age)
+            .filter(user_id__in=page_ids[keep].tolist())
+        }
+    page = [
+        (profiles[user_id], scores)
+        for user_id, scores, kept in zip(page_ids.tolist(), page_scores, keep)
+        if kept and user_id in profiles
+    ]
+    results = [match_result(me, target, scores) for target, scores in page]
 
-        except Exception as e:
-            # 특정 유저 계산 중 에러가 나도 멈추지 않고 건너뜀 (서버 안정성)
-            print(f"[Error] 사용자 {target.user.id} 매칭 계산 중 에러: {e}")
-            continue
+    # 4. 추천된 상대의 프로필 응답을 미리 캐시 (상세 화면 진입 시 바로 응답, 추가 쿼리 없음)
+    profile_cache.warm([target for target, _ in page])
 
-    # 4. 정렬 및 상위 10명 추출
-    # 점수 높은 순(내림차순) 정렬
-    match_results.sort(key=lambda x: x['total_score'], reverse=True)
+    # 5. 이번에 보여준 상대를 노출 기록에 추가
+    # 동시에 들어온 다른 추천/건너뛰기 요청의 기록을 덮어쓰지 않도록 잠근 행을 다시 읽어서 합침
+    if results:
+        with transaction.atomic():
+            impression, _ = RecommendImpression.objects.select_for_update().get_or_create(user=request.user)
+            seen = UserIdBitset.from_bytes(impression.seen)
+            seen.add([result["user_id"] for result in results])
+            impression.seen = seen.to_bytes()
+            impression.save(update_fields=["seen", "updated_at"])
 
-    # 상위 10명 자르기
-    top_10 = match_results[:10]
+    response = Response(results, status=status.HTTP_200_OK)
+    if offset + limit < len(ranked_ids):
+        response["X-Next-Cursor"] = f"{snapshot.stamp}:{offset + limit}"
+    return response
 
-    return Response(top_10, status=status.HTTP_200_OK)
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def skip_recommend(request, target_id):
+    """
+    [POST] /api/match/recommend/skip/<target_id>/
+    추천된 상대 건너뛰기 (다음 추천부터 후보에서 제외)
+    """
+    if target_id == request.user.id:
+        return Response(
+            {"error": "자기 자신은 건너뛸 수 없습니다."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not User.objects.filter(id=target_id).exists():
+        return Response(
+            {"error": "사용자를 찾을 수 없습니다."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    with transaction.atomic():
+        impression, _ = RecommendImpression.objects.select_for_update().get_or_create(user=request.user)
+        skipped = UserIdBitset.from_bytes(impression.skipped)
+        skipped.add([target_id])
+        impression.skipped = skipped.to_bytes()
+        impression.save(update_fields=["skipped", "updated_at"])
+
+    return Response(
+        {"message": "추천에서 제외했습니다.", "skipped_count": len(skipped)},
+        status=status.HTTP_200_OK
+    )
+
+
+def metrics_view(request):
+    """
+    [GET] /api/metrics/
+    Prometheus 텍스트 형식 지표 (요청 처리 시간, DB 쿼리, 외부 호출, 웹소켓 이벤트 / 이 워커 프로세스 기준)
+    - METRICS_TOKEN이 있으면 Authorization: Bearer <토큰>으로 접근 (수집기용)
+    - 관리자 세션, 또는 토큰이 없는 DEBUG 환경에서도 접근 가능
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    auth = request.headers.get('Authorization', '')
+    allowed = (
+        (token and hmac.compare_digest(auth, f"Bearer {token}"))
+        or request.user.is_staff
+        or (not token and settings.DEBUG)
+    )
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
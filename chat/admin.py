@@ -1,7 +1,7 @@
 # chat/admin.py
 
 from django.contrib import admin
-from .models import ChatRoom, Message, Block
+from .models import ChatRoom, Message, Block, RoomReadState, SyncEvent, SyncPruneMark, MessageArchiveSegment
 
 @admin.register(ChatRoom)
 class ChatRoomAdmin(admin.ModelAdmin):
@@ -22,4 +22,24 @@ class MessageAdmin(admin.ModelAdmin):
 
 @admin.register(Block)
 class BlockAdmin(admin.ModelAdmin):
-    list_display = ['id', 'blocker', 'blocked', 'created_at']
\ No newline at end of file
+    list_display = ['id', 'blocker', 'blocked', 'created_at']
+
+@admin.register(RoomReadState)
+class RoomReadStateAdmin(admin.ModelAdmin):
+    list_display = ['id', 'room', 'user', 'last_read_message_id', 'unread_count', 'updated_at']
+    list_select_related = ['user']
+
+@admin.register(SyncEvent)
+class SyncEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'kind', 'room_id', 'message_id', 'created_at']
+    list_filter = ['kind']
+    list_select_related = ['user']
+
+@admin.register(SyncPruneMark)
+class SyncPruneMarkAdmin(admin.ModelAdmin):
+    list_display = ['user', 'pruned_upto']
+
+@admin.register(MessageArchiveSegment)
+class MessageArchiveSegmentAdmin(admin.ModelAdmin):
+    list_display = ['id', 'room', 'first_message_id', 'last_message_id', 'message_count', 'last_timestamp', 'created_at']
+    readonly_fields = ['room', 'first_message_id', 'last_message_id', 'first_timestamp', 'last_timestamp', 'message_count', 'file']
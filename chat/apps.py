@@ -6,3 +6,7 @@ from django.apps import AppConfig
 class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chat'
+
+    def ready(self):
+        # 차단 관계 캐시 무효화 / 차단 알림 시그널 등록
+        import chat.signals
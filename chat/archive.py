@@ -0,0 +1,252 @@
+# chat/archive.py
+
+import gzip
+import json
+import time
+from datetime import timedelta
+from threading import Lock
+
+from cachetools import LRUCache
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from .models import Message, MessageArchiveSegment
+from .serializers import MessageSerializer
+
+# 이 기간(일)보다 오래된 메시지를 DB에서 아카이브 파일로 옮김
+ARCHIVE_AFTER_DAYS = getattr(settings, 'CHAT_ARCHIVE_AFTER_DAYS', 180)
+# 파일 하나에 담을 최대 메시지 수
+SEGMENT_SIZE = getattr(settings, 'CHAT_ARCHIVE_SEGMENT_SIZE', 1000)
+# 한 번에 지울 메시지 수 (쓰기 잠금을 짧게 유지)
+DELETE_BATCH_SIZE = getattr(settings, 'CHAT_ARCHIVE_DELETE_BATCH', 500)
+
+_IMAGE_FIELDS = ('image', 'image_thumbnail', 'image_display')
+_timestamp_field = serializers.DateTimeField()
+
+# 읽은 아카이브 파일 캐시 (파일은 만든 뒤 바뀌지 않음)
+_segment_cache = LRUCache(maxsize=getattr(settings, 'CHAT_ARCHIVE_CACHE_SEGMENTS', 64))
+_cache_lock = Lock()
+
+
+def _row(msg):
+    """Message -> 아카이브 한 줄 (이미지는 URL이 아닌 저장 경로로 보관)"""
+    row = {
+        "id": msg.id,
+        "sender": msg.sender_id,
+        "content": msg.content,
+        "timestamp": msg.timestamp.isoformat(),
+    }
+    for field in _IMAGE_FIELDS:
+        row[field] = getattr(msg, field).name or None
+    return row
+
+
+def message_data(row):
+    """아카이브 한 줄 -> MessageSerializer와 같은 형태"""
+    data = {
+        "message_id": row["id"],
+        "sender": row["sender"],
+        "content": row["content"],
+    }
+    for field in _IMAGE_FIELDS:
+        data[field] = default_storage.url(row[field]) if row.get(field) else None
+    data["timestamp"] = _timestamp_field.to_representation(parse_datetime(row["timestamp"]))
+    return data
+
+
+def read_segment(segment):
+    """아카이브 파일의 메시지 목록 (id 오름차순)"""
+    key = (segment.id, segment.file.name)
+    with _cache_lock:
+        rows = _segment_cache.get(key)
+    if rows is None:
+        with segment.file.open('rb') as f:
+            rows = [json.loads(line) for line in gzip.decompress(f.read()).splitlines() if line]
+        with _cache_lock:
+            _segment_cache[key] = rows
+    return rows
+
+
+def archived_upto(room_id):
+    """이 방에서 아카이브된 마지막 메시지 ID (이 ID 이하는 모두 아카이브에 있음)"""
+    return MessageArchiveSegment.objects.filter(room_id=room_id).aggregate(
+        upto=Max('last_message_id')
+    )['upto'] or 0
+
+
+def _delete_in_batches(ids, batch_size, sleep):
+    for start in range(0, len(ids), batch_size):
+        with transaction.atomic():
+            Message.objects.filter(id__in=ids[start:start + batch_size]).delete()
+        if sleep:
+            time.sleep(sleep)
+
+
+def expired_room_ids(cutoff):
+    """cutoff보다 오래된 메시지가 남아 있는 방 ID 목록"""
+    return list(
+        Message.objects.filter(timestamp__lt=cutoff)
+        .order_by()
+        .values_list('room_id', flat=True)
+        .distinct()
+    )
+
+
+def archive_room(room_id, cutoff, segment_size=SEGMENT_SIZE, batch_size=DELETE_BATCH_SIZE, sleep=0):
+    """
+    방의 오래된 메시지를 id 순으로 segment_size개씩 파일로 옮기고 DB에서 삭제
+    - 항상 앞에서부터 끊김 없이 옮김 (archived_upto 이하 = 아카이브, 초과 = DB)
+    - 파일/구간 기록이 먼저 커밋되고 삭제는 나중에 하므로, 중간에 멈춰도 다음 실행에서 남은 행만 지움
+    - 옮긴 메시지는 내역 조회(history_page/full_history)와 채팅방 목록의 마지막 메시지에서는 그대로 보이지만,
+      전문 검색 대상에서는 빠지고 동기화 기록(SyncEvent)에서는 "message": None이 됨
+      (동기화 기록은 보관 기간이 더 짧아 보통은 먼저 삭제됨)
+    Return: (만든 파일 수, 옮긴 메시지 수)
+    """
+    upto = archived_upto(room_id)
+
+    # 1. 지난 실행에서 파일로 옮겼지만 아직 지우지 못한 행 정리
+    leftover = list(Message.objects.filter(room_id=room_id, id__lte=upto).values_list('id', flat=True))
+    _delete_in_batches(leftover, batch_size, sleep)
+
+    segments = 0
+    archived = 0
+    while True:
+        # 2. 다음 구간: cutoff 이전 메시지가 끊기는 지점까지
+        candidates = Message.objects.filter(room_id=room_id, id__gt=upto).order_by('id')[:segment_size]
+        messages = []
+        for msg in candidates:
+            if msg.timestamp >= cutoff:
+                break
+            messages.append(msg)
+        if not messages:
+            break
+
+        # 3. 파일 저장 + 구간 기록 (기록을 저장하지 못하면 방금 쓴 파일을 지움)
+        first, last = messages[0], messages[-1]
+        payload = "\n".join(json.dumps(_row(msg), ensure_ascii=False) for msg in messages)
+        segment = MessageArchiveSegment(
+            room_id=room_id,
+            first_message_id=first.id,
+            last_message_id=last.id,
+            first_timestamp=first.timestamp,
+            last_timestamp=last.timestamp,
+            message_count=len(messages),
+        )
+        segment.file.save(
+            f"{room_id}/{first.id}-{last.id}.jsonl.gz",
+            ContentFile(gzip.compress(payload.encode('utf-8'))),
+            save=False,
+        )
+        try:
+            segment.save()
+        except BaseException:
+            segment.file.delete(save=False)
+            raise
+
+        # 4. DB에서 작은 단위로 삭제
+        _delete_in_batches([msg.id for msg in messages], batch_size, sleep)
+
+        segments += 1
+        archived += len(messages)
+        upto = last.id
+        if len(messages) < segment_size:
+            break
+
+    return segments, archived
+
+
+def archive_expired(days=ARCHIVE_AFTER_DAYS, segment_size=SEGMENT_SIZE, batch_size=DELETE_BATCH_SIZE, sleep=0, progress=None):
+    """
+    days보다 오래된 메시지를 모든 방에서 아카이브
+    progress: (방 ID, 파일 수, 메시지 수)를 받는 콜백
+    Return: (만든 파일 수, 옮긴 메시지 수)
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    total_segments = 0
+    total_messages = 0
+    for room_id in expired_room_ids(cutoff):
+        segments, archived = archive_room(room_id, cutoff, segment_size, batch_size, sleep)
+        total_segments += segments
+        total_messages += archived
+        if progress:
+            progress(room_id, segments, archived)
+    return total_segments, total_messages
+
+
+def history_page(room, before=None, limit=50):
+    """
+    before 이전 메시지 limit개 (시간순). DB에 없는 구간은 아카이브 파일에서 이어서 읽음
+    Return: (메시지 목록, 더 이전 메시지 존재 여부)
+    """
+    hot = Message.objects.filter(room=room)
+    if before is not None:
+        hot = hot.filter(id__lt=before)
+    hot = list(hot.order_by('-id')[:limit + 1])
+    results = list(MessageSerializer(hot, many=True).data)
+
+    if len(results) <= limit:
+        # DB 메시지를 다 읽었으면 아카이브에서 최신 구간부터 거꾸로 채움
+        upper = hot[-1].id if hot else before
+        segments = MessageArchiveSegment.objects.filter(room=room).order_by('-last_message_id')
+        if upper is not None:
+            segments = segments.filter(first_message_id__lt=upper)
+        for segment in segments:
+            for row in reversed(read_segment(segment)):
+                if upper is None or row["id"] < upper:
+                    results.append(message_data(row))
+                    if len(results) > limit:
+                        break
+            if len(results) > limit:
+                break
+
+    has_more = len(results) > limit
+    results = results[:limit]
+    results.reverse()
+    return results, has_more
+
+
+def full_history(room):
+    """방의 메시지 전체 (아카이브 + DB, 시간순)"""
+    results = []
+    upto = 0
+    for segment in MessageArchiveSegment.objects.filter(room=room).order_by('first_message_id'):
+        results.extend(message_data(row) for row in read_segment(segment))
+        upto = segment.last_message_id
+    # 아카이브로 옮겼지만 아직 지우지 못한 행은 제외
+    hot = Message.objects.filter(room=room, id__gt=upto)
+    results.extend(MessageSerializer(hot, many=True).data)
+    return results
+
+
+def last_messages(segment_ids):
+    """아카이브 구간별 마지막 메시지 (채팅방 목록용). Return: {구간 ID: 아카이브 한 줄}"""
+    if not segment_ids:
+        return {}
+    return {
+        segment.id: read_segment(segment)[-1]
+        for segment in MessageArchiveSegment.objects.filter(id__in=segment_ids)
+    }
+
+
+def load_messages(room_id, message_ids):
+    """아카이브된 메시지를 ID로 조회. Return: {id: 아카이브 한 줄}"""
+    if not message_ids:
+        return {}
+    wanted = set(message_ids)
+    segments = MessageArchiveSegment.objects.filter(
+        room_id=room_id,
+        first_message_id__lte=max(wanted),
+        last_message_id__gte=min(wanted),
+    )
+    found = {}
+    for segment in segments:
+        for row in read_segment(segment):
+            if row["id"] in wanted:
+                found[row["id"]] = row
+    return found
@@ -0,0 +1,72 @@
+# chat/block_cache.py
+
+from threading import Lock
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.db.models import Q
+
+from api import invalidation_utils
+from .models import Block
+
+# 유저별 차단 관계 캐시 유효 시간(초)
+# 차단/해제 시 이 프로세스는 시그널로 바로, 다른 워커는 커밋 후 채널 레이어 알림(invalidation_utils)으로 무효화
+# 알림 구독이 확인되지 않은 동안에는 캐시를 쓰지 않고 DB를 조회하므로, TTL은 알림이 유실된 경우의 상한
+BLOCK_CACHE_TTL = getattr(settings, 'CHAT_BLOCK_CACHE_TTL', 300)
+BLOCK_CACHE_SIZE = getattr(settings, 'CHAT_BLOCK_CACHE_SIZE', 50000)
+
+# user_id -> 내가 차단했거나 나를 차단한 유저 ID 집합
+_sets = TTLCache(maxsize=BLOCK_CACHE_SIZE, ttl=BLOCK_CACHE_TTL)
+_lock = Lock()
+_generation = 0
+
+
+def get_block_set(user_id):
+    """user_id와 차단 관계(양방향)에 있는 유저 ID 집합 반환 (캐시에 없으면 쿼리 1번)"""
+    cacheable = invalidation_utils.can_cache()
+    if cacheable:
+        with _lock:
+            block_set = _sets.get(user_id)
+        if block_set is not None:
+            return block_set
+
+    generation = _generation
+    pairs = Block.objects.filter(
+        Q(blocker_id=user_id) | Q(blocked_id=user_id)
+    ).values_list('blocker_id', 'blocked_id')
+    block_set = frozenset(
+        blocked if blocker == user_id else blocker for blocker, blocked in pairs
+    )
+    with _lock:
+        if cacheable and generation == _generation:
+            _sets[user_id] = block_set
+    return block_set
+
+
+def is_blocked(user_a_id, user_b_id):
+    """두 사용자 간에 (어느 방향이든) 차단이 있는지 (캐시된 집합에서 O(1) 확인, 전송/조회/입장 권한 확인용)"""
+    return user_b_id in get_block_set(user_a_id)
+
+
+def invalidate(*user_ids):
+    """이 프로세스의 캐시에서 제거"""
+    global _generation
+    with _lock:
+        _generation += 1
+        for user_id in user_ids:
+            _sets.pop(user_id, None)
+
+
+def broadcast(*user_ids):
+    """다른 워커의 캐시에서도 제거 (트랜잭션 커밋 후 전송)"""
+    invalidation_utils.publish("block", list(user_ids))
+
+
+def clear():
+    global _generation
+    with _lock:
+        _generation += 1
+        _sets.clear()
+
+
+invalidation_utils.register("block", lambda user_ids: invalidate(*user_ids), clear)
@@ -1,15 +1,30 @@
 # chat/consumers.py
-import json
+import asyncio
+import time
+from urllib.parse import parse_qs
 
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
-from .models import ChatRoom, Message, Block # 모델 임포트
+from .models import ChatRoom, Message # 모델 임포트
+from . import block_cache, outbound, read_state, replay, throttling
+from .signals import user_group_name
+from api import json_utils
+from api.metrics import InstrumentedConsumerMixin
+from django.conf import settings
 from django.contrib.auth import get_user_model # User 모델 임포트 ( sender 저장용 )
-from django.db.models import Q
 
 User = get_user_model()
 
-class ChatConsumer(AsyncWebsocketConsumer):
+# 재연결 시 한 번에 재전송할 최대 메시지 수 (넘으면 최신 메시지만 보내고 truncated 표시)
+REPLAY_MAX_MESSAGES = getattr(settings, 'CHAT_REPLAY_MAX_MESSAGES', 200)
+# 읽음 표시 전달 최소 간격(초). 그 사이에 생긴 읽음 이벤트는 마지막 상태로 합쳐서 한 번에 보냄
+READ_RECEIPT_INTERVAL = getattr(settings, 'CHAT_READ_RECEIPT_INTERVAL', 1.0)
+
+class ChatConsumer(InstrumentedConsumerMixin, AsyncWebsocketConsumer):
+    # 송신 큐 설정 (하위 클래스에서 바꿀 수 있음)
+    outbound_queue_size = outbound.OUTBOUND_QUEUE_SIZE
+    outbound_policy = outbound.OUTBOUND_POLICY
+    send_timeout = outbound.SEND_TIMEOUT
 
     async def connect(self):
         self.user = self.scope["user"]
@@ -58,7 +73,42 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.room_group_name,
             self.channel_name,
         )
+        # 연결 중에 차단이 생기면 바로 알 수 있도록 내 유저 그룹에도 가입
+        self.user_group_name = user_group_name(self.user.id)
+        await self.channel_layer.group_add(
+            self.user_group_name,
+            self.channel_name,
+        )
+
+        # 5. 최근 메시지 버퍼 구독 (그룹 가입 이후의 이벤트만 버퍼에 쌓이므로, 가입 후 시작점을 잡음)
+        latest_message_id = await self.get_latest_message_id(self.room)
+        if replay.subscribe(self.room.id):
+            replay.init(self.room.id, latest_message_id)
+        self.replay_subscribed = True
+        # 마지막 재전송(replay_missed)에서 보낸 message_id (실시간 프레임으로 또 오면 건너뜀)
+        self.replayed_ids = set()
+        # 연결별 전송 속도 제한 버킷 (메시지 / 읽음 처리)
+        self.rate_bucket = throttling.socket_bucket()
+        self.read_bucket = throttling.read_bucket()
+        # 읽음 처리 상태 (내가 마지막으로 처리한 읽음 위치, 이 연결이 아는 방의 마지막 메시지, 참여자별 읽음 위치)
+        self.last_read_ack = 0
+        self.latest_message_id = latest_message_id or 0
+        self.read_positions = {}
+        self.receipt_task = None
+        self.last_receipt_at = 0.0
+
+        # 6. 송신 큐 (느린 클라이언트 때문에 보낼 프레임이 무한히 쌓이지 않도록 크기 제한)
+        self.outbound = outbound.OutboundQueue(self.outbound_queue_size, self.outbound_policy)
+        # 재연결이면(?last_message_id=N) 놓친 메시지부터 보낸 뒤 실시간 전송으로 전환
+        last_message_id = self.get_last_message_id()
+        if last_message_id is not None:
+            self.last_sent_message_id = last_message_id
+            self.outbound.put_resync()
+        else:
+            self.last_sent_message_id = latest_message_id
+
         await self.accept()
+        self.sender_task = asyncio.create_task(self.send_outbound())
         print(f"[연결 성공] Room #{self.room.id} (User {self.user.id} <-> User {self.target_id})")
 
     async def disconnect(self, close_code):
@@ -67,56 +117,239 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 self.room_group_name,
                 self.channel_name,
             )
+        if hasattr(self, "user_group_name"):
+            await self.channel_layer.group_discard(
+                self.user_group_name,
+                self.channel_name,
+            )
+        if getattr(self, "replay_subscribed", False):
+            replay.unsubscribe(self.room.id)
+            self.replay_subscribed = False
+        if getattr(self, "sender_task", None) is not None:
+            self.sender_task.cancel()
+            self.sender_task = None
+        if getattr(self, "receipt_task", None) is not None:
+            self.receipt_task.cancel()
+            self.receipt_task = None
+
+    async def enqueue(self, frame, key=None):
+        """송신 큐에 프레임 추가 (disconnect 정책에서 큐가 가득 차면 연결 종료)"""
+        try:
+            self.outbound.put(frame, key)
+        except outbound.QueueFull:
+            print(f"[송신 지연] User {self.user.id}의 송신 큐가 가득 차 연결을 종료합니다.")
+            await self.close(code=4008)
+
+    async def send_frame(self, frame):
+        """프레임 하나 전송 (SEND_TIMEOUT 안에 못 보내면 asyncio.TimeoutError)"""
+        await asyncio.wait_for(self.send(text_data=json_utils.dumps(frame)), self.send_timeout)
+
+    async def send_outbound(self):
+        """송신 큐에서 프레임을 하나씩 꺼내 전송하는 연결별 백그라운드 작업"""
+        try:
+            while True:
+                frame = await self.outbound.get()
+
+                # 재동기화: 마지막으로 보낸 메시지 이후 내역을 버퍼/DB에서 다시 보냄
+                if frame is outbound.RESYNC:
+                    await self.replay_missed(self.last_sent_message_id)
+                    continue
+
+                message_id = frame.get("message_id")
+                # 재전송으로 실제로 보낸 메시지만 건너뜀
+                # (id 순서로 거르면 순서가 뒤바뀌어 도착한 실시간 메시지가 빠짐)
+                if message_id in self.replayed_ids:
+                    self.replayed_ids.discard(message_id)
+                    continue
+
+                await self.send_frame(frame)
+                if message_id is not None:
+                    self.last_sent_message_id = max(self.last_sent_message_id, message_id)
+        except asyncio.TimeoutError:
+            outbound.record("send_timeouts")
+            print(f"[송신 지연] User {self.user.id}에게 {self.send_timeout}초 동안 전송하지 못해 연결을 종료합니다.")
+            await self.close(code=4008)
+        except Exception as e:
+            # 송신 작업이 끝나면 이후 프레임이 쌓이기만 하므로 연결을 닫아 재연결하게 함
+            print(f"[송신 오류] User {self.user.id}: {e}")
+            await self.close(code=1011)
+
+    def get_last_message_id(self):
+        """쿼리 스트링의 last_message_id 파싱 (없거나 잘못된 값이면 None)"""
+        query_params = parse_qs(self.scope.get("query_string", b"").decode())
+        try:
+            return int(query_params.get("last_message_id", [None])[0])
+        except (TypeError, ValueError):
+            return None
+
+    async def replay_missed(self, last_message_id):
+        """last_message_id 이후 놓친 메시지 재전송 (버퍼 우선, 부족하면 DB)"""
+        truncated = False
+        events = replay.events_since(self.room.id, last_message_id)
+
+        if events is None:
+            events, truncated = await self.get_messages_after(self.room, last_message_id)
+            if not truncated:
+                # 빈틈 없이 읽어온 결과이므로 다음 재연결을 위해 버퍼에도 채워둠
+                replay.backfill(self.room.id, events, last_message_id)
+        elif len(events) > REPLAY_MAX_MESSAGES:
+            events = events[-REPLAY_MAX_MESSAGES:]
+            truncated = True
+
+        # 재전송할 때마다 새로 채우므로 크기는 REPLAY_MAX_MESSAGES 이하로 유지됨
+        self.replayed_ids = {event["message_id"] for event in events}
+        for event in events:
+            await self.send_frame(event)
+            self.last_sent_message_id = max(self.last_sent_message_id, event["message_id"])
+            self.latest_message_id = max(self.latest_message_id, event["message_id"])
+
+        await self.send_frame(
+            {
+                "type": "replay_done",
+                "count": len(events),
+                "truncated": truncated,  # True면 그 이전 내역은 history API로 받아야 함
+            }
+        )
 
     async def receive(self, text_data):
         """웹소켓으로 들어온 메시지를 처리하는 함수"""
         try:
-            payload = json.loads(text_data)
+            payload = json_utils.loads(text_data)
+        except ValueError as e:
+            print(f" [WebSocket Error] {e}")
+            return
+        if not isinstance(payload, dict):
+            return
+
+        # 읽음 처리 프레임: {"type": "read", "message_id": N} (message_id 생략 시 마지막 메시지까지)
+        if payload.get("type") == "read":
+            await self.handle_read(payload.get("message_id"))
+            return
+
+        # 0. 전송 속도 제한 (연결별 + 유저별). 초과 프레임은 처리하지 않고 에러 프레임만 보냄
+        if not throttling.allow_frame(self.rate_bucket, self.user.id):
+            await self.enqueue(
+                {
+                    "type": "error",
+                    "code": "rate_limited",
+                    "message": "메시지를 너무 빠르게 보내고 있습니다. 잠시 후 다시 시도해주세요.",
+                },
+                key="rate_limited",  # 아직 못 보낸 같은 에러는 하나로 합침
+            )
+            return
+
+        try:
             message_content = payload.get("message", "").strip()
 
             # 빈 메시지는 무시
             if not message_content:
                 return
 
-            # 1. DB에 저장
+            # 1. DB에 저장 (저장 직전에 차단 여부를 다시 확인)
             new_msg = await self.save_message(self.room, self.user, message_content)
+            if new_msg is None:
+                print(f"[차단됨] User {self.user.id}와 {self.target_id}는 차단 관계입니다. 연결을 종료합니다.")
+                await self.close(code=4003)
+                return
 
-            # 2. 채팅방에 메시지 보내긱
+            # 2. 채팅방에 메시지 보내긱 (웹소켓 전송은 이미지 불가, 편의상 username 보냄)
             await self.channel_layer.group_send(
                 self.room_group_name,
                 {
                     "type": "chat_message",
-                    "message": new_msg.content,
-                    "sender": self.user.id,
-                    "sender_name": self.user.username,  # 편의상 username 보냄
-                    "image": None,  # 웹소켓 전송은 이미지 불가
-                    "timestamp": str(new_msg.timestamp)
+                    **replay.message_event(new_msg, self.user.username),
                 }
             )
         except Exception as e:
             print(f" [WebSocket Error] {e}")
 
     async def chat_message(self, event):
+        message_id = event.get("message_id")
+
+        # 재연결용 버퍼에 기록 (재전송분과의 중복 제거는 송신 작업에서 처리)
+        if message_id is not None:
+            replay.remember(self.room.id, {k: v for k, v in event.items() if k != "type"})
+            self.latest_message_id = max(self.latest_message_id, message_id)
+
         # 1. 이벤트에서 데이터 추출
         message = event.get("message", "")
         sender = event.get("sender", "알 수 없음")
         image = event.get("image", None)
+        image_thumbnail = event.get("image_thumbnail", None)
+        image_display = event.get("image_display", None)
         timestamp = event.get("timestamp", "")
 
         sender_name = event.get("sender_name", sender)
 
-        await self.send(
-            text_data=json.dumps(
-                {
-                    "message": message,
-                    "sender": sender,
-                    "sender_name": sender_name,
-                    "image": image,
-                    "timestamp": timestamp
-                }
-            )
+        # 바로 보내지 않고 송신 큐에 넣음 (느린 클라이언트가 이벤트 처리를 막지 않도록)
+        await self.enqueue(
+            {
+                "message_id": message_id,
+                "message": message,
+                "sender": sender,
+                "sender_name": sender_name,
+                "image": image,
+                "image_thumbnail": image_thumbnail,
+                "image_display": image_display,
+                "timestamp": timestamp
+            }
         )
 
+    async def handle_read(self, message_id):
+        """
+        읽음 처리 (DB 쓰기가 생기므로 읽음 버킷으로 속도 제한)
+        이 연결이 아는 마지막 메시지 이후로 읽을 것이 없으면 DB 조회 없이 무시
+        """
+        if message_id is None:
+            message_id = self.latest_message_id
+        try:
+            message_id = min(int(message_id), self.latest_message_id)
+        except (TypeError, ValueError):
+            return
+        if message_id <= self.last_read_ack:
+            return
+        # 초과 프레임은 버림 (읽음 위치는 다음 프레임에서 한 번에 따라잡음)
+        if not throttling.allow_read(self.read_bucket):
+            return
+
+        acked = await self.mark_read(message_id)
+        if acked:
+            self.last_read_ack = acked
+
+    async def read_receipt(self, event):
+        """읽음 표시 이벤트 (연결마다 READ_RECEIPT_INTERVAL에 최대 1번, 그 사이 이벤트는 합쳐서 전달)"""
+        self.read_positions[event["user_id"]] = event["last_read_message_id"]
+        if self.receipt_task is None:
+            delay = self.last_receipt_at + READ_RECEIPT_INTERVAL - time.monotonic()
+            self.receipt_task = asyncio.create_task(self.flush_read_receipts(max(0.0, delay)))
+
+    async def flush_read_receipts(self, delay):
+        if delay:
+            await asyncio.sleep(delay)
+        self.receipt_task = None
+        self.last_receipt_at = time.monotonic()
+        # 참여자별 최신 위치를 모두 담으므로, 송신 큐에서 이전 프레임을 덮어써도 정보가 빠지지 않음
+        await self.enqueue(
+            {
+                "type": "read_receipt",
+                "room_id": self.room.id,
+                "receipts": [
+                    {"user_id": user_id, "last_read_message_id": message_id}
+                    for user_id, message_id in self.read_positions.items()
+                ],
+            },
+            key="read_receipt",
+        )
+
+    async def block_changed(self, event):
+        """차단/해제 이벤트 수신 (다른 워커에서 생긴 변경 포함)"""
+        block_cache.invalidate(event["blocker"], event["blocked"])
+
+        # 지금 대화 중인 상대와 차단 관계가 생기면 즉시 연결 종료
+        if event.get("blocked_now") and self.target_id in (event["blocker"], event["blocked"]):
+            print(f"[차단됨] User {self.user.id}와 {self.target_id}는 차단 관계입니다. 연결을 종료합니다.")
+            await self.close(code=4003)
+
     @database_sync_to_async
     def get_or_create_room(self, user1, user2):
         """DB에서 채팅방을 찾거나, 없으면 새로 생성함"""
@@ -129,10 +362,37 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def save_message(self, room, user, content):
-        """채팅 메시지를 DB에 저장함"""
+        """
+        채팅 메시지를 DB에 저장함
+        연결 중에 생긴 차단도 막도록 저장 직전에 차단 캐시로 확인하고, 차단 관계면 저장하지 않고 None
+        """
+        if block_cache.is_blocked(user.id, self.target_id):
+            return None
         msg = Message.objects.create(room=room, sender=user, content=content)
         return msg
 
+    @database_sync_to_async
+    def mark_read(self, message_id):
+        """읽음 위치 저장 + 방에 읽음 표시 전달"""
+        return read_state.mark_read(self.room.id, self.user.id, message_id)
+
+    @database_sync_to_async
+    def get_latest_message_id(self, room):
+        """방의 마지막 message_id (메시지가 없으면 0)"""
+        return Message.objects.filter(room=room).order_by("-id").values_list("id", flat=True).first() or 0
+
+    @database_sync_to_async
+    def get_messages_after(self, room, last_message_id):
+        """last_message_id 이후 메시지를 최대 REPLAY_MAX_MESSAGES개까지 (오래된 순) 반환"""
+        recent = list(
+            Message.objects.filter(room=room, id__gt=last_message_id)
+            .select_related("sender")
+            .order_by("-id")[:REPLAY_MAX_MESSAGES + 1]
+        )
+        truncated = len(recent) > REPLAY_MAX_MESSAGES
+        events = [replay.message_event(msg) for msg in reversed(recent[:REPLAY_MAX_MESSAGES])]
+        return events, truncated
+
     @database_sync_to_async
     def get_user_instance(self, user_id):
         """(비동기) ID로 유저 객체 가져오기"""
@@ -146,7 +406,4 @@ class ChatConsumer(AsyncWebsocketConsumer):
         """(비동기) 두 사용자 간에 차단이 있는지 확인"""
         if user1 is None or user2 is None:
             return True # 유저가 없을 시, 차단으로 간주
-        return Block.objects.filter(
-            Q(blocker=user1, blocked=user2) |
-            Q(blocker=user2, blocked=user1)
-        ).exists()
\ No newline at end of file
+        return block_cache.is_blocked(user1.id, user2.id)
\ No newline at end of file
@@ -0,0 +1,351 @@
+# chat/layers.py
+
+import asyncio
+import os
+import random
+import sqlite3
+import string
+import threading
+import time
+import uuid
+from copy import deepcopy
+
+import msgpack
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+
+class SQLiteChannelLayer(BaseChannelLayer):
+    """
+    외부 브로커 없이 같은 호스트의 여러 프로세스(daphne 워커) 사이에서 동작하는 채널 레이어
+    - 공유 SQLite(WAL) 파일 하나를 메시지 큐 / 그룹 테이블로 사용
+    - 같은 프로세스 안의 채널로 가는 메시지는 DB를 거치지 않고 바로 로컬 큐에 넣음
+    - 다른 프로세스의 채널로 가는 메시지는 DB에 쌓고, 받는 쪽 프로세스가 주기적으로 한 번에 가져감
+    - capacity(채널당 대기 메시지 수), expiry(메시지 유효 시간), group_expiry(그룹 가입 유효 시간) 정책 지원
+    """
+
+    extensions = ["groups", "flush"]
+
+    def __init__(
+        self,
+        path="channel_layer.sqlite3",
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        poll_interval=0.005,
+        max_poll_interval=0.05,
+        **kwargs,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity, **kwargs)
+        self.channel_capacity = self.compile_capacities(self.channel_capacity)
+        self.path = os.fspath(path)
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+
+        # 이 프로세스의 specific 채널 이름 접두사 ("specific.<client_prefix>!xxxx")
+        self.client_prefix = uuid.uuid4().hex[:12]
+        self._owners = set()
+        self._queues = {}
+        self._waiting = 0
+        self._poller = None
+        self._last_cleanup = 0.0
+
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    # --- SQLite 접근 (블로킹 함수는 스레드에서 실행) ---
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn):
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    owner TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    expires REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS messages_owner ON messages (owner, id);
+                CREATE INDEX IF NOT EXISTS messages_channel ON messages (channel);
+                CREATE TABLE IF NOT EXISTS groups (
+                    grp TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    expires REAL NOT NULL,
+                    PRIMARY KEY (grp, channel)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS groups_channel ON groups (channel);
+                """
+            )
+            self._schema_ready = True
+
+    def _db_insert(self, rows):
+        """rows: [(owner, channel, body, expires, capacity)] -> 가득 찬 채널 목록 반환"""
+        conn = self._connection()
+        now = time.time()
+        full = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            channels = list({row[1] for row in rows})
+            counts = {}
+            for i in range(0, len(channels), 500):
+                chunk = channels[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                counts.update(conn.execute(
+                    f"SELECT channel, COUNT(*) FROM messages WHERE channel IN ({marks}) AND expires > ? GROUP BY channel",
+                    (*chunk, now),
+                ).fetchall())
+
+            accepted = []
+            for owner, channel, body, expires, capacity in rows:
+                if counts.get(channel, 0) >= capacity:
+                    full.append(channel)
+                    continue
+                counts[channel] = counts.get(channel, 0) + 1
+                accepted.append((owner, channel, body, expires))
+            conn.executemany(
+                "INSERT INTO messages (owner, channel, body, expires) VALUES (?, ?, ?, ?)", accepted
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return full
+
+    def _db_take_owned(self, owners):
+        """
+        이 프로세스 소유 채널로 온 메시지를 한 번에 꺼내옴
+        RETURNING은 행 순서를 보장하지 않으므로 id(보낸 순서)로 정렬해서 반환
+        """
+        conn = self._connection()
+        marks = ",".join("?" * len(owners))
+        rows = conn.execute(
+            f"DELETE FROM messages WHERE owner IN ({marks}) RETURNING id, channel, body, expires", tuple(owners)
+        ).fetchall()
+        rows.sort()
+        return [row[1:] for row in rows]
+
+    def _db_take_one(self, channel):
+        """일반(프로세스 비소속) 채널에서 가장 오래된 메시지 하나를 꺼내옴"""
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "DELETE FROM messages WHERE id = ("
+            " SELECT id FROM messages WHERE owner = ? AND expires > ? ORDER BY id LIMIT 1"
+            ") RETURNING id, body",
+            (channel, now),
+        ).fetchone()
+        return row[1] if row else None
+
+    def _db_group_channels(self, group):
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT channel FROM groups WHERE grp = ? AND expires > ?", (group, time.time())
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _db_cleanup(self):
+        """만료된 메시지 삭제 + 메시지가 만료된(죽은) 채널은 모든 그룹에서 제거"""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM groups WHERE channel IN (SELECT DISTINCT channel FROM messages WHERE expires <= ?)",
+                (now,),
+            )
+            conn.execute("DELETE FROM messages WHERE expires <= ?", (now,))
+            conn.execute("DELETE FROM groups WHERE expires <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    # --- 직렬화 ---
+
+    def _serialize(self, message):
+        return msgpack.packb(message, use_bin_type=True)
+
+    def _deserialize(self, body):
+        return msgpack.unpackb(body, raw=False)
+
+    # --- 로컬 큐 ---
+
+    def _is_local(self, channel):
+        return "!" in channel and self.non_local_name(channel) in self._owners
+
+    def _local_queue(self, channel):
+        queue = self._queues.get(channel)
+        if queue is None:
+            queue = self._queues[channel] = asyncio.Queue()
+        return queue
+
+    def _put_local(self, channel, message, expires):
+        queue = self._local_queue(channel)
+        if queue.qsize() >= self.get_capacity(channel):
+            raise ChannelFull(channel)
+        queue.put_nowait((expires, deepcopy(message)))
+
+    def _clean_local(self):
+        """받는 쪽이 없는 로컬 큐에서 만료된 메시지와 빈 큐 정리"""
+        now = time.time()
+        for channel, queue in list(self._queues.items()):
+            while not queue.empty() and queue._queue[0][0] < now:
+                queue.get_nowait()
+            if queue.empty() and not queue._getters:
+                self._queues.pop(channel, None)
+
+    def _ensure_poller(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+
+    async def _poll(self):
+        """이 프로세스 소유 채널의 메시지를 DB에서 주기적으로 가져와 로컬 큐로 분배"""
+        interval = self.poll_interval
+        while self._waiting > 0:
+            rows = await self._run(self._db_take_owned, tuple(self._owners)) if self._owners else []
+            now = time.time()
+            for channel, body, expires in rows:
+                if expires > now:
+                    self._local_queue(channel).put_nowait((expires, self._deserialize(body)))
+
+            if now - self._last_cleanup > min(self.expiry, 10):
+                self._last_cleanup = now
+                self._clean_local()
+                await self._run(self._db_cleanup)
+
+            # 메시지가 있으면 바로 다시, 없으면 대기 간격을 늘려가며 폴링
+            interval = self.poll_interval if rows else min(interval * 2, self.max_poll_interval)
+            await asyncio.sleep(interval)
+
+    # --- Channel layer API ---
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        assert "__asgi_channel__" not in message
+
+        expires = time.time() + self.expiry
+        if self._is_local(channel):
+            self._put_local(channel, message, expires)
+            return
+
+        row = (self.non_local_name(channel), channel, self._serialize(message), expires, self.get_capacity(channel))
+        if await self._run(self._db_insert, [row]):
+            raise ChannelFull(channel)
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+
+        if "!" not in channel:
+            # 일반 채널: DB에서 직접 하나씩 꺼내옴
+            interval = self.poll_interval
+            while True:
+                body = await self._run(self._db_take_one, channel)
+                if body is not None:
+                    return self._deserialize(body)
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, self.max_poll_interval)
+
+        self._owners.add(self.non_local_name(channel))
+        queue = self._local_queue(channel)
+        self._waiting += 1
+        self._ensure_poller()
+        try:
+            while True:
+                expires, message = await queue.get()
+                if expires > time.time():
+                    return message
+        finally:
+            self._waiting -= 1
+            if queue.empty() and not queue._getters:
+                self._queues.pop(channel, None)
+
+    async def new_channel(self, prefix="specific"):
+        owner = f"{prefix}.{self.client_prefix}!"
+        self._owners.add(owner)
+        return owner + "".join(random.choice(string.ascii_letters) for _ in range(12))
+
+    # --- Flush extension ---
+
+    async def flush(self):
+        def _flush():
+            conn = self._connection()
+            conn.execute("DELETE FROM messages")
+            conn.execute("DELETE FROM groups")
+
+        self._queues = {}
+        await self._run(_flush)
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+    # --- Groups extension ---
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+
+        def _add():
+            self._connection().execute(
+                "INSERT OR REPLACE INTO groups (grp, channel, expires) VALUES (?, ?, ?)",
+                (group, channel, time.time() + self.group_expiry),
+            )
+
+        await self._run(_add)
+
+    async def group_discard(self, group, channel):
+        self.require_valid_channel_name(channel)
+        self.require_valid_group_name(group)
+
+        def _discard():
+            self._connection().execute(
+                "DELETE FROM groups WHERE grp = ? AND channel = ?", (group, channel)
+            )
+
+        await self._run(_discard)
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+
+        channels = await self._run(self._db_group_channels, group)
+        expires = time.time() + self.expiry
+        body = None
+        remote = []
+        for channel in channels:
+            if self._is_local(channel):
+                try:
+                    self._put_local(channel, message, expires)
+                except ChannelFull:
+                    pass
+                continue
+            if body is None:
+                body = self._serialize(message)
+            remote.append((self.non_local_name(channel), channel, body, expires, self.get_capacity(channel)))
+
+        # 그룹 전송은 가득 찬 채널을 조용히 건너뜀 (InMemoryChannelLayer와 동일)
+        if remote:
+            await self._run(self._db_insert, remote)
@@ -0,0 +1 @@
+# chat/management/__init__.py
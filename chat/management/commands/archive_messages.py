@@ -0,0 +1,43 @@
+# chat/management/commands/archive_messages.py
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from chat import archive
+from chat.models import Message
+
+
+class Command(BaseCommand):
+    help = "보관 기간이 지난 채팅 메시지를 방별 압축 파일로 옮기고 DB에서 나눠서 삭제 (트래픽이 적을 때 실행 권장)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=archive.ARCHIVE_AFTER_DAYS, help="이 기간(일)보다 오래된 메시지를 옮김")
+        parser.add_argument("--segment-size", type=int, default=archive.SEGMENT_SIZE, help="파일 하나당 최대 메시지 수")
+        parser.add_argument("--batch-size", type=int, default=archive.DELETE_BATCH_SIZE, help="한 번에 지울 메시지 수")
+        parser.add_argument("--sleep", type=float, default=0.05, help="삭제 배치 사이 대기 시간(초)")
+        parser.add_argument("--dry-run", action="store_true", help="옮길 메시지 수만 출력")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            cutoff = timezone.now() - timedelta(days=options["days"])
+            count = Message.objects.filter(timestamp__lt=cutoff).count()
+            rooms = len(archive.expired_room_ids(cutoff))
+            self.stdout.write(f"{options['days']}일 이전 메시지 {count}개 (방 {rooms}개)")
+            return
+
+        started = time.perf_counter()
+
+        def progress(room_id, segments, archived):
+            self.stdout.write(f"  방 #{room_id}: 메시지 {archived}개 -> 파일 {segments}개")
+
+        segments, archived = archive.archive_expired(
+            options["days"], options["segment_size"], options["batch_size"], options["sleep"], progress
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"메시지 {archived}개를 파일 {segments}개로 옮김 ({time.perf_counter() - started:.1f}초)"
+            )
+        )
@@ -0,0 +1,146 @@
+# chat/management/commands/bench_channel_layer.py
+
+import asyncio
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from channels.layers import InMemoryChannelLayer
+
+from chat.layers import SQLiteChannelLayer
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def receive_all(layer, groups, members, per_group, ready=None):
+    """그룹마다 members개 채널을 가입시키고, 채널별로 per_group개 메시지를 받아 지연시간(초) 목록 반환"""
+    channels = []
+    for g in range(groups):
+        for _ in range(members):
+            channel = await layer.new_channel()
+            await layer.group_add(f"bench_{g}", channel)
+            channels.append(channel)
+    if ready is not None:
+        ready.set()
+
+    async def drain(channel):
+        latencies = []
+        for _ in range(per_group):
+            try:
+                message = await asyncio.wait_for(layer.receive(channel), timeout=30)
+            except asyncio.TimeoutError:
+                break
+            latencies.append(time.time() - message["sent_at"])
+        return latencies
+
+    results = await asyncio.gather(*(drain(c) for c in channels))
+    return [lat for lats in results for lat in lats]
+
+
+def remote_receiver(path, groups, members, per_group, capacity, ready, out):
+    """다른 프로세스(워커)에서 수신 측 실행"""
+    layer = SQLiteChannelLayer(path=path, capacity=capacity)
+    latencies = asyncio.run(receive_all(layer, groups, members, per_group, ready))
+    out.put(latencies)
+
+
+async def send_all(layer, groups, messages):
+    for i in range(messages):
+        await layer.group_send(
+            f"bench_{i % groups}",
+            {"type": "chat_message", "message": f"bench {i}", "sent_at": time.time()},
+        )
+
+
+async def run_local(layer, groups, members, messages):
+    per_group = messages // groups
+    receiver = asyncio.ensure_future(receive_all(layer, groups, members, per_group))
+    # 수신 측 그룹 가입이 끝날 때까지 잠시 대기
+    await asyncio.sleep(0.2)
+    started = time.perf_counter()
+    await send_all(layer, groups, messages)
+    send_elapsed = time.perf_counter() - started
+    latencies = await receiver
+    total_elapsed = time.perf_counter() - started
+    return send_elapsed, total_elapsed, latencies
+
+
+class Command(BaseCommand):
+    help = "채널 레이어 fan-out 처리량/지연시간 벤치마크 (InMemory vs SQLite, 같은 프로세스 / 다른 프로세스)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--groups", type=int, default=20, help="방(그룹) 수")
+        parser.add_argument("--members", type=int, default=2, help="그룹당 연결(채널) 수")
+        parser.add_argument("--messages", type=int, default=2000, help="group_send 총 횟수")
+        parser.add_argument("--capacity", type=int, default=10000, help="채널당 capacity")
+
+    def handle(self, *args, **options):
+        groups = options["groups"]
+        members = options["members"]
+        messages = options["messages"] - options["messages"] % groups
+        capacity = options["capacity"]
+        per_group = messages // groups
+        expected = messages * members
+
+        rows = []
+
+        # 1. InMemoryChannelLayer (같은 프로세스만 가능)
+        layer = InMemoryChannelLayer(capacity=capacity)
+        rows.append(("inmemory / same process", *asyncio.run(run_local(layer, groups, members, messages))))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench_layer.sqlite3")
+
+            # 2. SQLiteChannelLayer, 수신 측이 같은 프로세스 (로컬 큐 직행 경로)
+            layer = SQLiteChannelLayer(path=path, capacity=capacity)
+            rows.append(("sqlite / same process", *asyncio.run(run_local(layer, groups, members, messages))))
+            asyncio.run(layer.flush())
+
+            # 3. SQLiteChannelLayer, 수신 측이 다른 프로세스 (DB 경유 경로)
+            ctx = multiprocessing.get_context("spawn")
+            ready = ctx.Event()
+            out = ctx.Queue()
+            proc = ctx.Process(
+                target=remote_receiver,
+                args=(path, groups, members, per_group, capacity, ready, out),
+            )
+            proc.start()
+            ready.wait(timeout=60)
+
+            layer = SQLiteChannelLayer(path=path, capacity=capacity)
+            started = time.perf_counter()
+            asyncio.run(send_all(layer, groups, messages))
+            send_elapsed = time.perf_counter() - started
+            latencies = out.get(timeout=120)
+            total_elapsed = time.perf_counter() - started
+            proc.join()
+            rows.append(("sqlite / cross process", send_elapsed, total_elapsed, latencies))
+
+        self.stdout.write(
+            f"groups={groups} members={members} group_sends={messages} expected_deliveries={expected}\n"
+        )
+        header = f"{'layer':<26}{'sends/s':>12}{'deliv/s':>12}{'lost':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, send_elapsed, total_elapsed, latencies in rows:
+            ms = [lat * 1000 for lat in latencies]
+            self.stdout.write(
+                f"{name:<26}"
+                f"{messages / send_elapsed:>12.0f}"
+                f"{len(latencies) / total_elapsed:>12.0f}"
+                f"{expected - len(latencies):>8}"
+                f"{percentile(ms, 50):>10.2f}"
+                f"{percentile(ms, 95):>10.2f}"
+                f"{percentile(ms, 99):>10.2f}"
+            )
+        if rows and rows[-1][3]:
+            self.stdout.write(f"\ncross-process mean latency: {statistics.mean(rows[-1][3]) * 1000:.2f} ms")
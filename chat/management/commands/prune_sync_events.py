@@ -0,0 +1,16 @@
+# chat/management/commands/prune_sync_events.py
+
+from django.core.management.base import BaseCommand
+
+from chat import sync
+
+
+class Command(BaseCommand):
+    help = "보관 기간이 지난 증분 동기화 기록 삭제 (그보다 오래된 커서는 reset 응답을 받음)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=sync.SYNC_RETENTION_DAYS, help="보관 기간(일)")
+
+    def handle(self, *args, **options):
+        deleted = sync.prune(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"동기화 기록 {deleted}개 삭제"))
@@ -0,0 +1,25 @@
+# chat/management/commands/rebuild_message_index.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chat import search
+
+
+class Command(BaseCommand):
+    help = "채팅 메시지 전문 검색(FTS5) 인덱스를 다시 생성 (한 트랜잭션으로 쓰기 잠금을 잡으므로 트래픽이 적을 때 실행 권장)"
+
+    def handle(self, *args, **options):
+        if not search.fts_available():
+            raise CommandError(
+                "FTS 인덱스가 없습니다. SQLite DB에서 'python manage.py migrate chat'을 먼저 실행하세요."
+            )
+
+        started = time.perf_counter()
+        indexed = search.rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"메시지 {indexed}개 색인 완료 ({time.perf_counter() - started:.1f}초)"
+            )
+        )
@@ -0,0 +1,209 @@
+# chat/management/commands/soak_slow_clients.py
+
+import asyncio
+import time
+import tracemalloc
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from chat import outbound
+from chat.consumers import ChatConsumer
+from chat.models import ChatRoom, Message
+from chat.replay import message_event
+
+User = get_user_model()
+
+
+class FakeClient:
+    """
+    실제 소켓 없이 ChatConsumer를 ASGI로 직접 구동하는 가짜 웹소켓 클라이언트
+    delay: 프레임 하나를 받는 데 걸리는 시간(초). 크게 주면 멈춘 클라이언트를 흉내냄
+    """
+
+    def __init__(self, app, scope, delay):
+        self.app = app
+        self.scope = scope
+        self.delay = delay
+        self.inbox = asyncio.Queue()
+        self.received = 0
+        self.close_code = None
+        self.task = None
+
+    async def receive(self):
+        return await self.inbox.get()
+
+    async def send(self, message):
+        if message["type"] == "websocket.send":
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            self.received += 1
+        elif message["type"] == "websocket.close":
+            self.close_code = message.get("code")
+            self.inbox.put_nowait({"type": "websocket.disconnect", "code": self.close_code})
+
+    def start(self):
+        self.inbox.put_nowait({"type": "websocket.connect"})
+        self.task = asyncio.ensure_future(self.app(self.scope, self.receive, self.send))
+
+    async def stop(self):
+        if self.close_code is None:
+            self.inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        try:
+            await asyncio.wait_for(self.task, timeout=5)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self.task.cancel()
+
+
+def prepare():
+    """측정용 유저 두 명과 방 생성 (이미 있으면 지난 실행이 정리되지 않은 것이므로 지우고 새로 만듦)"""
+    User.objects.filter(username__in=["soak_sender", "soak_receiver"]).delete()
+    sender = User.objects.create(username="soak_sender")
+    receiver = User.objects.create(username="soak_receiver")
+    room = ChatRoom.objects.create()
+    room.participants.add(sender, receiver)
+    return sender, receiver, room
+
+
+def create_message(room, sender, content):
+    return Message.objects.create(room=room, sender=sender, content=content)
+
+
+def cleanup(sender, receiver, room):
+    """만든 것 모두 삭제 (방 -> 메시지/읽음 상태/동기화 기록, 유저 -> 나머지 연결 행)"""
+    room.delete()
+    User.objects.filter(pk__in=[sender.pk, receiver.pk]).delete()
+
+
+class Command(BaseCommand):
+    help = (
+        "느린/멈춘 웹소켓 클라이언트를 붙여 놓고 메시지를 계속 보내며 송신 큐와 메모리 사용량 추이를 측정 "
+        "(설정된 DB에 측정용 유저/방을 만들고 끝나면 삭제. 회귀 확인은 chat.tests.SlowClientSoakTests)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fast", type=int, default=20, help="정상 클라이언트 수")
+        parser.add_argument("--slow", type=int, default=20, help="느린 클라이언트 수")
+        parser.add_argument("--stalled", type=int, default=5, help="멈춘 클라이언트 수 (전송이 끝나지 않음)")
+        parser.add_argument("--slow-delay", type=float, default=0.5, help="느린 클라이언트의 프레임당 수신 시간(초)")
+        parser.add_argument("--rate", type=int, default=100, help="초당 보낼 메시지 수")
+        parser.add_argument("--size", type=int, default=1000, help="메시지 본문 크기(글자 수)")
+        parser.add_argument("--duration", type=int, default=30, help="측정 시간(초)")
+        parser.add_argument("--interval", type=float, default=3, help="측정 간격(초)")
+        parser.add_argument("--policy", default=outbound.OUTBOUND_POLICY, choices=outbound.POLICIES)
+        parser.add_argument("--queue-size", type=int, default=outbound.OUTBOUND_QUEUE_SIZE)
+        parser.add_argument("--send-timeout", type=float, default=5, help="프레임당 전송 제한 시간(초)")
+
+    def handle(self, *args, **options):
+        asyncio.run(self.soak(options))
+
+    async def soak(self, options):
+        sender, receiver, room = await database_sync_to_async(prepare)()
+        try:
+            await self.run(options, sender, receiver, room)
+        finally:
+            await database_sync_to_async(cleanup)(sender, receiver, room)
+
+    async def run(self, options, sender, receiver, room):
+        channel_layer = get_channel_layer()
+        consumer_class = type(
+            "SoakChatConsumer",
+            (ChatConsumer,),
+            {
+                "outbound_queue_size": options["queue_size"],
+                "outbound_policy": options["policy"],
+                "send_timeout": options["send_timeout"],
+            },
+        )
+        app = consumer_class.as_asgi()
+        scope = {
+            "type": "websocket",
+            "path": f"/ws/chat/{sender.id}/",
+            "query_string": b"",
+            "headers": [],
+            "user": receiver,
+            "url_route": {"args": (), "kwargs": {"target_id": sender.id}},
+        }
+
+        tracemalloc.start()
+
+        # 1. 클라이언트 연결 (정상 / 느림 / 멈춤)
+        kinds = (
+            [("fast", 0)] * options["fast"]
+            + [("slow", options["slow_delay"])] * options["slow"]
+            + [("stalled", 3600)] * options["stalled"]
+        )
+        clients = []
+        for kind, delay in kinds:
+            client = FakeClient(app, dict(scope), delay)
+            client.start()
+            clients.append((kind, client))
+        await asyncio.sleep(1)
+
+        # 2. 메시지 발송 (MessageSendView와 같은 경로: DB 저장 후 group_send)
+        content = "가" * options["size"]
+        sent = 0
+
+        async def publish():
+            nonlocal sent
+            period = 1 / options["rate"]
+            deadline = time.monotonic() + options["duration"]
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                msg = await database_sync_to_async(create_message)(room, sender, content)
+                await channel_layer.group_send(
+                    f"chat_{room.id}",
+                    {"type": "chat_message", **message_event(msg, sender.username)},
+                )
+                sent += 1
+                await asyncio.sleep(max(0.0, period - (time.monotonic() - started)))
+
+        publisher = asyncio.ensure_future(publish())
+
+        # 3. 주기적으로 메모리 / 큐 현황 기록
+        header = (
+            f"{'t(s)':>6}{'sent':>8}{'traced MB':>11}{'queued':>8}{'max q':>7}"
+            f"{'coalesced':>11}{'dropped':>9}{'disc':>6}{'timeout':>9}{'fast recv':>11}{'slow recv':>11}"
+        )
+        self.stdout.write(
+            f"policy={options['policy']} queue_size={options['queue_size']} rate={options['rate']}/s "
+            f"clients fast={options['fast']} slow={options['slow']} stalled={options['stalled']}\n"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        samples = []
+        started = time.monotonic()
+        while not publisher.done():
+            await asyncio.sleep(options["interval"])
+            current, _ = tracemalloc.get_traced_memory()
+            stats = outbound.stats()
+            samples.append(current)
+            fast_recv = sum(c.received for kind, c in clients if kind == "fast")
+            slow_recv = sum(c.received for kind, c in clients if kind == "slow")
+            self.stdout.write(
+                f"{time.monotonic() - started:>6.0f}{sent:>8}{current / 1024 / 1024:>11.2f}"
+                f"{stats['queued_frames']:>8}{stats['max_depth']:>7}{stats['coalesced']:>11}"
+                f"{stats['dropped']:>9}{stats['disconnected']:>6}{stats['send_timeouts']:>9}"
+                f"{fast_recv:>11}{slow_recv:>11}"
+            )
+        await publisher
+
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # 4. 정리
+        for _, client in clients:
+            await client.stop()
+
+        if len(samples) >= 2:
+            # 앞 절반은 연결/캐시/큐가 채워지는 준비 구간이므로 뒤 절반의 증가량만 비교
+            baseline = samples[len(samples) // 2]
+            growth = (samples[-1] - baseline) / 1024 / 1024
+            self.stdout.write(
+                f"\nmemory growth over second half: {growth:+.2f} MB (peak {peak / 1024 / 1024:.2f} MB)"
+            )
+        closed = {kind: sum(1 for k, c in clients if k == kind and c.close_code is not None) for kind, _ in kinds}
+        self.stdout.write(f"closed connections by kind: {closed}")
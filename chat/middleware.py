@@ -5,27 +5,40 @@ from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from rest_framework_simplejwt.tokens import AccessToken
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from profiles import auth_cache
 
 User = get_user_model()
 
 
-@database_sync_to_async
-def get_user(token_key):
+async def get_user(token_key):
     """
-    동기(Sync) 방식의 DB 접근을 비동기(Async) 환경에서 실행하기 위한 함수
+    토큰으로 유저 조회
+    - 토큰 검증 결과와 유저 스냅샷은 profiles.auth_cache에 캐시되어, 캐시에 있으면 DB 접근 없이 반환
+    - 캐시에 없을 때만 동기(Sync) DB 조회를 비동기(Async) 환경에서 실행
     """
     try:
-        # 1. 토큰 디코딩 (유효성 검사 포함)
-        access_token = AccessToken(token_key)
+        # 1. 토큰 디코딩 (유효성 검사 포함, 토큰 만료 전까지 한 번만 검증)
+        access_token = auth_cache.get_validated_token(token_key, AccessToken)
         user_id = access_token['user_id']
+    except Exception:
+        # InvalidToken, TokenError, user_id 클레임 없음(KeyError) 등
+        return AnonymousUser()
 
-        # 2. 유저 조회
-        user = User.objects.get(id=user_id)
-        return user
+    # 2. 유저 조회 (캐시 -> DB)
+    user = auth_cache.get_cached_user(user_id)
+    if user is None:
+        user = await load_user(user_id)
+    return user
 
-    except (InvalidToken, TokenError) as e:
-        return AnonymousUser()
+
+@database_sync_to_async
+def load_user(user_id):
+    """
+    동기(Sync) 방식의 DB 접근을 비동기(Async) 환경에서 실행하기 위한 함수
+    """
+    try:
+        return auth_cache.get_user(user_id)
     except User.DoesNotExist:
         return AnonymousUser()
     except Exception as e:
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='image_display',
+            field=models.ImageField(blank=True, null=True, upload_to='chat_images/%Y/%m%/%d/'),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='chat_images/%Y/%m%/%d/'),
+        ),
+    ]
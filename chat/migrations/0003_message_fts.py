@@ -0,0 +1,69 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:00
+
+from django.db import migrations
+
+# 메시지 본문 전문 검색용 FTS5 가상 테이블 (chat_message를 외부 콘텐츠로 사용해 본문을 중복 저장하지 않음)
+# - unicode61: 공백/문장부호 기준 토큰화 (한글 포함), prefix: 2~3글자 접두어 검색 인덱스
+# - 트리거로 chat_message의 추가/수정/삭제를 인덱스에 반영
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS chat_message_fts USING fts5(
+        content,
+        content='chat_message',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chat_message_fts_ai AFTER INSERT ON chat_message BEGIN
+        INSERT INTO chat_message_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chat_message_fts_ad AFTER DELETE ON chat_message BEGIN
+        INSERT INTO chat_message_fts(chat_message_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS chat_message_fts_au AFTER UPDATE OF content ON chat_message BEGIN
+        INSERT INTO chat_message_fts(chat_message_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO chat_message_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    # 기존 메시지 색인
+    "INSERT INTO chat_message_fts(chat_message_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS chat_message_fts_au",
+    "DROP TRIGGER IF EXISTS chat_message_fts_ad",
+    "DROP TRIGGER IF EXISTS chat_message_fts_ai",
+    "DROP TABLE IF EXISTS chat_message_fts",
+]
+
+
+def create_fts(apps, schema_editor):
+    # SQLite 전용 (다른 DB에서는 검색 API가 LIKE 검색으로 동작)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_message_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_read_states(apps, schema_editor):
+    """기존 방의 참여자마다 읽음 상태 생성 (이전 대화는 모두 읽은 것으로 간주)"""
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    RoomReadState = apps.get_model('chat', 'RoomReadState')
+    Participant = ChatRoom.participants.through
+
+    latest = dict(
+        ChatRoom.objects.annotate(latest=Max('messages__id')).values_list('id', 'latest')
+    )
+    states = [
+        RoomReadState(room_id=room_id, user_id=user_id, last_read_message_id=latest.get(room_id) or 0)
+        for room_id, user_id in Participant.objects.values_list('chatroom_id', 'user_id').iterator()
+    ]
+    RoomReadState.objects.bulk_create(states, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_message_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.BigIntegerField(default=0)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_states', to='chat.chatroom')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_read_states', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('room', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_read_states, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:00
+
+from django.db import migrations
+
+# 대량 추가 중 행 단위 색인을 건너뛰기 위한 표시 테이블 (chat.search.deferred_indexing)
+# - 트리거를 지우는 대신, 이 테이블에 행이 있으면 추가 트리거가 색인하지 않음
+# - 표시 행은 대량 추가 트랜잭션 안에서만 넣고 지우므로 다른 연결에는 보이지 않음
+CREATE_SQL = [
+    "CREATE TABLE IF NOT EXISTS chat_message_fts_deferred (id INTEGER PRIMARY KEY)",
+    "DROP TRIGGER IF EXISTS chat_message_fts_ai",
+    """
+    CREATE TRIGGER chat_message_fts_ai AFTER INSERT ON chat_message
+    WHEN NOT EXISTS (SELECT 1 FROM chat_message_fts_deferred) BEGIN
+        INSERT INTO chat_message_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS chat_message_fts_ai",
+    """
+    CREATE TRIGGER chat_message_fts_ai AFTER INSERT ON chat_message BEGIN
+        INSERT INTO chat_message_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    "DROP TABLE IF EXISTS chat_message_fts_deferred",
+]
+
+
+def create_flag(apps, schema_editor):
+    # SQLite 전용 (0003_message_fts와 같음)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_flag(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0007_syncevent_message_set_null_syncprunemark'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_flag, drop_flag),
+    ]
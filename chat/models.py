@@ -28,6 +28,9 @@ class Message(models.Model):
     content = models.TextField()
     # 이미지 파일 추가
     image = models.ImageField(upload_to='chat_images/%Y/%m%/%d/', null=True, blank=True)
+    # 이미지 변환본 (말풍선용 썸네일 / 화면 크기용). image는 메타데이터를 지우고 다시 인코딩한 원본
+    image_thumbnail = models.ImageField(upload_to='chat_images/%Y/%m%/%d/', null=True, blank=True)
+    image_display = models.ImageField(upload_to='chat_images/%Y/%m%/%d/', null=True, blank=True)
     # 보낸 시간
     timestamp = models.DateTimeField(auto_now_add=True)
 
@@ -52,4 +55,87 @@ class Block(models.Model):
         unique_together = ('blocker', 'blocked')
 
     def __str__(self):
-        return f'{self.blocker.username} blocked {self.blocked.username}'
\ No newline at end of file
+        return f'{self.blocker.username} blocked {self.blocked.username}'
+
+class RoomReadState(models.Model):
+    """
+    채팅방 참여자별 읽음 상태
+    - last_read_message_id: 마지막으로 읽은 메시지 ID
+    - unread_count: 안 읽은 (상대가 보낸) 메시지 수. 메시지가 생길 때 +1, 읽음 처리 시 다시 계산
+    """
+    room = models.ForeignKey(ChatRoom, related_name='read_states', on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='room_read_states', on_delete=models.CASCADE)
+    last_read_message_id = models.BigIntegerField(default=0)
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('room', 'user')
+
+    def __str__(self):
+        return f'{self.user.username} in #{self.room_id}: {self.unread_count} unread'
+
+
+class SyncEvent(models.Model):
+    """
+    유저별 변경 기록 (증분 동기화용). id가 곧 동기화 커서(단조 증가)
+    """
+    KIND_CHOICES = [
+        ('message', '새 메시지'),
+        ('room', '채팅방 참여'),
+        ('block', '차단'),
+        ('unblock', '차단 해제'),
+        ('read', '읽음'),
+    ]
+
+    # 이 변경을 받아야 하는 유저 ((user, id) 복합 인덱스로 조회하므로 단일 인덱스는 만들지 않음)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='sync_events', on_delete=models.CASCADE, db_index=False)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    room = models.ForeignKey(ChatRoom, related_name='+', on_delete=models.CASCADE, null=True, blank=True)
+    # 메시지가 아카이브되거나 삭제돼도 기록은 남김 (사용자별 기록이 중간에 빠지지 않도록)
+    message = models.ForeignKey(Message, related_name='+', on_delete=models.SET_NULL, null=True, blank=True)
+    # 종류별 추가 정보 (차단 대상, 읽음 위치 등)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='chat_sync_user_cursor_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.id} {self.kind} -> {self.user_id}'
+
+
+class SyncPruneMark(models.Model):
+    """
+    유저별로 보관 기간이 지나 삭제된 변경 기록의 마지막 id
+    이보다 작은 커서로 요청하면 빠진 기록이 있으므로 전체 재로딩(reset)
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, primary_key=True, related_name='+', on_delete=models.CASCADE)
+    pruned_upto = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.user_id}: ~#{self.pruned_upto}'
+
+
+class MessageArchiveSegment(models.Model):
+    """
+    보관 기간이 지나 DB에서 옮긴 메시지 묶음 (방 하나의 연속된 메시지, gzip JSONL 파일)
+    """
+    room = models.ForeignKey(ChatRoom, related_name='archive_segments', on_delete=models.CASCADE)
+    first_message_id = models.BigIntegerField()
+    last_message_id = models.BigIntegerField()
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    message_count = models.PositiveIntegerField()
+    file = models.FileField(upload_to='chat_archive/')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['room', 'last_message_id'], name='chat_archive_room_last_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.room_id} messages {self.first_message_id}-{self.last_message_id}'
@@ -0,0 +1,150 @@
+# chat/outbound.py
+
+import asyncio
+import weakref
+from collections import Counter, deque
+
+from django.conf import settings
+
+# 연결별 송신 대기 프레임 최대 개수와, 가득 찼을 때의 처리 방식
+# - coalesce: 대기 중인 채팅 메시지를 모두 버리고 "재동기화" 한 건으로 합침 (마지막 전송 이후 내역을 다시 보냄)
+# - drop_oldest: 가장 오래된 프레임부터 버림
+# - disconnect: 연결 종료 (클라이언트가 last_message_id로 재연결)
+OUTBOUND_QUEUE_SIZE = getattr(settings, 'CHAT_OUTBOUND_QUEUE_SIZE', 100)
+OUTBOUND_POLICY = getattr(settings, 'CHAT_OUTBOUND_POLICY', 'coalesce')
+# 프레임 하나를 보내는 데 이 시간(초)을 넘기면 멈춘 클라이언트로 보고 연결 종료
+SEND_TIMEOUT = getattr(settings, 'CHAT_SEND_TIMEOUT', 10)
+
+POLICIES = ('coalesce', 'drop_oldest', 'disconnect')
+
+# 재동기화 표시 (큐에서 꺼내면 마지막으로 보낸 메시지 이후 내역을 다시 보냄)
+RESYNC = object()
+
+_queues = weakref.WeakSet()
+_stats = Counter()
+
+
+class QueueFull(Exception):
+    """disconnect 정책에서 큐가 가득 찬 경우"""
+
+
+class OutboundQueue:
+    """
+    웹소켓 연결 하나의 송신 대기열 (크기 제한)
+    - key가 있는 프레임은 같은 key의 대기 중인 프레임을 덮어씀 (예: 같은 방의 읽음 표시)
+    - message_id가 있는 프레임은 채팅 메시지로 보고 coalesce 정책에서 재동기화로 대체됨
+    """
+
+    def __init__(self, maxsize=OUTBOUND_QUEUE_SIZE, policy=OUTBOUND_POLICY):
+        if policy not in POLICIES:
+            raise ValueError(f"알 수 없는 송신 큐 정책입니다: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._entries = deque()  # [key, frame]
+        self._keyed = {}         # key -> 대기 중인 entry
+        self._ready = asyncio.Event()
+        self.resync_pending = False
+        self.high_water = 0
+        _queues.add(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, frame, key=None):
+        """프레임 추가. disconnect 정책에서 가득 차 있으면 QueueFull"""
+        if key is not None:
+            entry = self._keyed.get(key)
+            if entry is not None:
+                entry[1] = frame
+                _stats['coalesced'] += 1
+                return
+
+        # 재동기화가 예정돼 있으면 그 사이의 채팅 메시지는 재동기화로 함께 전달됨
+        if self.resync_pending and isinstance(frame, dict) and "message_id" in frame:
+            _stats['coalesced'] += 1
+            return
+
+        if len(self._entries) >= self.maxsize and not self._make_room():
+            # 큐에 재동기화만 남아 있으면 새 프레임을 버림 (채팅 메시지는 재동기화로 전달됨)
+            _stats['dropped'] += 1
+            return
+
+        self._append(key, frame)
+
+    def put_resync(self):
+        """재동기화 예약 (이미 예약돼 있으면 무시)"""
+        if not self.resync_pending:
+            self.resync_pending = True
+            self._append(None, RESYNC)
+
+    async def get(self):
+        while not self._entries:
+            self._ready.clear()
+            await self._ready.wait()
+        key, frame = self._entries.popleft()
+        if key is not None:
+            self._keyed.pop(key, None)
+        if frame is RESYNC:
+            self.resync_pending = False
+        return frame
+
+    def _append(self, key, frame):
+        entry = [key, frame]
+        self._entries.append(entry)
+        if key is not None:
+            self._keyed[key] = entry
+        self.high_water = max(self.high_water, len(self._entries))
+        self._ready.set()
+
+    def _make_room(self):
+        """
+        프레임 하나가 들어갈 자리를 만듦
+        Return: 자리를 만들지 못했으면 False (남은 것이 예약된 재동기화뿐인 경우)
+        """
+        if self.policy == 'disconnect':
+            _stats['disconnected'] += 1
+            raise QueueFull()
+
+        if self.policy == 'coalesce':
+            kept = deque(
+                entry for entry in self._entries
+                if not (isinstance(entry[1], dict) and "message_id" in entry[1])
+            )
+            removed = len(self._entries) - len(kept)
+            if removed:
+                self._entries = kept
+                _stats['coalesced'] += removed
+                self.put_resync()
+                if len(self._entries) < self.maxsize:
+                    return True
+
+        # drop_oldest (또는 합칠 채팅 메시지가 없는 경우). 예약된 재동기화는 버리지 않음
+        for index, (key, frame) in enumerate(self._entries):
+            if frame is not RESYNC:
+                break
+        else:
+            return False
+        del self._entries[index]
+        if key is not None:
+            self._keyed.pop(key, None)
+        _stats['dropped'] += 1
+        return True
+
+def record(name):
+    """송신 관련 이벤트 카운트 (예: send_timeouts)"""
+    _stats[name] += 1
+
+
+def stats():
+    """전체 연결의 송신 큐 현황 (현재 워커 프로세스 기준)"""
+    depths = [len(queue) for queue in list(_queues)]
+    return {
+        'connections': len(depths),
+        'queued_frames': sum(depths),
+        'max_depth': max(depths, default=0),
+        'high_water': max((queue.high_water for queue in list(_queues)), default=0),
+        'coalesced': _stats['coalesced'],
+        'dropped': _stats['dropped'],
+        'disconnected': _stats['disconnected'],
+        'send_timeouts': _stats['send_timeouts'],
+    }
@@ -0,0 +1,89 @@
+# chat/read_state.py
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, Count, F, OuterRef, PositiveIntegerField, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from . import sync
+from .models import Message, RoomReadState
+
+
+def ensure_states(room_id, user_ids):
+    """방 참여자들의 읽음 상태 행 생성 (이미 있으면 무시)"""
+    RoomReadState.objects.bulk_create(
+        [RoomReadState(room_id=room_id, user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+
+
+def on_message_created(message):
+    """
+    새 메시지 반영 (쿼리 1번)
+    - 보낸 사람: 자기 메시지까지 읽은 것으로 처리
+    - 나머지 참여자: 안 읽은 수 +1
+    """
+    sender_id = message.sender_id
+    RoomReadState.objects.filter(room_id=message.room_id).update(
+        unread_count=Case(
+            When(user_id=sender_id, then=Value(0)),
+            default=F('unread_count') + 1,
+            output_field=PositiveIntegerField(),
+        ),
+        last_read_message_id=Case(
+            When(user_id=sender_id, then=Value(message.id)),
+            default=F('last_read_message_id'),
+            output_field=BigIntegerField(),
+        ),
+    )
+
+
+def notify_read(room_id, user_id, message_id):
+    """방의 다른 연결(상대방, 내 다른 기기)에 읽음 표시 전달"""
+    async_to_sync(get_channel_layer().group_send)(
+        f"chat_{room_id}",
+        {
+            "type": "read_receipt",
+            "room_id": room_id,
+            "user_id": user_id,
+            "last_read_message_id": message_id,
+        },
+    )
+
+
+def mark_read(room_id, user_id, message_id=None):
+    """
+    message_id까지 읽음 처리 (없으면 방의 마지막 메시지까지)
+    안 읽은 수는 그 이후 상대가 보낸 메시지 수로 다시 계산 (같은 UPDATE 안에서 계산해 동시 메시지와 어긋나지 않음)
+    Return: 실제로 갱신됐으면 읽은 메시지 ID, 이미 읽은 범위면 None
+    """
+    # 실제로 이 방에 있는 메시지 ID로 맞춤 (잘못된/미래 ID로 읽음 위치가 앞서가지 않도록)
+    messages = Message.objects.filter(room_id=room_id)
+    if message_id is not None:
+        messages = messages.filter(id__lte=message_id)
+    message_id = messages.order_by('-id').values_list('id', flat=True).first()
+    if message_id is None:
+        return None
+
+    unread = (
+        Message.objects.filter(room_id=OuterRef('room_id'), id__gt=message_id)
+        .exclude(sender_id=OuterRef('user_id'))
+        .order_by()
+        .values('room_id')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    updated = RoomReadState.objects.filter(
+        room_id=room_id, user_id=user_id, last_read_message_id__lt=message_id
+    ).update(
+        last_read_message_id=message_id,
+        unread_count=Coalesce(Subquery(unread), 0),
+    )
+    if not updated:
+        return None
+    sync.record_read(room_id, user_id, message_id)
+
+    # 트랜잭션 안에서 호출된 경우 커밋된 뒤에 알림 (롤백되면 보내지 않음)
+    transaction.on_commit(lambda: notify_read(room_id, user_id, message_id))
+    return message_id
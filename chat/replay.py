@@ -0,0 +1,165 @@
+# chat/replay.py
+
+from collections import OrderedDict, deque
+from threading import Lock
+
+from django.conf import settings
+
+# 방 하나당 보관할 최근 메시지 이벤트 수
+BUFFER_SIZE = getattr(settings, 'CHAT_REPLAY_BUFFER_SIZE', 100)
+# 프로세스 전체에서 버퍼를 유지할 최대 방 수 (초과 시 가장 오래 안 쓴 방부터 제거)
+MAX_ROOMS = getattr(settings, 'CHAT_REPLAY_MAX_ROOMS', 1000)
+
+
+def message_event(msg, sender_name=None):
+    """
+    Message 객체를 웹소켓 전송용 딕셔너리로 변환
+    (실시간 전송 / 재연결 시 누락분 재전송 모두 같은 형태를 사용)
+    """
+    return {
+        "message_id": msg.id,
+        "message": msg.content,
+        "sender": msg.sender_id,
+        "sender_name": sender_name or msg.sender.username,
+        "image": msg.image.url if msg.image else None,
+        "image_thumbnail": msg.image_thumbnail.url if msg.image_thumbnail else None,
+        "image_display": msg.image_display.url if msg.image_display else None,
+        "timestamp": str(msg.timestamp),
+    }
+
+
+class RoomBuffer:
+    """
+    한 채팅방의 최근 메시지 이벤트를 message_id 순으로 보관하는 링 버퍼
+    - floor: 이 값보다 큰 message_id를 가진 메시지는 모두 버퍼에 들어 있음 (None이면 알 수 없음)
+    """
+
+    def __init__(self, maxlen):
+        self.events = deque(maxlen=maxlen)
+        self.floor = None
+        self.subscribers = 0
+
+    def last_id(self):
+        return self.events[-1]["message_id"] if self.events else self.floor
+
+    def add(self, event):
+        message_id = event.get("message_id")
+        if message_id is None:
+            return
+
+        last = self.last_id()
+        if last is not None and message_id <= last:
+            # 다른 프로세스에서 온 이벤트가 순서가 뒤바뀌어 도착한 경우만 정렬 위치에 끼워넣음
+            if self.floor is not None and message_id <= self.floor:
+                return
+            if any(e["message_id"] == message_id for e in self.events):
+                return
+            index = len(self.events)
+            while index > 0 and self.events[index - 1]["message_id"] > message_id:
+                index -= 1
+            if len(self.events) == self.events.maxlen:
+                if index == 0:
+                    self.floor = message_id
+                    return
+                self.floor = self.events.popleft()["message_id"]
+                index -= 1
+            self.events.insert(index, event)
+            return
+
+        if len(self.events) == self.events.maxlen:
+            # 가장 오래된 이벤트가 밀려나면, 그 이후부터만 완전한 상태가 됨
+            self.floor = self.events[0]["message_id"]
+        self.events.append(event)
+
+    def backfill(self, events, floor):
+        """DB에서 읽은 누락분(floor 이후 전체)을 버퍼 앞쪽에 합침"""
+        if self.floor is not None and floor >= self.floor:
+            return
+        merged = {e["message_id"]: e for e in events}
+        for e in self.events:
+            merged[e["message_id"]] = e
+        ordered = [merged[k] for k in sorted(merged)]
+
+        overflow = len(ordered) - self.events.maxlen
+        if overflow > 0:
+            floor = ordered[overflow - 1]["message_id"]
+            ordered = ordered[overflow:]
+        self.events = deque(ordered, maxlen=self.events.maxlen)
+        self.floor = floor
+
+    def since(self, last_message_id):
+        """last_message_id 이후 이벤트 목록 반환. 버퍼만으로 빈틈을 보장할 수 없으면 None"""
+        if self.floor is None or last_message_id < self.floor:
+            return None
+        return [e for e in self.events if e["message_id"] > last_message_id]
+
+
+_buffers = OrderedDict()
+_lock = Lock()
+
+
+def subscribe(room_id):
+    """
+    이 프로세스에서 방에 연결된 소켓이 생길 때 호출
+    처음 생긴 버퍼는 floor가 비어 있으므로, 호출한 쪽에서 현재 마지막 ID로 init()해야 함
+    """
+    with _lock:
+        buf = _buffers.get(room_id)
+        if buf is None:
+            buf = RoomBuffer(BUFFER_SIZE)
+            _buffers[room_id] = buf
+            while len(_buffers) > MAX_ROOMS:
+                _buffers.popitem(last=False)
+        _buffers.move_to_end(room_id)
+        buf.subscribers += 1
+        return buf.floor is None and not buf.events
+
+
+def unsubscribe(room_id):
+    """
+    방의 마지막 로컬 소켓이 끊기면 버퍼 제거
+    (구독자가 없는 동안 오는 이벤트는 이 프로세스가 받지 못하므로 버퍼를 믿을 수 없음)
+    """
+    with _lock:
+        buf = _buffers.get(room_id)
+        if buf is None:
+            return
+        buf.subscribers -= 1
+        if buf.subscribers <= 0:
+            del _buffers[room_id]
+
+
+def init(room_id, latest_message_id):
+    """그룹 가입 직후 DB의 마지막 message_id로 버퍼 시작점 설정"""
+    with _lock:
+        buf = _buffers.get(room_id)
+        if buf is not None and buf.floor is None:
+            buf.floor = latest_message_id or 0
+            # init 이전에 이미 들어온 이벤트 중 floor 이하인 것은 정리
+            buf.events = deque(
+                (e for e in buf.events if e["message_id"] > buf.floor),
+                maxlen=buf.events.maxlen,
+            )
+
+
+def remember(room_id, event):
+    """그룹으로 받은 메시지 이벤트를 버퍼에 기록 (구독 중인 방만)"""
+    with _lock:
+        buf = _buffers.get(room_id)
+        if buf is not None:
+            buf.add(event)
+
+
+def backfill(room_id, events, floor):
+    with _lock:
+        buf = _buffers.get(room_id)
+        if buf is not None:
+            buf.backfill(events, floor)
+
+
+def events_since(room_id, last_message_id):
+    with _lock:
+        buf = _buffers.get(room_id)
+        if buf is None:
+            return None
+        return buf.since(last_message_id)
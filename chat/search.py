@@ -0,0 +1,174 @@
+# chat/search.py
+
+import html
+import re
+from contextlib import contextmanager
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import block_cache
+from .models import ChatRoom, Message
+
+FTS_TABLE = "chat_message_fts"
+# 행이 있으면 추가 트리거가 색인하지 않는 표시 테이블 (0008_message_fts_deferred 마이그레이션)
+DEFERRED_TABLE = "chat_message_fts_deferred"
+
+# 스니펫 강조 구분자 (SQL에서 넣고, HTML 이스케이프 후 <mark>로 바꿈)
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(query):
+    """
+    사용자 입력을 FTS5 MATCH 식으로 변환
+    - 단어마다 접두어 검색("사진"* -> 사진을, 사진이 ...)하고 모두 포함(AND)하는 메시지만
+    - FTS5 문법 문자(따옴표, *, : 등)는 토큰화 과정에서 제거
+    Return: MATCH 식 (검색어가 없으면 None)
+    """
+    tokens = _TOKEN_RE.findall(query or "")
+    if not tokens:
+        return None
+    return " AND ".join(f'"{token}"*' for token in tokens[:10])
+
+
+def _table_exists(name):
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [name])
+        return cursor.fetchone() is not None
+
+
+def fts_available():
+    """FTS 인덱스 사용 가능 여부 (SQLite + 마이그레이션 적용)"""
+    return _table_exists(FTS_TABLE)
+
+
+def searchable_room_ids(user):
+    """검색 대상 방 (내가 참여 중이고, 상대와 차단 관계가 아닌 방)"""
+    blocked = block_cache.get_block_set(user.id)
+    rooms = ChatRoom.objects.filter(participants=user)
+    if blocked:
+        rooms = rooms.exclude(participants__in=blocked)
+    return list(rooms.values_list("id", flat=True))
+
+
+def _parse_timestamp(value):
+    """raw SQL로 읽은 SQLite 날짜 문자열 -> datetime (ORM과 같은 형태)"""
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if value is not None and settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+def _format_snippet(snippet):
+    """스니펫 HTML 이스케이프 후 일치 부분을 <mark>로 감쌈"""
+    return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def search_messages(user, query, page=1, page_size=20):
+    """
+    내가 참여한 방의 메시지 검색 (관련도 순 정렬, 페이지 단위)
+    DB에 남아 있는 메시지만 검색함 (CHAT_ARCHIVE_AFTER_DAYS가 지나 아카이브 파일로 옮긴 메시지는 검색되지 않음)
+    Return: (결과 목록, 다음 페이지 존재 여부)
+    """
+    room_ids = searchable_room_ids(user)
+    match = build_match_query(query)
+    if not room_ids or match is None:
+        return [], False
+
+    offset = (page - 1) * page_size
+    if fts_available():
+        placeholders = ", ".join(["%s"] * len(room_ids))
+        sql = f"""
+            SELECT m.id, m.room_id, m.sender_id, m.timestamp,
+                   snippet({FTS_TABLE}, 0, %s, %s, '…', 12),
+                   bm25({FTS_TABLE}) AS rank
+            FROM {FTS_TABLE}
+            JOIN chat_message m ON m.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s AND m.room_id IN ({placeholders})
+            ORDER BY rank, m.id DESC
+            LIMIT %s OFFSET %s
+        """
+        params = [_MARK_START, _MARK_END, match, *room_ids, page_size + 1, offset]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        results = [
+            {
+                "message_id": message_id,
+                "room_id": room_id,
+                "sender": sender_id,
+                "snippet": _format_snippet(snippet),
+                "timestamp": _parse_timestamp(timestamp),
+                "rank": round(rank, 4),
+            }
+            for message_id, room_id, sender_id, timestamp, snippet, rank in rows
+        ]
+    else:
+        # FTS 인덱스가 없는 DB: 모든 단어를 포함하는 메시지를 최신순으로 (관련도 정렬 없음)
+        messages = Message.objects.filter(room_id__in=room_ids)
+        for token in _TOKEN_RE.findall(query):
+            messages = messages.filter(content__icontains=token)
+        rows = messages.order_by("-id").values("id", "room_id", "sender_id", "timestamp", "content")
+        results = [
+            {
+                "message_id": row["id"],
+                "room_id": row["room_id"],
+                "sender": row["sender_id"],
+                "snippet": html.escape(row["content"][:100]),
+                "timestamp": row["timestamp"],
+                "rank": None,
+            }
+            for row in rows[offset:offset + page_size + 1]
+        ]
+
+    return results[:page_size], len(results) > page_size
+
+
+def rebuild_index():
+    """
+    FTS 인덱스를 chat_message 전체로 다시 만듦 (FTS5 'rebuild'를 한 트랜잭션으로)
+    비운 뒤 나눠서 색인하면, 그 사이 삭제/수정 트리거가 아직 색인되지 않은 행을 지우려다 외부 콘텐츠 인덱스가 깨지므로 한 번에 처리
+    끝날 때까지 쓰기 잠금을 잡으므로 트래픽이 적을 때 실행
+    Return: 색인한 메시지 수
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute("SELECT COUNT(*) FROM chat_message")
+        (indexed,) = cursor.fetchone()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return indexed
+
+
+@contextmanager
+def deferred_indexing():
+    """
+    블록 전체를 한 트랜잭션으로 묶어 대량 추가 동안 행 단위 색인을 건너뛰고, 끝나면 새로 추가된 메시지를 한 번에 색인
+    (행마다 트리거로 색인하는 것보다 훨씬 빠름, 블록 안에서는 메시지를 수정/삭제하지 않아야 함)
+    트리거는 그대로 두고 표시 테이블에 행을 넣어 끄므로, 커밋 전에는 다른 연결에 영향이 없음
+    """
+    if not _table_exists(DEFERRED_TABLE):
+        yield
+        return
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM chat_message")
+            (last_id,) = cursor.fetchone()
+            cursor.execute(f"INSERT INTO {DEFERRED_TABLE} DEFAULT VALUES")
+        yield
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, content) SELECT id, content FROM chat_message WHERE id > %s",
+                [last_id],
+            )
+            cursor.execute(f"DELETE FROM {DEFERRED_TABLE}")
@@ -7,4 +7,4 @@ class MessageSerializer(serializers.ModelSerializer):
     message_id = serializers.IntegerField(source='id', read_only=True)
     class Meta:
         model = Message
-        fields = ['message_id', 'sender', 'content', 'image', 'timestamp']
\ No newline at end of file
+        fields = ['message_id', 'sender', 'content', 'image', 'image_thumbnail', 'image_display', 'timestamp']
\ No newline at end of file
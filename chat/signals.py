@@ -0,0 +1,74 @@
+# chat/signals.py
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import block_cache, read_state, sync
+from .models import Block, ChatRoom, Message
+
+
+def user_group_name(user_id):
+    """유저별 채널 그룹 이름 (해당 유저의 모든 웹소켓 연결이 가입)"""
+    return f"user_{user_id}"
+
+
+def notify_block_changed(blocker_id, blocked_id, blocked_now):
+    """
+    두 유저의 웹소켓 연결(다른 워커 포함)에 차단 변경 알림
+    - 받은 쪽은 자기 프로세스의 차단 캐시를 무효화하고, 차단이면 상대와의 채팅 연결을 끊음
+    """
+    channel_layer = get_channel_layer()
+    event = {
+        "type": "block_changed",
+        "blocker": blocker_id,
+        "blocked": blocked_id,
+        "blocked_now": blocked_now,
+    }
+    for user_id in (blocker_id, blocked_id):
+        async_to_sync(channel_layer.group_send)(user_group_name(user_id), event)
+
+
+@receiver(post_save, sender=Block)
+def block_saved(sender, instance, created, **kwargs):
+    block_cache.invalidate(instance.blocker_id, instance.blocked_id)
+    block_cache.broadcast(instance.blocker_id, instance.blocked_id)
+    if created:
+        sync.record_block(instance.blocker_id, instance.blocked_id, True)
+        transaction.on_commit(
+            lambda: notify_block_changed(instance.blocker_id, instance.blocked_id, True)
+        )
+
+
+@receiver(post_delete, sender=Block)
+def block_deleted(sender, instance, **kwargs):
+    block_cache.invalidate(instance.blocker_id, instance.blocked_id)
+    block_cache.broadcast(instance.blocker_id, instance.blocked_id)
+    sync.record_block(instance.blocker_id, instance.blocked_id, False)
+    transaction.on_commit(
+        lambda: notify_block_changed(instance.blocker_id, instance.blocked_id, False)
+    )
+
+
+@receiver(m2m_changed, sender=ChatRoom.participants.through)
+def room_participants_added(sender, instance, action, reverse, pk_set, **kwargs):
+    """방에 참여자가 추가되면 읽음 상태 행 생성 + 동기화 기록 (user.chat_rooms.add(...) 방향 포함)"""
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        for room_id in pk_set:
+            read_state.ensure_states(room_id, [instance.id])
+            sync.record_room(room_id, [instance.id])
+    else:
+        read_state.ensure_states(instance.id, pk_set)
+        sync.record_room(instance.id, pk_set)
+
+
+@receiver(post_save, sender=Message)
+def message_created(sender, instance, created, **kwargs):
+    """새 메시지마다 참여자별 안 읽은 수 갱신 + 동기화 기록"""
+    if created:
+        read_state.on_message_created(instance)
+        sync.record_message(instance)
@@ -0,0 +1,118 @@
+# chat/sync.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ChatRoom, SyncEvent, SyncPruneMark
+from .replay import message_event
+
+# 변경 기록 보관 기간(일). 이보다 오래된 커서로 요청하면 전체 재로딩(reset) 응답
+SYNC_RETENTION_DAYS = getattr(settings, 'CHAT_SYNC_RETENTION_DAYS', 30)
+
+
+def _participant_ids(room_id):
+    return list(
+        ChatRoom.participants.through.objects.filter(chatroom_id=room_id).values_list('user_id', flat=True)
+    )
+
+
+def record_message(message):
+    """새 메시지 -> 방 참여자 모두(보낸 사람의 다른 기기 포함)에게 기록"""
+    SyncEvent.objects.bulk_create([
+        SyncEvent(user_id=user_id, kind='message', room_id=message.room_id, message_id=message.id)
+        for user_id in _participant_ids(message.room_id)
+    ])
+
+
+def record_room(room_id, user_ids):
+    """방 생성/참여 -> 해당 참여자들에게 기록"""
+    SyncEvent.objects.bulk_create([
+        SyncEvent(user_id=user_id, kind='room', room_id=room_id) for user_id in user_ids
+    ])
+
+
+def record_block(blocker_id, blocked_id, blocked_now):
+    """차단/해제 -> 양쪽 유저에게 기록"""
+    kind = 'block' if blocked_now else 'unblock'
+    data = {"blocker": blocker_id, "blocked": blocked_id}
+    SyncEvent.objects.bulk_create([
+        SyncEvent(user_id=user_id, kind=kind, data=data) for user_id in (blocker_id, blocked_id)
+    ])
+
+
+def record_read(room_id, user_id, message_id):
+    """읽음 위치 변경 -> 방 참여자 모두에게 기록"""
+    data = {"user_id": user_id, "last_read_message_id": message_id}
+    SyncEvent.objects.bulk_create([
+        SyncEvent(user_id=participant_id, kind='read', room_id=room_id, data=data)
+        for participant_id in _participant_ids(room_id)
+    ])
+
+
+def latest_cursor():
+    return SyncEvent.objects.aggregate(latest=Max('id'))['latest'] or 0
+
+
+def pruned_upto(user):
+    """이 유저의 기록 중 보관 기간이 지나 삭제된 마지막 id (없으면 0)"""
+    return SyncPruneMark.objects.filter(user=user).values_list('pruned_upto', flat=True).first() or 0
+
+
+def events_since(user, since, limit):
+    """
+    since 이후 user의 변경 목록 ((user, id) 인덱스로 바뀐 만큼만 읽음)
+    Return: {"events", "next_cursor", "has_more", "reset"}
+    - since=None: 처음 동기화 -> reset
+    - reset=True: 커서가 없거나, 이 유저의 since 이후 기록 중 보관 기간이 지나 삭제된 것이 있음
+      -> 전체 재로딩 후 next_cursor부터 동기화
+    - 메시지가 아카이브/삭제된 message 기록은 "message": None (history API로 다시 읽어야 함)
+    """
+    if since is None or since < pruned_upto(user):
+        return {"events": [], "next_cursor": latest_cursor(), "has_more": False, "reset": True}
+
+    rows = list(
+        SyncEvent.objects.filter(user=user, id__gt=since)
+        .select_related('message__sender')
+        .order_by('id')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    events = []
+    for row in rows:
+        event = {"cursor": row.id, "kind": row.kind, "room_id": row.room_id}
+        if row.kind == 'message':
+            event["message"] = message_event(row.message) if row.message else None
+        if row.data:
+            event["data"] = row.data
+        events.append(event)
+
+    return {
+        "events": events,
+        "next_cursor": rows[-1].id if rows else since,
+        "has_more": has_more,
+        "reset": False,
+    }
+
+
+def prune(days=SYNC_RETENTION_DAYS):
+    """
+    보관 기간이 지난 변경 기록 삭제. Return: 삭제한 개수
+    유저별로 삭제한 마지막 id를 SyncPruneMark에 남겨, 그 이전 커서로 요청하면 reset하게 함
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    expired = SyncEvent.objects.filter(created_at__lt=cutoff)
+    with transaction.atomic():
+        marks = [
+            SyncPruneMark(user_id=user_id, pruned_upto=upto)
+            for user_id, upto in expired.order_by().values('user_id').annotate(upto=Max('id')).values_list('user_id', 'upto')
+        ]
+        SyncPruneMark.objects.bulk_create(
+            marks, batch_size=1000, update_conflicts=True, unique_fields=['user'], update_fields=['pruned_upto'],
+        )
+        deleted, _ = expired.delete()
+    return deleted
@@ -1,3 +1,857 @@
 # chat/tests.py
-from django.test import TestCase
+import asyncio
+import tempfile
+import threading
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
 
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.exceptions import ChannelFull
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import invalidation_utils, json_utils
+from api.test_utils import QueryBudgetTestCase
+from . import archive, block_cache, outbound, read_state, replay, search, sync, throttling
+from .consumers import ChatConsumer
+from .layers import SQLiteChannelLayer
+from .management.commands.soak_slow_clients import FakeClient
+from .serializers import MessageSerializer
+from .models import Block, ChatRoom, Message, MessageArchiveSegment, RoomReadState, SyncEvent
+
+User = get_user_model()
+
+
+class ChatQueryBudgetTests(QueryBudgetTestCase):
+    """채팅 API 쿼리 수 (방/메시지 수와 상관없이 일정해야 함)"""
+
+    query_budgets = {
+        'chat-room-list-api': 5,  # ETag 확인 1번 포함
+        'message-history-api': 4,  # 차단 확인 1번 포함 (캐시가 비어 있는 경우)
+        'chat-sync-api': 2,
+        'message-search-api': 3,
+        'message-send': 7,  # 차단 확인 1번 포함 (캐시가 비어 있는 경우)
+        'chat-room-read-api': 5,
+    }
+
+    def test_room_list(self):
+        self.assertQueryBudget(
+            'chat-room-list-api',
+            lambda f: self.client.get(reverse('chat-room-list-api')),
+        )
+
+    def test_history(self):
+        self.assertQueryBudget(
+            'message-history-api',
+            lambda f: self.client.get(reverse('message-history-api', args=[f.others[0].id]), {'limit': 2}),
+        )
+
+    def test_sync(self):
+        self.assertQueryBudget(
+            'chat-sync-api',
+            lambda f: self.client.get(reverse('chat-sync-api'), {'since': 0}),
+        )
+
+    def test_search(self):
+        self.assertQueryBudget(
+            'message-search-api',
+            lambda f: self.client.get(reverse('message-search-api'), {'q': '안녕'}),
+        )
+
+    def test_send_message(self):
+        self.assertQueryBudget(
+            'message-send',
+            lambda f: self.client.post(reverse('message-send', args=[f.others[0].id]), {'message': '반가워요'}),
+        )
+
+    def test_read(self):
+        def call(f):
+            room = f.me.chat_rooms.order_by('id').first()
+            return self.client.post(reverse('chat-room-read-api', args=[room.id]), {}, format='json')
+        self.assertQueryBudget('chat-room-read-api', call)
+
+    def test_room_list_not_modified(self):
+        get = lambda etag: self.client.get(reverse('chat-room-list-api'), HTTP_IF_NONE_MATCH=etag or "")
+        etag = self.assertNotModified(get)
+
+        # 새 메시지가 오면 ETag가 바뀌어 전체 응답
+        self.client.post(reverse('message-send', args=[self.fixture.others[0].id]), {'message': '새 메시지'})
+        response = get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class BlockCheckTests(TestCase):
+    """차단 확인 (캐시된 차단 집합, 같은 프로세스는 시그널 / 다른 워커는 무효화 알림으로 갱신)"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username="block_alice")
+        self.bob = User.objects.create_user(username="block_bob")
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+        block_cache.clear()
+
+    def block_elsewhere(self):
+        """다른 워커에서 생긴 차단 흉내 (이 프로세스의 시그널이 일어나지 않고, 알림만 도착)"""
+        with patch('chat.block_cache.invalidation_utils.can_cache', return_value=True):
+            block_cache.get_block_set(self.alice.id)
+            Block.objects.bulk_create([Block(blocker=self.bob, blocked=self.alice)])
+            self.assertFalse(block_cache.is_blocked(self.alice.id, self.bob.id))  # 캐시는 아직 예전 값
+        invalidation_utils.dispatch({"name": "block", "payload": [self.bob.id, self.alice.id]})
+
+    def test_send_rejected_after_broadcast(self):
+        self.block_elsewhere()
+        response = self.client.post(reverse('message-send', args=[self.bob.id]), {'message': '안녕'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_history_rejected_after_broadcast(self):
+        self.block_elsewhere()
+        response = self.client.get(reverse('message-history-api', args=[self.bob.id]))
+        self.assertEqual(response.status_code, 403)
+
+    @patch('chat.block_cache.invalidation_utils.can_cache', return_value=True)
+    def test_cached_check_without_queries(self, can_cache):
+        block_cache.get_block_set(self.alice.id)
+        with self.assertNumQueries(0):
+            self.assertFalse(block_cache.is_blocked(self.alice.id, self.bob.id))
+
+    @patch('chat.block_cache.invalidation_utils.can_cache', return_value=False)
+    def test_not_cached_until_listening(self, can_cache):
+        block_cache.get_block_set(self.alice.id)
+        with self.assertNumQueries(1):
+            block_cache.get_block_set(self.alice.id)
+
+    def test_signal_invalidates_and_broadcasts(self):
+        self.assertEqual(block_cache.get_block_set(self.alice.id), frozenset())
+        with patch('chat.block_cache.invalidation_utils.publish') as publish:
+            Block.objects.create(blocker=self.alice, blocked=self.bob)
+        publish.assert_called_once_with("block", [self.alice.id, self.bob.id])
+        self.assertEqual(block_cache.get_block_set(self.alice.id), {self.bob.id})
+        self.assertEqual(block_cache.get_block_set(self.bob.id), {self.alice.id})
+        Block.objects.filter(blocker=self.alice).delete()
+        self.assertFalse(block_cache.is_blocked(self.alice.id, self.bob.id))
+
+
+class InvalidationBroadcastTests(SimpleTestCase):
+    """워커 간 캐시 무효화 알림 (같은 SQLite 채널 레이어 파일을 쓰는 레이어 두 개)"""
+
+    def test_listener_dispatches_group_message(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / 'layer.sqlite3'
+        received = []
+        invalidation_utils.register("test", received.append, lambda: None)
+        self.addCleanup(invalidation_utils._handlers.pop, "test")
+
+        async def scenario():
+            ready = threading.Event()
+            listener = asyncio.ensure_future(invalidation_utils.listen(SQLiteChannelLayer(path=path), ready))
+            while not ready.is_set():
+                await asyncio.sleep(0.01)
+            sender = SQLiteChannelLayer(path=path)
+            await sender.group_send(invalidation_utils.GROUP, {"type": "cache.invalidate", "name": "test", "payload": [1, 2]})
+            for _ in range(200):
+                if received:
+                    break
+                await asyncio.sleep(0.01)
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+            await sender.close()
+
+        async_to_sync(scenario)()
+        self.assertEqual(received, [[1, 2]])
+
+
+def event(message_id):
+    return {"message_id": message_id, "message": f"m{message_id}"}
+
+
+class RoomBufferTests(SimpleTestCase):
+    """재연결 재전송용 방 버퍼 (message_id 순서 유지 / floor 이후만 보장)"""
+
+    def ids(self, events):
+        return [e["message_id"] for e in events]
+
+    def test_since_requires_floor(self):
+        buf = replay.RoomBuffer(3)
+        buf.add(event(1))
+        self.assertIsNone(buf.since(0))
+        buf.floor = 0
+        self.assertEqual(self.ids(buf.since(0)), [1])
+
+    def test_overflow_moves_floor(self):
+        buf = replay.RoomBuffer(3)
+        buf.floor = 0
+        for message_id in range(1, 6):
+            buf.add(event(message_id))
+        self.assertEqual(self.ids(buf.events), [3, 4, 5])
+        self.assertEqual(buf.floor, 2)
+        self.assertIsNone(buf.since(1))
+        self.assertEqual(self.ids(buf.since(2)), [3, 4, 5])
+
+    def test_out_of_order_and_duplicates(self):
+        buf = replay.RoomBuffer(5)
+        buf.floor = 0
+        for message_id in (1, 3, 2, 3, 4):
+            buf.add(event(message_id))
+        self.assertEqual(self.ids(buf.events), [1, 2, 3, 4])
+
+    def test_late_event_below_full_buffer(self):
+        buf = replay.RoomBuffer(3)
+        buf.floor = 0
+        for message_id in (2, 3, 4):
+            buf.add(event(message_id))
+        buf.add(event(1))
+        # 가장 오래된 자리에 끼워야 하면 버리고 floor만 올림
+        self.assertEqual(self.ids(buf.events), [2, 3, 4])
+        self.assertEqual(buf.floor, 1)
+
+    def test_backfill_merges_and_trims(self):
+        buf = replay.RoomBuffer(4)
+        buf.floor = 10
+        buf.add(event(11))
+        buf.add(event(12))
+        buf.backfill([event(7), event(8), event(9), event(10)], floor=6)
+        self.assertEqual(self.ids(buf.events), [9, 10, 11, 12])
+        self.assertEqual(buf.floor, 8)
+        # 이미 더 앞쪽까지 보장된 경우 무시
+        buf.backfill([event(20)], floor=9)
+        self.assertEqual(self.ids(buf.events), [9, 10, 11, 12])
+
+    def test_module_buffer_lifecycle(self):
+        room_id = -1
+        self.assertTrue(replay.subscribe(room_id))
+        self.addCleanup(replay.unsubscribe, room_id)
+        replay.remember(room_id, event(5))
+        replay.init(room_id, 5)
+        replay.remember(room_id, event(6))
+        self.assertEqual(self.ids(replay.events_since(room_id, 5)), [6])
+
+        self.assertFalse(replay.subscribe(room_id))
+        replay.unsubscribe(room_id)
+        replay.unsubscribe(room_id)
+        self.assertIsNone(replay.events_since(room_id, 5))
+
+
+class RecordingConsumer(ChatConsumer):
+    """전송 대신 보낸 프레임을 기록하는 소비자 (송신 작업만 단독 실행)"""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+        self.outbound = outbound.OutboundQueue(10, 'coalesce')
+        self.last_sent_message_id = 0
+        self.replayed_ids = set()
+        self.latest_message_id = 0
+
+    async def send_frame(self, frame):
+        self.sent.append(frame)
+
+    async def close(self, code=None, reason=None):
+        self.closed = code
+
+
+class SendOutboundDedupeTests(SimpleTestCase):
+    """실시간 프레임 중 재전송으로 이미 보낸 메시지만 걸러짐 (id 순서와 무관)"""
+
+    def drain(self, consumer):
+        async def run():
+            task = asyncio.ensure_future(consumer.send_outbound())
+            while len(consumer.outbound):
+                await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            task.cancel()
+        async_to_sync(run)()
+
+    def test_out_of_order_live_frames_delivered(self):
+        consumer = RecordingConsumer()
+        consumer.last_sent_message_id = 5
+        for frame in (event(11), event(10), event(4)):
+            consumer.outbound.put(frame)
+        self.drain(consumer)
+        self.assertEqual(consumer.sent, [event(11), event(10), event(4)])
+        self.assertEqual(consumer.last_sent_message_id, 11)
+
+    def test_skips_only_replayed_frames(self):
+        consumer = RecordingConsumer()
+        consumer.replayed_ids = {5, 6}  # 재전송으로 5, 6번을 보낸 상태
+        for frame in (event(6), event(4), {"type": "read_receipt"}, event(5), event(7)):
+            consumer.outbound.put(frame)
+        self.drain(consumer)
+        self.assertEqual(consumer.sent, [event(4), {"type": "read_receipt"}, event(7)])
+        self.assertEqual(consumer.replayed_ids, set())
+
+    def test_replay_then_live_duplicates(self):
+        room_id = -2
+        replay.subscribe(room_id)
+        self.addCleanup(replay.unsubscribe, room_id)
+        replay.init(room_id, 3)
+        for message_id in (4, 5):
+            replay.remember(room_id, event(message_id))
+
+        consumer = RecordingConsumer()
+        consumer.room = ChatRoom(id=room_id)
+        consumer.last_sent_message_id = 3
+        async_to_sync(consumer.replay_missed)(3)
+        # 재전송하는 동안 그룹으로 들어온 같은 메시지
+        for frame in (event(5), event(4), event(6)):
+            consumer.outbound.put(frame)
+        self.drain(consumer)
+        self.assertEqual(
+            [frame.get("message_id", frame.get("type")) for frame in consumer.sent],
+            [4, 5, "replay_done", 6],
+        )
+
+    def test_send_error_closes_connection(self):
+        class FailingConsumer(RecordingConsumer):
+            async def send_frame(self, frame):
+                raise RuntimeError("boom")
+
+        consumer = FailingConsumer()
+        consumer.user = User(id=1)
+        consumer.outbound.put(event(1))
+        async_to_sync(consumer.send_outbound)()
+        self.assertEqual(consumer.closed, 1011)
+
+
+class OutboundQueueTests(SimpleTestCase):
+    """연결별 송신 큐의 정책 (coalesce / drop_oldest / disconnect)"""
+
+    def frames(self, queue):
+        async def run():
+            return [await queue.get() for _ in range(len(queue))]
+        return async_to_sync(run)()
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            outbound.OutboundQueue(3, 'unknown')
+
+    def test_keyed_frames_overwrite(self):
+        queue = outbound.OutboundQueue(3, 'coalesce')
+        queue.put({"type": "read", "id": 1}, key="room:1")
+        queue.put({"type": "read", "id": 2}, key="room:1")
+        self.assertEqual(self.frames(queue), [{"type": "read", "id": 2}])
+
+    def test_coalesce_replaces_messages_with_resync(self):
+        queue = outbound.OutboundQueue(3, 'coalesce')
+        queue.put({"type": "read"}, key="room:1")
+        queue.put(event(1))
+        queue.put(event(2))
+        queue.put(event(3))  # 가득 참 -> 채팅 메시지를 재동기화 한 건으로 합침
+        queue.put(event(4))  # 재동기화 예정이므로 큐에 넣지 않음
+        self.assertEqual(self.frames(queue), [{"type": "read"}, outbound.RESYNC, event(3)])
+        self.assertFalse(queue.resync_pending)
+
+    def test_coalesce_without_messages_drops_oldest(self):
+        queue = outbound.OutboundQueue(2, 'coalesce')
+        queue.put({"n": 1})
+        queue.put({"n": 2})
+        queue.put({"n": 3})
+        self.assertEqual(self.frames(queue), [{"n": 2}, {"n": 3}])
+
+    def test_drop_oldest_keeps_resync(self):
+        queue = outbound.OutboundQueue(2, 'drop_oldest')
+        queue.put_resync()
+        queue.put({"n": 1})
+        queue.put({"n": 2})
+        self.assertEqual(self.frames(queue), [outbound.RESYNC, {"n": 2}])
+
+    def test_only_resync_left_drops_incoming(self):
+        queue = outbound.OutboundQueue(1, 'drop_oldest')
+        queue.put_resync()
+        queue.put({"n": 1})
+        self.assertTrue(queue.resync_pending)
+        self.assertEqual(self.frames(queue), [outbound.RESYNC])
+        self.assertFalse(queue.resync_pending)
+
+    def test_disconnect_raises_when_full(self):
+        queue = outbound.OutboundQueue(1, 'disconnect')
+        queue.put({"n": 1})
+        with self.assertRaises(outbound.QueueFull):
+            queue.put({"n": 2})
+
+
+class SQLiteChannelLayerTests(SimpleTestCase):
+    """SQLite 채널 레이어 (워커 두 개 = 같은 파일을 쓰는 레이어 인스턴스 두 개)"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / 'layer.sqlite3'
+
+    def layer(self, **kwargs):
+        return SQLiteChannelLayer(path=self.path, **kwargs)
+
+    def run_async(self, func):
+        async def run():
+            try:
+                await asyncio.wait_for(func(), 5)
+            finally:
+                for layer in self.layers:
+                    await layer.close()
+        async_to_sync(run)()
+
+    def test_send_receive_local_and_remote_in_order(self):
+        a, b = self.layers = [self.layer(), self.layer()]
+
+        async def scenario():
+            channel = await b.new_channel()
+            await b.send(channel, {"type": "local"})
+            self.assertEqual(await b.receive(channel), {"type": "local"})
+
+            for n in range(20):
+                await a.send(channel, {"type": "remote", "n": n})
+            received = [(await b.receive(channel))["n"] for _ in range(20)]
+            self.assertEqual(received, list(range(20)))
+
+            await a.send("plain.channel", {"type": "plain"})
+            self.assertEqual(await b.receive("plain.channel"), {"type": "plain"})
+
+        self.run_async(scenario)
+
+    def test_group_send_reaches_both_processes(self):
+        a, b = self.layers = [self.layer(), self.layer()]
+
+        async def scenario():
+            channel_a = await a.new_channel()
+            channel_b = await b.new_channel()
+            await a.group_add("room", channel_a)
+            await b.group_add("room", channel_b)
+            await a.group_send("room", {"type": "hello"})
+            self.assertEqual(await a.receive(channel_a), {"type": "hello"})
+            self.assertEqual(await b.receive(channel_b), {"type": "hello"})
+
+            await b.group_discard("room", channel_b)
+            self.assertEqual(await a._run(a._db_group_channels, "room"), [channel_a])
+
+        self.run_async(scenario)
+
+    def test_expired_messages_are_not_delivered(self):
+        a, b = self.layers = [self.layer(expiry=0.05), self.layer(expiry=0.05)]
+
+        async def scenario():
+            channel = await b.new_channel()
+            await a.send(channel, {"type": "old"})
+            await b.send(channel, {"type": "old-local"})
+            await asyncio.sleep(0.1)
+            await a.send(channel, {"type": "new"})
+            self.assertEqual(await b.receive(channel), {"type": "new"})
+
+        self.run_async(scenario)
+
+    def test_capacity(self):
+        a, b = self.layers = [self.layer(capacity=2), self.layer(capacity=2)]
+
+        async def scenario():
+            channel = await b.new_channel()
+            await a.send(channel, {"n": 1})
+            await a.send(channel, {"n": 2})
+            with self.assertRaises(ChannelFull):
+                await a.send(channel, {"n": 3})
+
+            await b.send(channel, {"n": 1})
+            await b.send(channel, {"n": 2})
+            with self.assertRaises(ChannelFull):
+                await b.send(channel, {"n": 3})
+
+            # 그룹 전송은 가득 찬 채널을 조용히 건너뜀
+            await a.group_add("room", channel)
+            await a.group_send("room", {"n": 4})
+
+        self.run_async(scenario)
+
+
+class SyncStreamTests(TestCase):
+    """증분 동기화 (유저별 변경 기록 / 삭제된 구간이 있으면 reset)"""
+
+    def setUp(self):
+        self.me = User.objects.create_user(username='sync_me', password='pw')
+        self.other = User.objects.create_user(username='sync_other', password='pw')
+        self.room = ChatRoom.objects.create()
+        self.room.participants.add(self.me, self.other)
+
+    def send(self, content):
+        return Message.objects.create(room=self.room, sender=self.other, content=content)
+
+    def test_incremental_pages(self):
+        self.assertTrue(sync.events_since(self.me, None, 10)["reset"])
+        cursor = sync.latest_cursor()
+        for n in range(3):
+            self.send(f"m{n}")
+
+        page = sync.events_since(self.me, cursor, 2)
+        self.assertFalse(page["reset"])
+        self.assertTrue(page["has_more"])
+        self.assertEqual([e["message"]["message"] for e in page["events"]], ["m0", "m1"])
+
+        page = sync.events_since(self.me, page["next_cursor"], 2)
+        self.assertFalse(page["has_more"])
+        self.assertEqual([e["message"]["message"] for e in page["events"]], ["m2"])
+
+    def test_deleted_message_keeps_event(self):
+        cursor = sync.latest_cursor()
+        msg = self.send("곧 아카이브됨")
+        msg.delete()
+        events = sync.events_since(self.me, cursor, 10)["events"]
+        self.assertEqual([(e["kind"], e["message"]) for e in events], [("message", None)])
+
+    def test_prune_resets_only_users_with_pruned_events(self):
+        cursor = sync.latest_cursor()
+        self.send("오래된 메시지")
+        SyncEvent.objects.filter(user=self.me, id__gt=cursor).update(created_at=timezone.now() - timedelta(days=60))
+        self.send("새 메시지")
+
+        self.assertEqual(sync.prune(days=30), 1)
+        # 내 기록은 cursor 이후가 삭제됐으므로 reset, 상대 기록은 그대로 이어짐
+        self.assertTrue(sync.events_since(self.me, cursor, 10)["reset"])
+        self.assertEqual(len(sync.events_since(self.other, cursor, 10)["events"]), 2)
+
+        # 삭제된 마지막 기록 이후 커서는 계속 사용 가능
+        upto = sync.pruned_upto(self.me)
+        page = sync.events_since(self.me, upto, 10)
+        self.assertFalse(page["reset"])
+        self.assertEqual([e["message"]["message"] for e in page["events"]], ["새 메시지"])
+
+
+class SearchIndexTests(TestCase):
+    """FTS 인덱스 재생성 / 대량 추가 중 색인 미루기 (트리거를 지우지 않음)"""
+
+    def setUp(self):
+        if not search.fts_available():
+            self.skipTest("FTS5 인덱스가 없는 DB")
+        self.me = User.objects.create_user(username='search_me', password='pw')
+        self.other = User.objects.create_user(username='search_other', password='pw')
+        self.room = ChatRoom.objects.create()
+        self.room.participants.add(self.me, self.other)
+
+    def send(self, content):
+        return Message.objects.create(room=self.room, sender=self.other, content=content)
+
+    def indexed_ids(self, word):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT rowid FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH %s", [word])
+            return sorted(row[0] for row in cursor.fetchall())
+
+    def assert_index_consistent(self):
+        # 외부 콘텐츠 테이블(chat_message)과 인덱스가 일치하는지
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+
+    def test_rebuild_index(self):
+        keep = self.send("사과 바나나")
+        self.send("사과 포도").delete()
+        self.assertEqual(search.rebuild_index(), 1)
+        self.assertEqual(self.indexed_ids("사과"), [keep.id])
+        self.assert_index_consistent()
+
+    def test_deferred_indexing(self):
+        before = self.send("딸기 하나")
+        with search.deferred_indexing():
+            bulk = self.send("딸기 둘")
+            # 블록 안에서는 색인하지 않음 (트리거는 그대로)
+            self.assertEqual(self.indexed_ids("딸기"), [before.id])
+        self.assertEqual(self.indexed_ids("딸기"), [before.id, bulk.id])
+
+        # 블록이 끝나면 다시 행마다 색인
+        after = self.send("딸기 셋")
+        self.assertEqual(self.indexed_ids("딸기"), [before.id, bulk.id, after.id])
+        self.assert_index_consistent()
+
+    def test_deferred_indexing_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with search.deferred_indexing():
+                self.send("수박")
+                raise RuntimeError("중단")
+        self.assertFalse(Message.objects.filter(content="수박").exists())
+        self.assertEqual(self.indexed_ids("수박"), [])
+        msg = self.send("수박")
+        self.assertEqual(self.indexed_ids("수박"), [msg.id])
+
+
+class ReadStateTests(TestCase):
+    """방별 읽음 위치 / 안 읽은 수"""
+
+    def setUp(self):
+        self.me = User.objects.create_user(username='read_me', password='pw')
+        self.other = User.objects.create_user(username='read_other', password='pw')
+        self.room = ChatRoom.objects.create()
+        self.room.participants.add(self.me, self.other)
+
+    def send(self, sender, content='안녕'):
+        return Message.objects.create(room=self.room, sender=sender, content=content)
+
+    def state(self, user):
+        return RoomReadState.objects.get(room=self.room, user=user)
+
+    def test_new_messages_count_for_others_only(self):
+        self.send(self.other)
+        second = self.send(self.other)
+        self.assertEqual(self.state(self.me).unread_count, 2)
+        mine = self.send(self.me)
+        self.assertEqual(self.state(self.me).unread_count, 0)
+        self.assertEqual(self.state(self.me).last_read_message_id, mine.id)
+        self.assertEqual(self.state(self.other).unread_count, 1)
+        self.assertEqual(self.state(self.other).last_read_message_id, second.id)
+
+    def test_mark_read_recounts_and_clamps(self):
+        first = self.send(self.other)
+        last = self.send(self.other)
+        self.assertEqual(read_state.mark_read(self.room.id, self.me.id, first.id), first.id)
+        self.assertEqual(self.state(self.me).unread_count, 1)
+
+        # 이미 읽은 범위면 None, 없는 ID는 방의 마지막 메시지로 맞춤
+        self.assertIsNone(read_state.mark_read(self.room.id, self.me.id, first.id))
+        self.assertEqual(read_state.mark_read(self.room.id, self.me.id, last.id + 100), last.id)
+        self.assertEqual(self.state(self.me).unread_count, 0)
+
+    @patch('chat.read_state.get_channel_layer')
+    def test_receipt_sent_after_commit(self, get_layer):
+        get_layer.return_value.group_send = AsyncMock()
+        msg = self.send(self.other)
+        with self.captureOnCommitCallbacks() as callbacks:
+            read_state.mark_read(self.room.id, self.me.id)
+            get_layer.return_value.group_send.assert_not_called()
+        for callback in callbacks:
+            callback()
+        get_layer.return_value.group_send.assert_awaited_once_with(
+            f"chat_{self.room.id}",
+            {"type": "read_receipt", "room_id": self.room.id, "user_id": self.me.id, "last_read_message_id": msg.id},
+        )
+
+
+class ArchiveTests(TestCase):
+    """오래된 메시지 아카이브 -> 내역 조회 시 DB와 같은 형태로 다시 읽힘"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.me = User.objects.create_user(username='archive_me', password='pw')
+        self.other = User.objects.create_user(username='archive_other', password='pw')
+        self.room = ChatRoom.objects.create()
+        self.room.participants.add(self.me, self.other)
+        old = timezone.now() - timedelta(days=400)
+        for n in range(5):
+            msg = Message.objects.create(room=self.room, sender=self.me if n % 2 else self.other, content=f"메시지 {n}")
+            if n < 3:
+                Message.objects.filter(pk=msg.pk).update(timestamp=old + timedelta(minutes=n))
+        self.cutoff = timezone.now() - timedelta(days=180)
+        self.original = list(MessageSerializer(self.room.messages.all(), many=True).data)
+
+    def test_round_trip(self):
+        self.assertEqual(archive.archive_room(self.room.id, self.cutoff, segment_size=2), (2, 3))
+        self.assertEqual(self.room.messages.count(), 2)
+        self.assertEqual(archive.archived_upto(self.room.id), self.original[2]["message_id"])
+
+        self.assertEqual(archive.full_history(self.room), self.original)
+        page, has_more = archive.history_page(self.room, before=self.original[4]["message_id"], limit=3)
+        self.assertEqual(page, self.original[1:4])
+        self.assertTrue(has_more)
+        found = archive.load_messages(self.room.id, [self.original[0]["message_id"]])
+        self.assertEqual(found[self.original[0]["message_id"]]["content"], "메시지 0")
+
+        client = APIClient()
+        client.force_authenticate(self.me)
+        response = client.get(reverse('message-history-api', args=[self.other.id]))
+        self.assertEqual(response.json(), self.original)
+
+    def test_room_list_keeps_last_message_after_archive(self):
+        Message.objects.filter(room=self.room).update(timestamp=timezone.now() - timedelta(days=400))
+        client = APIClient()
+        client.force_authenticate(self.me)
+        before = client.get(reverse('chat-room-list-api')).json()
+
+        self.assertEqual(archive.archive_room(self.room.id, self.cutoff), (1, 5))
+        self.assertFalse(self.room.messages.exists())
+        after = client.get(reverse('chat-room-list-api')).json()
+        self.assertEqual(after[0]["last_message"], "메시지 4")
+        self.assertEqual(after, before)
+
+    def test_failed_segment_save_removes_file(self):
+        with patch.object(MessageArchiveSegment, 'save', side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                archive.archive_room(self.room.id, self.cutoff)
+        self.assertEqual(self.room.messages.count(), 5)
+        self.assertEqual(default_storage.listdir(f"chat_archive/{self.room.id}")[1], [])
+
+
+class ThrottlingTests(TestCase):
+    """메시지 전송 토큰 버킷 (연결별 + 유저별, REST와 웹소켓이 유저 버킷 공유)"""
+
+    def setUp(self):
+        throttling._user_buckets.clear()
+        limits = patch.dict(throttling.RATE_LIMITS, {
+            'socket': {'rate': 1, 'burst': 2},
+            'user': {'rate': 1, 'burst': 3},
+        })
+        limits.start()
+        self.addCleanup(limits.stop)
+        self.now = 1000.0
+        clock = patch('chat.throttling.time.monotonic', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_bucket_refills_up_to_burst(self):
+        bucket = throttling.TokenBucket(rate=2, burst=2)
+        self.assertTrue(bucket.consume())
+        self.assertTrue(bucket.consume())
+        self.assertFalse(bucket.consume())
+        self.assertEqual(bucket.wait(), 0.5)
+        self.now += 10
+        self.assertEqual(bucket.refill(), 2)
+
+    def test_socket_and_user_limits(self):
+        first, second = throttling.socket_bucket(), throttling.socket_bucket()
+        self.assertTrue(throttling.allow_frame(first, 1))
+        self.assertTrue(throttling.allow_frame(first, 1))
+        self.assertFalse(throttling.allow_frame(first, 1))  # 연결 버킷 소진
+        self.assertTrue(throttling.allow_frame(second, 1))
+        self.assertFalse(throttling.allow_frame(second, 1))  # 유저 버킷 소진 (다른 연결과 공유)
+        self.assertTrue(throttling.allow_frame(throttling.socket_bucket(), 2))
+
+    def test_rest_shares_user_bucket_and_returns_429(self):
+        user = User.objects.create_user(username='throttle_me', password='pw')
+        target = User.objects.create_user(username='throttle_target', password='pw')
+        throttling.allow_frame(throttling.socket_bucket(), user.id)
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse('message-send', args=[target.id])
+        statuses = [client.post(url, {'message': 'hi'}).status_code for _ in range(2)]
+        self.assertEqual(statuses, [201, 201])
+        response = client.post(url, {'message': 'hi'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_rejected_requests_do_not_spend_tokens(self):
+        user = User.objects.create_user(username='throttle_me', password='pw')
+        target = User.objects.create_user(username='throttle_target', password='pw')
+        client = APIClient()
+        client.force_authenticate(user)
+        # 없는 상대 / 빈 메시지는 검증에서 거절되므로 토큰을 쓰지 않음
+        for _ in range(5):
+            self.assertEqual(client.post(reverse('message-send', args=[999999]), {'message': 'hi'}).status_code, 404)
+            self.assertEqual(client.post(reverse('message-send', args=[target.id]), {}).status_code, 400)
+        url = reverse('message-send', args=[target.id])
+        self.assertEqual([client.post(url, {'message': 'hi'}).status_code for _ in range(4)], [201, 201, 201, 429])
+
+
+class ReadFrameTests(SimpleTestCase):
+    """웹소켓 읽음 처리 프레임 (새 메시지가 없으면 DB를 건드리지 않고, 읽음 버킷으로 속도 제한)"""
+
+    def setUp(self):
+        throttling._user_buckets.clear()
+        self.consumer = RecordingConsumer()
+        self.consumer.read_bucket = throttling.TokenBucket(rate=0.001, burst=2)
+        self.consumer.last_read_ack = 0
+        self.marked = []
+
+        async def mark_read(message_id):
+            self.marked.append(message_id)
+            return message_id
+        self.consumer.mark_read = mark_read
+
+    def read(self, message_id=None):
+        async_to_sync(self.consumer.receive)(json_utils.dumps({"type": "read", "message_id": message_id}))
+
+    def test_nothing_new_skips_db(self):
+        self.read()
+        self.read(50)
+        self.assertEqual(self.marked, [])
+
+        self.consumer.latest_message_id = 7
+        self.read(50)  # 아는 마지막 메시지까지만
+        self.read()
+        self.assertEqual(self.marked, [7])
+
+    def test_read_frames_rate_limited(self):
+        for message_id in range(1, 6):
+            self.consumer.latest_message_id = message_id
+            self.read()
+        self.assertEqual(self.marked, [1, 2])
+        self.assertEqual(self.consumer.last_read_ack, 2)
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer", "CONFIG": {"capacity": 1000}}})
+class SlowClientSoakTests(TransactionTestCase):
+    """
+    멈춘 클라이언트가 섞여 있어도 송신 큐 길이와 메모리가 일정 한도 안에 머무는지 (soak_slow_clients 명령의 축소판)
+    컨슈머가 다른 스레드에서 DB 연결을 열고 닫으므로 TransactionTestCase 사용
+    """
+
+    QUEUE_SIZE = 10
+    MESSAGES = 400
+    # 뒤 절반 구간에서 허용하는 메모리 증가량 (큐가 무한히 쌓이면 메시지당 수 KB씩 늘어남)
+    MAX_GROWTH = 1024 * 1024
+
+    def setUp(self):
+        self.sender = User.objects.create_user(username='soak_sender', password='pw')
+        self.receiver = User.objects.create_user(username='soak_receiver', password='pw')
+
+    def test_stalled_clients_stay_bounded(self):
+        consumer_class = type(
+            "SoakChatConsumer",
+            (ChatConsumer,),
+            {"outbound_queue_size": self.QUEUE_SIZE, "outbound_policy": "coalesce", "send_timeout": 3600},
+        )
+        scope = {
+            "type": "websocket",
+            "path": f"/ws/chat/{self.sender.id}/",
+            "query_string": b"",
+            "headers": [],
+            "user": self.receiver,
+            "url_route": {"args": (), "kwargs": {"target_id": self.sender.id}},
+        }
+        content = "가" * 1000
+
+        async def scenario():
+            layer = get_channel_layer()
+            clients = [FakeClient(consumer_class.as_asgi(), dict(scope), delay) for delay in (0, 0, 3600, 3600)]
+            for client in clients:
+                client.start()
+            await asyncio.sleep(0.2)
+            room_id = await database_sync_to_async(
+                lambda: ChatRoom.objects.filter(participants=self.receiver).values_list("id", flat=True).get()
+            )()
+
+            tracemalloc.start()
+            try:
+                samples, max_depth = [], 0
+                for n in range(1, self.MESSAGES + 1):
+                    await layer.group_send(f"chat_{room_id}", {
+                        "type": "chat_message", "message_id": n, "message": content,
+                        "sender": self.sender.username, "timestamp": "",
+                    })
+                    await asyncio.sleep(0)
+                    max_depth = max(max_depth, outbound.stats()["max_depth"])
+                    if n % (self.MESSAGES // 4) == 0:
+                        await asyncio.sleep(0.05)
+                        samples.append(tracemalloc.get_traced_memory()[0])
+                await asyncio.sleep(0.2)
+            finally:
+                tracemalloc.stop()
+                for client in clients:
+                    await client.stop()
+            return clients, samples, max_depth
+
+        clients, samples, max_depth = async_to_sync(scenario)()
+
+        self.assertLessEqual(max_depth, self.QUEUE_SIZE)
+        self.assertLess(samples[-1] - samples[len(samples) // 2], self.MAX_GROWTH)
+        fast, stalled = clients[:2], clients[2:]
+        # 정상 클라이언트는 계속 받고(몰릴 때는 합쳐질 수 있음), 멈춘 클라이언트도 (coalesce 정책이므로) 끊기지 않음
+        for client in fast:
+            self.assertGreater(client.received, self.MESSAGES // 2)
+        for client in stalled:
+            self.assertIsNone(client.close_code)
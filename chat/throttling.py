@@ -0,0 +1,144 @@
+# chat/throttling.py
+
+import time
+from collections import Counter
+from threading import Lock
+
+from cachetools import LRUCache
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+# 토큰 버킷 설정: rate = 초당 충전되는 토큰 수, burst = 버킷 최대 크기(순간 허용량)
+RATE_LIMITS = getattr(settings, 'CHAT_RATE_LIMITS', {
+    'socket': {'rate': 5, 'burst': 10},
+    'user': {'rate': 10, 'burst': 20},
+    'read': {'rate': 2, 'burst': 5},
+})
+
+
+class TokenBucket:
+    """O(1) 토큰 버킷 (마지막 확인 시각 기준으로 토큰을 충전)"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def consume(self):
+        if self.refill() >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait(self):
+        """토큰 1개가 찰 때까지 남은 시간(초)"""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+def socket_bucket():
+    """웹소켓 연결 하나에 붙일 버킷"""
+    limits = RATE_LIMITS['socket']
+    return TokenBucket(limits['rate'], limits['burst'])
+
+
+def read_bucket():
+    """웹소켓 연결 하나의 읽음 처리 프레임용 버킷 (메시지 전송 버킷과 별도)"""
+    limits = RATE_LIMITS.get('read', {'rate': 2, 'burst': 5})
+    return TokenBucket(limits['rate'], limits['burst'])
+
+
+# 유저별 버킷은 REST/웹소켓이 함께 사용
+# 마지막 사용 기준으로 오래된 것부터 제거(LRU, 조회할 때마다 최근 사용으로 갱신)하므로 계속 보내는 유저의 버킷은 유지됨
+# 오래 안 쓴 유저의 버킷은 다시 가득 찬 상태와 같으므로 제거해도 무방
+_user_buckets = LRUCache(maxsize=100000)
+_stats = Counter()
+_lock = Lock()
+
+
+def _user_bucket(user_id):
+    bucket = _user_buckets.get(user_id)
+    if bucket is None:
+        limits = RATE_LIMITS['user']
+        bucket = _user_buckets[user_id] = TokenBucket(limits['rate'], limits['burst'])
+    return bucket
+
+
+def allow_frame(bucket, user_id):
+    """웹소켓 프레임 허용 여부 (연결 버킷과 유저 버킷 모두 토큰이 있어야 통과, 통과 시 둘 다 차감)"""
+    with _lock:
+        user_bucket = _user_bucket(user_id)
+        if bucket.refill() < 1:
+            _stats['ws_throttled_socket'] += 1
+            return False
+        if not user_bucket.consume():
+            _stats['ws_throttled_user'] += 1
+            return False
+        bucket.tokens -= 1
+        _stats['ws_allowed'] += 1
+        return True
+
+
+def allow_read(bucket):
+    """읽음 처리 프레임 허용 여부 (연결별 읽음 버킷만 확인)"""
+    with _lock:
+        if bucket.consume():
+            return True
+        _stats['ws_throttled_read'] += 1
+        return False
+
+
+def allow_request(user_id):
+    """REST 요청 허용 여부 (유저 버킷). 거부 시 다시 시도까지 남은 시간(초), 허용 시 None"""
+    with _lock:
+        user_bucket = _user_bucket(user_id)
+        if user_bucket.consume():
+            _stats['rest_allowed'] += 1
+            return None
+        _stats['rest_throttled'] += 1
+        return user_bucket.wait()
+
+
+def stats():
+    """제한 카운터 스냅샷"""
+    with _lock:
+        return {
+            'ws_allowed': _stats['ws_allowed'],
+            'ws_throttled_socket': _stats['ws_throttled_socket'],
+            'ws_throttled_user': _stats['ws_throttled_user'],
+            'ws_throttled_read': _stats['ws_throttled_read'],
+            'rest_allowed': _stats['rest_allowed'],
+            'rest_throttled': _stats['rest_throttled'],
+            'tracked_users': len(_user_buckets),
+        }
+
+
+class ChatMessageRateThrottle(BaseThrottle):
+    """
+    메시지 전송 API용 DRF 스로틀 (웹소켓과 같은 유저 버킷을 공유)
+    throttle_classes로 걸면 검증 전에 토큰을 쓰므로, 뷰에서 요청 검증을 마친 뒤 check_throttle로 확인
+    """
+
+    def allow_request(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return True
+        self.retry_after = allow_request(request.user.id)
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
+
+
+def check_throttle(request, view):
+    """검증을 통과한 메시지 전송 요청의 토큰 차감. 초과 시 Throttled 예외 (DRF가 429 + Retry-After로 응답)"""
+    throttle = ChatMessageRateThrottle()
+    if not throttle.allow_request(request, view):
+        view.throttled(request, throttle.wait())
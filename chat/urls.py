@@ -8,5 +8,9 @@ urlpatterns = [
     path('api/block/<int:user_id_to_block>/', views.BlockUserView.as_view(), name='block-user-api'),
     path('api/suggestions/<int:target_id>/', views.ChatSuggestionView.as_view(), name='chat-suggestions-api'),
     path('api/rooms/', views.ChatRoomListView.as_view(), name='chat-room-list-api'),
-    path('api/send-messages/<int:target_id>/', views.MessageSendView.as_view(), name='message-send')
+    path('api/rooms/<int:room_id>/read/', views.RoomReadView.as_view(), name='chat-room-read-api'),
+    path('api/send-messages/<int:target_id>/', views.MessageSendView.as_view(), name='message-send'),
+    path('api/search/', views.MessageSearchView.as_view(), name='message-search-api'),
+    path('api/sync/', views.SyncView.as_view(), name='chat-sync-api'),
+    path('api/stats/', views.ChatStatsView.as_view(), name='chat-stats-api'),
 ]
@@ -2,11 +2,14 @@
 
 import json
 import openai
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from django.http import Http404
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import OuterRef, Prefetch, Q, Subquery
+from django.utils.dateparse import parse_datetime
 from django.conf import settings
 
 # API 구현 위한 추가 모듈
@@ -16,8 +19,12 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 
 # DB 설계를 위해 필요한 모델
-from .models import ChatRoom, Message, Block
+from .models import ChatRoom, Message, Block, MessageArchiveSegment, RoomReadState, SyncEvent
 from .serializers import MessageSerializer
+from .replay import message_event
+from . import archive, block_cache, outbound, read_state, search, sync, throttling
+from api import image_utils, metrics
+from api.etag_utils import conditional_get, make_etag
 from profiles.models import UserProfile
 
 # 채널 레이어
@@ -67,13 +74,8 @@ class MessageSendView(APIView):
         # 3. 헬퍼 함수를 통해 방을 가져옴 (없으면 자동 생성)
         room = get_personal_chat_room(sender, target_user)
 
-        # 4. 차단 여부 확인
-        is_blocked = Block.objects.filter(
-            Q(blocker=sender, blocked=target_user) |
-            Q(blocker=target_user, blocked=sender)
-        ).exists()
-
-        if is_blocked:
+        # 4. 차단 여부 확인 (차단 캐시, 다른 워커의 변경은 무효화 알림으로 반영)
+        if block_cache.is_blocked(sender.id, target_user.id):
             return Response(
                 {"error": "차단된 관계입니다."},
                 status=status.HTTP_403_FORBIDDEN
@@ -89,30 +91,42 @@ class MessageSendView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 6. 메시지 저장
+        # 6. 전송 속도 제한 (웹소켓 전송과 같은 유저별 토큰 버킷, 초과 시 429)
+        # 검증을 통과한 요청만 토큰을 쓰도록 여기서 확인 (잘못된 요청/없는 상대는 차감하지 않음)
+        throttling.check_throttle(request, self)
+
+        # 7. 이미지 처리 (검증, 메타데이터 제거, 재인코딩, 썸네일/화면용 변환본 생성을 프로세스 풀에서 수행)
+        variants = {}
+        if image_file:
+            try:
+                variants = image_utils.process_upload(image_file)
+            except image_utils.ImageRejected as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            except (FutureTimeoutError, BrokenProcessPool):
+                return Response(
+                    {"error": "이미지 처리가 지연되고 있습니다. 잠시 후 다시 시도해주세요."},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+
+        # 8. 메시지 저장
         new_msg = Message.objects.create(
             room=room,
             sender=sender,
             content=content_text,
-            image=image_file
+            image=variants.get("original"),
+            image_thumbnail=variants.get("thumbnail"),
+            image_display=variants.get("display"),
         )
 
-        # 7. 웹소켓으로 실시간 알림 전송
+        # 9. 웹소켓으로 실시간 알림 전송
         channel_layer = get_channel_layer()
         room_group_name = f"chat_{room.id}"
 
-        image_url = new_msg.image.url if new_msg.image else None
-
         async_to_sync(channel_layer.group_send)(
             room_group_name,
             {
                 "type": "chat_message",
-                "message_id": new_msg.id,
-                "message": new_msg.content,
-                "sender": sender.id,
-                "sender_name": sender.username,
-                "image": image_url,
-                "timestamp": str(new_msg.timestamp)
+                **message_event(new_msg, sender.username),
             }
         )
         return Response(
@@ -125,6 +139,9 @@ class MessageHistoryView(APIView):
     """
     특정 채팅방의 과거 메시지 내역을 불러오는 REST API
     URL 예 : /api/chat/history/<int:target_id>/
+    - ?before=메시지ID&limit=50: before 이전 메시지를 limit개씩 (DB에서 옮긴 오래된 메시지는 아카이브에서 읽음)
+      더 이전 메시지가 있으면 X-Next-Before 헤더로 다음 요청의 before 값을 알려줌
+    - 파라미터가 없으면 메시지 전체 (아카이브 + DB)
     """
     # IsAuthenticated: 로그인한 사용자만 이 API에 접근 가능함
     permission_classes = [permissions.IsAuthenticated]
@@ -133,12 +150,7 @@ class MessageHistoryView(APIView):
         target_user = get_object_or_404(User, id=target_id)
 
         # 1. 차단 확인
-        is_blocked = Block.objects.filter(
-            Q(blocker=request.user, blocked=target_user) |
-            Q(blocker=target_user, blocked=request.user)
-        ).exists()
-
-        if is_blocked:
+        if block_cache.is_blocked(request.user.id, target_user.id):
             return Response(
                 {"error": "차단된 사용자외의 내역을 볼 수 없습니다."},
                 status=status.HTTP_403_FORBIDDEN
@@ -151,11 +163,49 @@ class MessageHistoryView(APIView):
             # 대화한 적 없음
             return Response([], status=status.HTTP_200_OK)
 
-        # 3. 메시지 가져오기
-        messages = room.messages.all()
-        serializer = MessageSerializer(messages, many=True)
+        # 3. 페이지 단위 요청: DB -> 아카이브 순으로 이어서 읽음
+        if "before" in request.query_params or "limit" in request.query_params:
+            try:
+                before = request.query_params.get("before")
+                before = int(before) if before else None
+                limit = min(200, max(1, int(request.query_params.get("limit", 50))))
+            except ValueError:
+                return Response(
+                    {"error": "before, limit는 숫자여야 합니다."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            messages, has_more = archive.history_page(room, before, limit)
+            response = Response(messages, status=status.HTTP_200_OK)
+            if has_more:
+                response["X-Next-Before"] = str(messages[0]["message_id"])
+            return response
+
+        # 4. 메시지 전체 가져오기 (아카이브된 오래된 메시지 포함)
+        return Response(archive.full_history(room), status=status.HTTP_200_OK)
+
+def room_list_etag(request):
+    """
+    채팅방 목록 버전 - 쿼리 1번
+    - 내 동기화 기록의 마지막 ID: 새 메시지/읽음/방 생성/차단이 생길 때마다 늘어남 ((user, id) 인덱스)
+    - 대화 상대 프로필의 마지막 수정 시각: 닉네임/사진 변경
+    """
+    user_id = request.user.id
+    last_event = SyncEvent.objects.filter(user_id=user_id).order_by('-id').values('id')[:1]
+    partner_profile_at = (
+        UserProfile.objects.filter(user__chat_rooms__participants=user_id)
+        .exclude(user_id=user_id)
+        .order_by('-updated_at')
+        .values('updated_at')[:1]
+    )
+    version = (
+        User.objects.filter(id=user_id)
+        .annotate(last_event_id=Subquery(last_event), partner_profile_at=Subquery(partner_profile_at))
+        .values_list('last_event_id', 'partner_profile_at')
+        .first()
+    )
+    return make_etag(request, *version) if version else None
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
 
 class ChatRoomListView(APIView):
     """
@@ -163,16 +213,38 @@ class ChatRoomListView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(room_list_etag)
     def get(self, request):
         user = request.user
 
-        # 1. 내가 참여 중인 모든 방 조회
-        my_rooms = ChatRoom.objects.filter(participants=user).prefetch_related('participants', 'messages')
+        # 1. 내가 참여 중인 모든 방 조회 (+ 내 읽음 상태: 메시지를 세지 않고 저장된 카운터 사용)
+        #    상대방 프로필/사진과 마지막 메시지는 방 개수와 상관없이 한꺼번에 가져옴
+        my_state = RoomReadState.objects.filter(room=OuterRef('pk'), user=user)
+        last_message = Message.objects.filter(room=OuterRef('pk')).order_by('-timestamp', '-id')
+        # DB 메시지가 모두 아카이브된 방은 마지막 아카이브 구간의 마지막 메시지를 표시
+        last_segment = MessageArchiveSegment.objects.filter(room=OuterRef('pk')).order_by('-last_message_id')
+        other_users = User.objects.exclude(id=user.id).select_related('profile').prefetch_related('profile__images')
+        my_rooms = list(
+            ChatRoom.objects.filter(participants=user)
+            .prefetch_related(Prefetch('participants', queryset=other_users, to_attr='other_users'))
+            .annotate(
+                unread_count=Subquery(my_state.values('unread_count')[:1]),
+                last_read_message_id=Subquery(my_state.values('last_read_message_id')[:1]),
+                last_message_id=Subquery(last_message.values('id')[:1]),
+                last_segment_id=Subquery(last_segment.values('id')[:1]),
+            )
+        )
+        last_messages = Message.objects.in_bulk(
+            [room.last_message_id for room in my_rooms if room.last_message_id]
+        )
+        archived_last = archive.last_messages(
+            [room.last_segment_id for room in my_rooms if not room.last_message_id and room.last_segment_id]
+        )
 
         results = []
         for room in my_rooms:
             # 2. 상대방 찾기 (나를 제외한 나머지 1명)
-            other_user = room.participants.exclude(id=user.id).first()
+            other_user = room.other_users[0] if room.other_users else None
 
             # 상대방이 없으면 건너뜀 (건너뛰지말고 response값 만들기)
             if not other_user:
@@ -186,18 +258,23 @@ class ChatRoomListView(APIView):
 
                 if profile.nickname:
                     other_nickname = profile.nickname
-                if profile.images.exists():
-                    other_image = profile.images.first().image.url
+                images = profile.images.all()
+                if images:
+                    other_image = images[0].thumbnail_url
             except UserProfile.DoesNotExist:
                 pass
 
             # 4. 마지막 메시지
-            last_msg = room.messages.last()
+            last_msg = last_messages.get(room.last_message_id)
             last_content = ""
             last_timestamp = room.created_at
             if last_msg:
                 last_content = "사진" if (last_msg.image and not last_msg.content) else last_msg.content
                 last_timestamp = last_msg.timestamp
+            elif room.last_segment_id in archived_last:
+                row = archived_last[room.last_segment_id]
+                last_content = "사진" if (row.get("image") and not row["content"]) else row["content"]
+                last_timestamp = parse_datetime(row["timestamp"])
 
             results.append({
                 "room_id": room.id,  # 방 ID
@@ -205,11 +282,40 @@ class ChatRoomListView(APIView):
                 "other_nickname": other_nickname,
                 "other_image": other_image,
                 "last_message": last_content,
-                "timestamp": last_timestamp
+                "timestamp": last_timestamp,
+                "unread_count": room.unread_count or 0,
+                "last_read_message_id": room.last_read_message_id or 0,
             })
 
         return Response(results, status=status.HTTP_200_OK)
 
+class RoomReadView(APIView):
+    """
+    [POST] /chat/api/rooms/<room_id>/read/
+    채팅방 읽음 처리 (body의 message_id까지, 생략하면 마지막 메시지까지)
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, room_id):
+        room = get_object_or_404(ChatRoom, id=room_id, participants=request.user)
+
+        message_id = request.data.get("message_id")
+        if message_id is not None:
+            try:
+                message_id = int(message_id)
+            except (TypeError, ValueError):
+                return Response(
+                    {"error": "message_id는 숫자여야 합니다."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        read_state.mark_read(room.id, request.user.id, message_id)
+        state = RoomReadState.objects.filter(room=room, user=request.user).values(
+            "last_read_message_id", "unread_count"
+        ).first() or {"last_read_message_id": 0, "unread_count": 0}
+
+        return Response({"room_id": room.id, **state}, status=status.HTTP_200_OK)
+
 # 3. REST API: 사용자 차단/해제
 class BlockUserView(APIView):
     """
@@ -397,15 +503,16 @@ class ChatSuggestionView(APIView):
         )
 
         try:
-            completion = openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                max_tokens=300,
-                temperature=0.7,
-            )
+            with metrics.span("openai", "chat_suggestions"):
+                completion = openai.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    max_tokens=300,
+                    temperature=0.7,
+                )
             content = completion.choices[0].message.content
             suggestions = json.loads(content)
             if not isinstance(suggestions, list):
@@ -419,4 +526,80 @@ class ChatSuggestionView(APIView):
         return Response(
             {"suggestions": suggestions},
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+
+class MessageSearchView(APIView):
+    """
+    [GET] /chat/api/search/?q=검색어&page=1&page_size=20
+    내가 참여한 채팅방의 메시지 전문 검색 (관련도 순, 차단 관계인 방 제외)
+    아카이브로 옮긴 오래된 메시지는 검색되지 않음 (history API로 조회)
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response(
+                {"error": "검색어를 입력해주세요."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            page = max(1, int(request.query_params.get("page", 1)))
+            page_size = min(50, max(1, int(request.query_params.get("page_size", 20))))
+        except ValueError:
+            return Response(
+                {"error": "page, page_size는 숫자여야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results, has_next = search.search_messages(request.user, query, page, page_size)
+        return Response(
+            {
+                "results": results,
+                "page": page,
+                "page_size": page_size,
+                "has_next": has_next,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class SyncView(APIView):
+    """
+    [GET] /chat/api/sync/?since=커서&limit=200
+    since 이후 내 모든 채팅방의 변경(새 메시지, 방 참여, 차단/해제, 읽음) 목록
+    - has_more가 true면 next_cursor로 이어서 요청
+    - reset이 true면 (since 생략 = 처음 동기화 / 커서가 너무 오래됨) 방 목록을 새로 받은 뒤 next_cursor부터 동기화
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            since = request.query_params.get("since")
+            since = max(0, int(since)) if since not in (None, "") else None
+            limit = min(500, max(1, int(request.query_params.get("limit", 200))))
+        except ValueError:
+            return Response(
+                {"error": "since, limit는 숫자여야 합니다."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(sync.events_since(request.user, since, limit), status=status.HTTP_200_OK)
+
+
+class ChatStatsView(APIView):
+    """
+    [GET] 채팅 전송 속도 제한 / 웹소켓 송신 큐 현황 조회 (관리자 전용, 현재 워커 프로세스 기준)
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "throttle": throttling.stats(),
+                "outbound": outbound.stats(),
+            },
+            status=status.HTTP_200_OK
+        )
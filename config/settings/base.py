@@ -35,6 +35,7 @@ OPENAI_API_KEY = get_secret('OPENAI_API_KEY')
 
 # KAKAO_REST_API
 KAKAO_API_KEY = get_secret('KAKAO_API_KEY')
+KAKAO_LOCAL_API_URL = "https://dapi.kakao.com"  # 부하 테스트(bench_load)에서는 로컬 가짜 서버로 바뀜
 
 SAJU_API_KEY = "MY_SAJU_API_KEY"
 SAJU_API_URL = "https://api.saju.example.com/analysis"
@@ -65,6 +66,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 요청별 처리 시간 / DB 쿼리 / 외부 호출 기록 (api.metrics, /api/metrics/에서 조회)
+    'api.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -105,12 +108,46 @@ WSGI_APPLICATION = 'config.wsgi.application'
 ASGI_APPLICATION = 'config.asgi.application'
 
 # 3. 채널 레이어 설정 (메시지 브로커)
+# InMemoryChannelLayer는 같은 프로세스 안에서만 group_send가 전달되므로,
+# daphne 워커를 여러 개 띄울 수 있도록 공유 SQLite 파일 기반 레이어를 사용
 CHANNEL_LAYERS = {
     "default" : {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
+        "BACKEND": "chat.layers.SQLiteChannelLayer",
+        "CONFIG": {
+            "path": BASE_DIR / 'channel_layer.sqlite3',
+            "expiry": 60,           # 메시지 유효 시간(초)
+            "group_expiry": 86400,  # 그룹 가입 유효 시간(초)
+            "capacity": 100,        # 채널당 최대 대기 메시지 수
+        },
     },
 }
 
+# 4. 웹소켓 재연결 시 누락 메시지 재전송 설정
+# 방마다 최근 메시지 이벤트를 메모리에 보관하고, 범위를 벗어나면 DB에서 읽음
+CHAT_REPLAY_BUFFER_SIZE = 100
+CHAT_REPLAY_MAX_ROOMS = 1000
+CHAT_REPLAY_MAX_MESSAGES = 200
+
+# 5. 채팅 전송 속도 제한 (토큰 버킷, 워커 프로세스 메모리 기준)
+# rate: 초당 충전 토큰 수, burst: 한 번에 몰아서 보낼 수 있는 최대 개수
+CHAT_RATE_LIMITS = {
+    'socket': {'rate': 5, 'burst': 10},   # 웹소켓 연결 하나당
+    'user': {'rate': 10, 'burst': 20},    # 유저 한 명당 (REST + 모든 웹소켓 연결 합산)
+    'read': {'rate': 2, 'burst': 5},      # 웹소켓 연결 하나당 읽음 처리 프레임
+}
+
+# 6. 웹소켓 송신 큐 (느린 클라이언트 대응)
+# 정책: 'coalesce'(밀린 메시지를 재동기화 한 번으로 합침) / 'drop_oldest' / 'disconnect'
+CHAT_OUTBOUND_QUEUE_SIZE = 100
+CHAT_OUTBOUND_POLICY = 'coalesce'
+CHAT_SEND_TIMEOUT = 10  # 프레임 하나 전송 제한 시간(초), 넘으면 연결 종료
+
+# 7. 오래된 채팅 메시지 아카이브 (python manage.py archive_messages)
+# 보관 기간이 지난 메시지는 방별 gzip JSONL 파일(MEDIA_ROOT/chat_archive/)로 옮기고 DB에서 삭제
+CHAT_ARCHIVE_AFTER_DAYS = 180
+CHAT_ARCHIVE_SEGMENT_SIZE = 1000  # 파일 하나당 최대 메시지 수
+CHAT_ARCHIVE_DELETE_BATCH = 500  # 한 번에 지울 메시지 수
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -167,18 +204,65 @@ LOGIN_URL = '/accounts/login/'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication + 토큰 검증/유저 조회 프로세스 내 캐시
+        'profiles.authentication.CachedJWTAuthentication',
 
     ],
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # ujson 기반 JSON 렌더러/파서 (api.json_utils, 출력은 기본 JSONRenderer와 같음)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.json_utils.UJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.json_utils.UJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# 프로세스 내 캐시(차단 관계, 인증 유저 등) 무효화를 채널 레이어로 모든 워커에 알림 (api.invalidation_utils)
+# False면 다른 워커의 변경은 각 캐시의 TTL 안에 반영됨
+CACHE_INVALIDATION_BROADCAST = True
+
+# JWT 인증 캐시 설정 (profiles.auth_cache)
+# 유저 저장/삭제 시 이 프로세스는 즉시, 다른 워커는 무효화 알림(CACHE_INVALIDATION_BROADCAST)으로 무효화
+# TTL(초)은 알림이 유실되거나 알림을 끈 경우 비활성화/비밀번호 변경이 다른 워커에 반영되기까지의 상한
+AUTH_USER_CACHE_TTL = 60
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_TOKEN_CACHE_SIZE = 10000
+
+# 프로필 응답 캐시 (profiles.profile_cache)
+# 렌더링된 프로필 JSON을 프로세스 내 LRU에 보관하고, 별칭을 지정하면 워커끼리 공유하는 캐시에도 저장
+# 예: CACHES['profiles'] = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': ...}
+PROFILE_CACHE_SIZE = 5000
+PROFILE_CACHE_ALIAS = None
+PROFILE_CACHE_TTL = 600
+
+# 추천(api.views.get_recommend_matches): 이미 보여준 상대의 점수에 곱하는 값 (1이면 순서 고정, 0이면 사실상 제외)
+RECOMMEND_SEEN_SCORE_FACTOR = 0.8
+# 전체 순위 스냅샷(후보 ID + 점수) 유효 시간(초) / 최대 인원 / 페이지 크기
+RECOMMEND_SNAPSHOT_TTL = 600
+RECOMMEND_SNAPSHOT_SIZE = 500
+RECOMMEND_PAGE_SIZE = 10
+
 # 미디어 파일(사용자 업로드) 설정
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# 업로드 이미지 처리 (api.image_utils)
+# 검증/메타데이터 제거/재인코딩/변환본 생성은 별도 프로세스 풀에서 수행
+IMAGE_PROCESS_WORKERS = None  # None이면 min(4, CPU 수)
+IMAGE_PROCESS_TIMEOUT = 30  # 이미지 한 장 처리 제한 시간(초)
+IMAGE_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+IMAGE_MAX_PIXELS = 40_000_000
+
+# 요청/웹소켓 지표 (api.metrics)
+METRICS_SERVER_TIMING = False  # True면 Server-Timing 응답 헤더로 DB/외부 호출 시간 표시
+METRICS_TOKEN = None  # 수집기(Prometheus)가 /api/metrics/ 조회 시 사용할 Bearer 토큰
+
 # Firebase 관련 설정
 # 1. 키 파일 경로 지정
 FIREBASE_CRED_PATH = os.path.join(BASE_DIR, 'firebase-adminsdk.json')
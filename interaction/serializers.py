@@ -18,7 +18,7 @@ class UserLikeSerializer(serializers.ModelSerializer):
     def get_target_profile(self, obj):
         # 목록의 성격에 따라 '상대방'이 누구인지 판단
         request = self.context.get('request')
-        if request and obj.sender == request.user:
+        if request and obj.sender_id == request.user.id:
             target_user = obj.receiver # 내가 보내면 받는 사람이 타겟
         else:
             target_user = obj.sender # 내가 받으면 보낸 사람이 타겟
@@ -1,5 +1,35 @@
 # interaction/tests.py
 
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from api.test_utils import QueryBudgetTestCase
+
+
+class LikeQueryBudgetTests(QueryBudgetTestCase):
+    """관심 표시 API 쿼리 수"""
+
+    query_budgets = {
+        'like-list': 3,  # ETag 확인 1번 포함
+        'send-like': 5,
+    }
+
+    def test_received_likes(self):
+        self.assertQueryBudget('like-list', lambda f: self.client.get(reverse('like-list'), {'type': 'received'}))
+
+    def test_sent_likes(self):
+        self.assertQueryBudget('like-list', lambda f: self.client.get(reverse('like-list'), {'type': 'sent'}))
+
+    def test_send_like(self):
+        # fixture에서 이미 하트를 보낸 상대: 첫 요청(캐시 준비)은 취소, 측정하는 두 번째 요청은 다시 보내기
+        self.assertQueryBudget(
+            'send-like',
+            lambda f: self.client.post(reverse('send-like', args=[f.others[-1].id])),
+        )
+
+    def test_like_list_not_modified(self):
+        get = lambda etag: self.client.get(reverse('like-list'), {'type': 'sent'}, HTTP_IF_NONE_MATCH=etag or "")
+        etag = self.assertNotModified(get)
+
+        # 취소하면 ETag가 바뀜
+        self.client.post(reverse('send-like', args=[self.fixture.others[0].id]))
+        self.assertEqual(get(etag).status_code, 200)
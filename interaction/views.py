@@ -3,11 +3,13 @@
 from django.shortcuts import render
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.db.models import Count, Max
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from .models import UserLike
 from .serializers import UserLikeSerializer
+from api.etag_utils import conditional_get, make_etag
 
 User = get_user_model()
 
@@ -52,9 +54,29 @@ class UserLikeView(APIView):
             status=status.HTTP_201_CREATED
         )
 
+def like_list_etag(request):
+    """
+    관심 목록 버전 (개수 + 마지막 ID/시각 + 상대 프로필의 마지막 수정 시각) - 쿼리 1번
+    취소(삭제)는 개수로, 상대의 닉네임/사진 변경은 프로필 수정 시각으로 알아챔
+    """
+    list_type = request.query_params.get('type', 'received')
+    if list_type == 'sent':
+        likes, other = UserLike.objects.filter(sender=request.user), 'receiver'
+    else:
+        list_type, likes, other = 'received', UserLike.objects.filter(receiver=request.user), 'sender'
+    version = likes.aggregate(
+        count=Count('id'),
+        last_id=Max('id'),
+        last_at=Max('created_at'),
+        profile_at=Max(f'{other}__profile__updated_at'),
+    )
+    return make_etag(request, list_type, *version.values(), daily=True)
+
+
 class LikeListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(like_list_etag)
     def get(self, request):
         """
         [GET] 관림 목록 조회
@@ -63,9 +85,13 @@ class LikeListView(APIView):
         list_type = request.query_params.get('type', 'received')
 
         if list_type == 'sent':
-            likes = UserLike.objects.filter(sender=request.user).select_related('receiver__profile')
+            likes = UserLike.objects.filter(sender=request.user).select_related(
+                'receiver__profile'
+            ).prefetch_related('receiver__profile__images')
         else:
-            likes = UserLike.objects.filter(receiver=request.user).select_related('sender__profile')
+            likes = UserLike.objects.filter(receiver=request.user).select_related(
+                'sender__profile'
+            ).prefetch_related('sender__profile__images')
 
         serializer = UserLikeSerializer(likes, many=True, context={'request' : request})
         return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
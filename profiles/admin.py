@@ -1,8 +1,16 @@
 # profiles/admin.py
 
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_datetime
+from django.utils.html import format_html, format_html_join
+
+from chat import archive
+from chat.models import ChatRoom, Message
 from .models import UserProfile, ProfileImage, UserReport
 
+User = get_user_model()
+
 # 기존 프로필 관련 Admin 설정
 class ProfileImageInline(admin.TabularInline):
     model = ProfileImage
@@ -22,4 +30,48 @@ class UserReportAdmin(admin.ModelAdmin):
     ordering = ['-created_at']
 
     # Admin 페이지에서 처리상태만 수정가능
-    list_editable = ['status']
\ No newline at end of file
+    list_editable = ['status']
+    readonly_fields = ['chat_log']
+
+    def chat_log(self, obj):
+        """첨부된 메시지 ID로 대화 내역 조회 (상세 화면을 열 때만, 아카이브된 메시지 포함)"""
+        if not obj.chat_message_ids:
+            return "(첨부된 대화 없음)"
+        messages = {
+            msg.id: msg
+            for msg in Message.objects.filter(id__in=obj.chat_message_ids).select_related('sender')
+        }
+        # DB에 없는 메시지는 아카이브 파일에서 찾음
+        archived = {}
+        missing = [message_id for message_id in obj.chat_message_ids if message_id not in messages]
+        if missing:
+            room = ChatRoom.objects.filter(participants=obj.reporter_id).filter(participants=obj.reported_user_id).first()
+            if room is not None:
+                archived = archive.load_messages(room.id, missing)
+        senders = dict(
+            User.objects.filter(id__in={row["sender"] for row in archived.values()}).values_list('id', 'username')
+        ) if archived else {}
+
+        lines = []
+        for message_id in obj.chat_message_ids:
+            msg = messages.get(message_id)
+            row = archived.get(message_id)
+            if msg is not None:
+                lines.append((
+                    msg.timestamp.strftime("%Y-%m-%d %H:%M"),
+                    msg.sender.username,
+                    msg.content or "(사진)",
+                ))
+            elif row is not None:
+                lines.append((
+                    parse_datetime(row["timestamp"]).strftime("%Y-%m-%d %H:%M"),
+                    senders.get(row["sender"], row["sender"]),
+                    row["content"] or "(사진)",
+                ))
+            else:
+                lines.append((f"#{message_id}", "(삭제된 메시지)", ""))
+        return format_html(
+            '<pre style="white-space: pre-wrap">{}</pre>',
+            format_html_join("\n", "[{}] {}: {}", lines),
+        )
+    chat_log.short_description = '첨부된 대화 내역'
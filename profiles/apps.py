@@ -9,4 +9,11 @@ class ProfilesConfig(AppConfig):
     # 시그널(자동 프로필 생성)을 쓴다면 아래 코드가 필요할 수 있습니다.
     def ready(self):
         # import profiles.signals
-        pass
\ No newline at end of file
+        # 인증 캐시(JWT 유저 스냅샷) 무효화 시그널 등록
+        import profiles.auth_cache
+        # 프로필 응답 캐시 무효화 시그널 등록
+        import profiles.profile_cache
+        # 추천 후보 여부(is_matchable) 갱신 시그널 등록
+        import profiles.matchable
+        # 공유 사진 파일(내용 해시 경로) 정리 시그널 등록
+        import profiles.image_files
\ No newline at end of file
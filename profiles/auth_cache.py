@@ -0,0 +1,112 @@
+# profiles/auth_cache.py
+
+import time
+from threading import Lock
+
+from cachetools import TLRUCache, TTLCache
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api import invalidation_utils
+
+User = get_user_model()
+
+# 유저 스냅샷 유효 시간(초)
+# 저장/삭제 시 이 프로세스는 시그널로 바로, 다른 워커는 커밋 후 채널 레이어 알림(invalidation_utils)으로 무효화
+# 알림 구독이 확인되지 않은 동안에는 스냅샷을 쓰지 않으므로, TTL은 알림이 유실된 경우의 상한
+# (비활성화/비밀번호 변경이 다른 워커에서 늦게 반영될 수 있는 최대 시간이므로 짧게 유지)
+USER_CACHE_TTL = getattr(settings, 'AUTH_USER_CACHE_TTL', 60)
+USER_CACHE_SIZE = getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000)
+TOKEN_CACHE_SIZE = getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 10000)
+
+# 스냅샷에 담을 필드 (User 모델의 실제 DB 컬럼 전체)
+_FIELDS = [f.attname for f in User._meta.concrete_fields]
+
+# str(user_id) -> 필드 값 튜플 (토큰의 user_id 클레임은 문자열이므로 키를 문자열로 통일)
+_users = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+# 원본 토큰 문자열 -> 검증된 토큰 (토큰의 exp 시각까지만 보관)
+_tokens = TLRUCache(
+    maxsize=TOKEN_CACHE_SIZE,
+    ttu=lambda key, token, now: token.get('exp', now),
+    timer=time.time,
+)
+_lock = Lock()
+# 무효화가 일어날 때마다 증가 (DB 조회 도중 무효화된 값이 다시 캐시에 들어가는 것 방지)
+_generation = 0
+
+
+def get_validated_token(raw_token, validate):
+    """
+    토큰 서명/만료 검증은 토큰당 한 번만 수행하고, 만료 전까지는 캐시된 결과 재사용
+    validate: 캐시에 없을 때 호출할 검증 함수 (예: AccessToken)
+    """
+    key = raw_token.decode() if isinstance(raw_token, bytes) else raw_token
+    with _lock:
+        token = _tokens.get(key)
+    if token is None:
+        token = validate(raw_token)
+        with _lock:
+            _tokens[key] = token
+    return token
+
+
+def get_cached_user(user_id):
+    """캐시에 있는 유저 스냅샷으로 User 객체를 만들어 반환 (없으면 None, DB 조회 없음)"""
+    if not invalidation_utils.can_cache():
+        return None
+    with _lock:
+        values = _users.get(str(user_id))
+    if values is None:
+        return None
+    # 요청마다 새 인스턴스를 만들어, 요청 중에 붙는 관계 캐시(profile 등)가 공유되지 않게 함
+    return User.from_db(router.db_for_read(User), _FIELDS, values)
+
+
+def get_user(user_id):
+    """유저 조회 (캐시 우선, 없으면 DB 조회 후 스냅샷 저장). 없는 유저면 User.DoesNotExist"""
+    user = get_cached_user(user_id)
+    if user is not None:
+        return user
+
+    cacheable = invalidation_utils.can_cache()
+    generation = _generation
+    user = User.objects.get(pk=user_id)
+    values = tuple(getattr(user, name) for name in _FIELDS)
+    with _lock:
+        if cacheable and generation == _generation:
+            _users[str(user.pk)] = values
+    return user
+
+
+def invalidate_user(user_id):
+    """이 프로세스의 캐시에서 제거"""
+    global _generation
+    with _lock:
+        _generation += 1
+        _users.pop(str(user_id), None)
+
+
+def clear():
+    global _generation
+    with _lock:
+        _generation += 1
+        _users.clear()
+
+
+invalidation_utils.register("auth_user", invalidate_user, clear)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, update_fields=None, **kwargs):
+    """
+    유저 저장(비활성화/비밀번호 변경 포함)·삭제 시 스냅샷 제거 (다른 워커에는 커밋 후 알림)
+    로그인 때 last_login만 갱신하는 저장은 인증과 무관하므로 스냅샷 유지 (last_login은 TTL 안에 반영)
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_user(instance.pk)
+    invalidation_utils.publish("auth_user", str(instance.pk))
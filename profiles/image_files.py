@@ -0,0 +1,91 @@
+# profiles/image_files.py
+
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import ProfileImage
+
+# 프로필 사진 변환본을 내용 해시 기반 경로로 저장하는 위치 (api.image_utils.store_content_addressed의 prefix)
+PREFIX = "profile_images"
+# 파일 경로를 담는 필드 (같은 해시의 사진끼리 파일을 공유함)
+_FIELDS = ("image", "detail", "thumbnail")
+
+
+def referenced(names):
+    """names 중 아직 어떤 ProfileImage가 쓰고 있는 경로 집합 (쿼리 1번)"""
+    names = list(names)
+    condition = Q()
+    for field in _FIELDS:
+        condition |= Q(**{f"{field}__in": names})
+    used = set()
+    for row in ProfileImage.objects.filter(condition).values_list(*_FIELDS):
+        used.update(row)
+    return used & set(names)
+
+
+def delete_unreferenced(names):
+    """
+    어떤 ProfileImage도 쓰지 않는 파일만 저장소에서 삭제
+    Return: 삭제한 경로 목록
+    """
+    names = {name for name in names if name}
+    if not names:
+        return []
+    used = referenced(names)
+
+    deleted = []
+    for name in sorted(names - used):
+        try:
+            default_storage.delete(name)
+        except OSError as e:
+            print(f"[사진 정리] {name} 삭제 실패: {e}")
+            continue
+        deleted.append(name)
+    return deleted
+
+
+def sweep(min_age_hours=24, dry_run=False, chunk_size=500):
+    """
+    내용 해시 경로(PREFIX/ab/abcd..._이름.확장자)의 파일 중 아무 레코드도 쓰지 않는 파일 삭제
+    (시그널이 없는 일괄 삭제나 삭제 실패로 남은 파일 정리용)
+    파일은 레코드가 커밋되기 전에 저장되므로, 만든 지 min_age_hours가 지나지 않은 파일은 건드리지 않음
+    Return: (검사한 파일 수, 삭제한(dry_run이면 삭제 대상) 경로 목록)
+    """
+    cutoff = timezone.now() - timedelta(hours=min_age_hours)
+    candidates = []
+    directories, _ = default_storage.listdir(PREFIX) if default_storage.exists(PREFIX) else ([], [])
+    for directory in sorted(directories):
+        if len(directory) != 2:
+            continue
+        for filename in default_storage.listdir(f"{PREFIX}/{directory}")[1]:
+            name = f"{PREFIX}/{directory}/{filename}"
+            if default_storage.get_modified_time(name) < cutoff:
+                candidates.append(name)
+
+    removed = []
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start:start + chunk_size]
+        if dry_run:
+            used = referenced(chunk)
+            removed.extend(name for name in chunk if name not in used)
+        else:
+            removed.extend(delete_unreferenced(chunk))
+    return len(candidates), removed
+
+
+@receiver(post_delete, sender=ProfileImage)
+def delete_image_files(sender, instance, **kwargs):
+    """
+    내용 해시로 저장한 사진 레코드가 삭제되면, 커밋 후 더 이상 아무 레코드도 쓰지 않는 파일을 삭제
+    (같은 사진을 올린 다른 프로필이 남아 있으면 유지, 해시 없이 올린 이전 사진은 건드리지 않음)
+    """
+    if not instance.content_hash:
+        return
+    names = [getattr(instance, field).name for field in _FIELDS]
+    transaction.on_commit(lambda: delete_unreferenced(names))
@@ -0,0 +1,23 @@
+# profiles/management/commands/sweep_profile_images.py
+
+from django.core.management.base import BaseCommand
+
+from profiles import image_files
+
+
+class Command(BaseCommand):
+    help = "어떤 프로필 사진도 쓰지 않는 내용 해시 경로의 사진 파일 삭제 (사진 삭제 시 바로 지우지 못하고 남은 파일 정리)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-hours", type=int, default=24,
+            help="이 시간보다 최근에 만든 파일은 건드리지 않음 (저장 중인 업로드 보호)",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상만 출력")
+
+    def handle(self, *args, **options):
+        checked, removed = image_files.sweep(options["min_age_hours"], options["dry_run"])
+        for name in removed:
+            self.stdout.write(f"  {name}")
+        action = "삭제 대상" if options["dry_run"] else "삭제"
+        self.stdout.write(self.style.SUCCESS(f"파일 {checked}개 검사, {len(removed)}개 {action}"))
@@ -0,0 +1,43 @@
+# profiles/matchable.py
+
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ProfileImage, UserProfile
+
+# 추천 후보 조건에 쓰이는 필드 (이 필드가 바뀐 저장에서만 다시 계산)
+MATCHABLE_FIELDS = {'gender', 'year', 'month', 'day', 'birth_date', 'profile_text'}
+
+
+def matchable_expression():
+    """
+    추천 후보가 될 수 있는 프로필 조건 (SQL 식)
+    성별 / 생년월일 / 소개글 / 사진 1장 이상이 모두 있어야 함 (회원가입 직후 빈 프로필 제외)
+    """
+    condition = (
+        Q(gender__isnull=False) & ~Q(gender='')
+        & Q(birth_date__isnull=False)
+        & Q(profile_text__isnull=False) & ~Q(profile_text='')
+        & Q(Exists(ProfileImage.objects.filter(profile_id=OuterRef('pk'))))
+    )
+    return ExpressionWrapper(condition, output_field=BooleanField())
+
+
+def refresh_matchable(profile_ids):
+    """프로필들의 is_matchable을 UPDATE 한 번으로 다시 계산"""
+    UserProfile.objects.filter(pk__in=profile_ids).update(is_matchable=matchable_expression())
+
+
+@receiver(post_save, sender=UserProfile)
+def refresh_profile_matchable(sender, instance, created, update_fields=None, **kwargs):
+    """조건 필드가 바뀐 저장만 다시 계산 (바뀐 컬럼만 저장하므로 update_fields로 판단)"""
+    if created or update_fields is None or MATCHABLE_FIELDS & set(update_fields):
+        refresh_matchable([instance.pk])
+
+
+@receiver(post_save, sender=ProfileImage)
+@receiver(post_delete, sender=ProfileImage)
+def refresh_image_matchable(sender, instance, **kwargs):
+    """사진 저장/삭제 시 (일괄 처리는 시그널이 없으므로 sync_profile_images에서 직접 호출)"""
+    refresh_matchable([instance.profile_id])
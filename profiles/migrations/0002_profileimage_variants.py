@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:00
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_content_hash(apps, schema_editor):
+    """기존 사진 파일의 sha256 채우기 (같은 사진을 다시 올리면 재처리 없이 유지되도록)"""
+    ProfileImage = apps.get_model('profiles', 'ProfileImage')
+    for image in ProfileImage.objects.filter(content_hash='').iterator(chunk_size=500):
+        try:
+            with image.image.open('rb') as f:
+                digest = hashlib.sha256()
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+        except (FileNotFoundError, ValueError, OSError):
+            continue
+        ProfileImage.objects.filter(pk=image.pk).update(content_hash=digest.hexdigest())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='profileimage',
+            options={'ordering': ['order', 'id']},
+        ),
+        migrations.AddField(
+            model_name='profileimage',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='profileimage',
+            name='detail',
+            field=models.ImageField(blank=True, null=True, upload_to='profile_images/'),
+        ),
+        migrations.AddField(
+            model_name='profileimage',
+            name='order',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profileimage',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='profile_images/'),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
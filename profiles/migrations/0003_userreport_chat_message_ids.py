@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_profileimage_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userreport',
+            name='chat_message_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
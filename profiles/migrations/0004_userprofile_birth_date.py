@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:00
+
+from datetime import date
+
+from django.db import migrations, models
+
+
+def backfill_birth_date(apps, schema_editor):
+    """기존 프로필의 year/month/day로 birth_date 채우기 (UserProfile.save와 같은 규칙)"""
+    UserProfile = apps.get_model('profiles', 'UserProfile')
+    batch = []
+    queryset = UserProfile.objects.filter(
+        birth_date__isnull=True, year__isnull=False, month__isnull=False, day__isnull=False,
+    ).only('id', 'year', 'month', 'day')
+    for profile in queryset.iterator(chunk_size=2000):
+        try:
+            profile.birth_date = date(int(profile.year), int(profile.month), int(profile.day))
+        except (ValueError, TypeError):
+            continue
+        batch.append(profile)
+        if len(batch) >= 2000:
+            UserProfile.objects.bulk_update(batch, ['birth_date'])
+            batch = []
+    if batch:
+        UserProfile.objects.bulk_update(batch, ['birth_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_userreport_chat_message_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='birth_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['gender', 'birth_date'], name='profile_gender_birth_idx'),
+        ),
+        migrations.RunPython(backfill_birth_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:00
+
+from django.db import migrations, models
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q
+
+
+def backfill_is_matchable(apps, schema_editor):
+    """기존 프로필의 is_matchable 계산 (profiles.matchable.matchable_expression과 같은 조건)"""
+    UserProfile = apps.get_model('profiles', 'UserProfile')
+    ProfileImage = apps.get_model('profiles', 'ProfileImage')
+    condition = (
+        Q(gender__isnull=False) & ~Q(gender='')
+        & Q(birth_date__isnull=False)
+        & Q(profile_text__isnull=False) & ~Q(profile_text='')
+        & Q(Exists(ProfileImage.objects.filter(profile_id=OuterRef('pk'))))
+    )
+    UserProfile.objects.update(is_matchable=ExpressionWrapper(condition, output_field=BooleanField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_userprofile_birth_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='is_matchable',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        # 후보 검색은 항상 is_matchable 조건이 붙으므로 (성별, 생년월일) 인덱스를 후보만 담는 부분 인덱스로 대체
+        migrations.RemoveIndex(
+            model_name='userprofile',
+            name='profile_gender_birth_idx',
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(
+                condition=Q(is_matchable=True), fields=['gender', 'birth_date'],
+                name='profile_matchable_birth_idx',
+            ),
+        ),
+        migrations.RunPython(backfill_is_matchable, migrations.RunPython.noop),
+    ]
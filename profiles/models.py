@@ -1,9 +1,44 @@
 # profiles/models.py
 
+import copy
+
 from django.db import models
 from django.conf import settings
 from datetime import date
 
+def birth_date_from(year, month, day):
+    """year/month/day 정수로 만든 날짜 (하나라도 비어 있거나 없는 날짜면 None)"""
+    try:
+        if not (year and month and day):
+            return None
+        return date(int(year), int(month), int(day))
+    except (ValueError, TypeError):
+        return None
+
+
+def birth_date_range(min_age=None, max_age=None):
+    """
+    만 나이 범위(양 끝 포함)를 birth_date 조건으로 변환 - (gender, birth_date) 인덱스를 타는 범위 검색
+    Return: filter()에 넘길 조건 dict (UserProfile.age와 같은 기준)
+    """
+    today = date.today()
+
+    def years_ago(years):
+        try:
+            return today.replace(year=today.year - years)
+        except ValueError:  # 2월 29일
+            return today.replace(year=today.year - years, day=28)
+
+    conditions = {}
+    if min_age is not None:
+        # min_age살 이상: 생일이 min_age년 전 오늘 이전(당일 포함)
+        conditions['birth_date__lte'] = years_ago(min_age)
+    if max_age is not None:
+        # max_age살 이하: max_age+1살이 되는 생일이 아직 안 지남
+        conditions['birth_date__gt'] = years_ago(max_age + 1)
+    return conditions
+
+
 class UserProfile(models.Model):
     """소개팅 서비스 전용 사용자 프로필"""
 
@@ -24,6 +59,10 @@ class UserProfile(models.Model):
     minute = models.IntegerField(blank=True, null=True)
     # '시간 모름' 경우
     birth_time_unknown = models.BooleanField(default=False)
+    # 생년월일(year/month/day)을 합친 날짜 - 저장할 때 자동으로 맞춰짐 (나이 범위 검색용, 직접 수정하지 않음)
+    birth_date = models.DateField(blank=True, null=True, editable=False)
+    # 추천 후보가 될 수 있는 프로필인지 (성별/생년월일/소개글/사진이 모두 있음, profiles.matchable에서 갱신)
+    is_matchable = models.BooleanField(default=False, editable=False)
 
     # 3. 관심사
     hobbies = models.JSONField(blank=True, null=True)  # 리스트는 JSONField로 저장
@@ -76,14 +115,98 @@ class UserProfile(models.Model):
 
     # fcm_token = models.CharField(max_length=255, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # 추천 후보 검색 (성별 + 나이 범위, 후보인 프로필만 담는 부분 인덱스)
+            models.Index(
+                fields=['gender', 'birth_date'], condition=models.Q(is_matchable=True),
+                name='profile_matchable_birth_idx',
+            ),
+        ]
+
     def __str__(self):
         return f'{self.user.username}의 프로필'
 
+    # 변경 추적: DB에서 불러온 값을 기억해 두고, save() 때 바뀐 컬럼만 저장
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_saved_values()
+        return instance
+
+    def remember_saved_values(self, fields=None):
+        """현재 값을 'DB에 저장된 값'으로 기억 (JSON 필드는 제자리 수정도 알아챌 수 있도록 복사)"""
+        saved = self.__dict__.setdefault('_saved_values', {})
+        for field in self._meta.concrete_fields:
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            # 지연 로딩(only/defer)으로 아직 안 불러온 필드는 건너뜀
+            if field.attname not in self.__dict__:
+                continue
+            value = self.__dict__[field.attname]
+            saved[field.attname] = copy.deepcopy(value) if isinstance(field, models.JSONField) else value
+
+    def get_dirty_fields(self):
+        """
+        불러온 뒤 바뀐 필드 이름 목록 (updated_at 제외)
+        Return: 새로 만든 객체(DB에서 불러오지 않음)면 None
+        """
+        saved = self.__dict__.get('_saved_values')
+        if saved is None:
+            return None
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.name == 'updated_at' or field.attname not in self.__dict__:
+                continue
+            if field.attname not in saved or saved[field.attname] != self.__dict__[field.attname]:
+                dirty.append(field.name)
+        return dirty
+
+    def save(self, *args, **kwargs):
+        """
+        DB에서 불러온 프로필은 바뀐 컬럼(+ updated_at)만 UPDATE, 바뀐 게 없으면 쿼리 없이 건너뜀
+        새 프로필이거나 update_fields를 직접 넘긴 경우는 기존과 같음
+        birth_date는 year/month/day로 다시 계산 (update_fields에 year/month/day가 있으면 birth_date도 저장)
+        """
+        self.birth_date = birth_date_from(self.year, self.month, self.day)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'year', 'month', 'day'} & set(update_fields):
+            kwargs['update_fields'] = [*update_fields, 'birth_date']
+        if kwargs.get('update_fields') is None and not kwargs.get('force_insert') and not self._state.adding and not args:
+            dirty = self.get_dirty_fields()
+            if dirty is not None:
+                if not dirty:
+                    return
+                kwargs['update_fields'] = dirty + ['updated_at']
+        super().save(*args, **kwargs)
+        self.remember_saved_values(kwargs.get('update_fields'))
+
 class ProfileImage(models.Model):
     profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='images')
+    # 전체 크기 변환본 (메타데이터 제거 후 재인코딩)
     image = models.ImageField(upload_to='profile_images/')
+    # 상세 화면용 / 목록용 변환본 (이전에 올린 사진은 비어 있을 수 있음)
+    detail = models.ImageField(upload_to='profile_images/', blank=True, null=True)
+    thumbnail = models.ImageField(upload_to='profile_images/', blank=True, null=True)
+    # 원본 업로드 내용의 sha256 (같은 사진 중복 저장/재처리 방지)
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    # 사진 순서 (0번이 대표 사진)
+    order = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ['order', 'id']
+
+    @property
+    def thumbnail_url(self):
+        """목록용 썸네일 URL (없으면 원본)"""
+        return (self.thumbnail or self.image).url
+
+    @property
+    def detail_url(self):
+        """상세 화면용 URL (없으면 원본)"""
+        return (self.detail or self.image).url
+
     def __str__(self):
 
         return f"{self.profile.user.username}의 사진 {self.id}"
@@ -119,6 +242,8 @@ class UserReport(models.Model):
 
     reason = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES)
     description = models.TextField(blank=True, null=True) # 상세 내용
+    # 채팅방 신고 시 첨부한 최근 메시지 ID (대화 내용은 복사하지 않고 관리자 화면에서 조회)
+    chat_message_ids = models.JSONField(default=list, blank=True)
 
     source = models.CharField(max_length=10, choices=REPORT_SOURCE_CHOICES, default='PROFILE')
     status = models.CharField(max_length=10, choices=REPORT_STATUS_CHOICES, default='PENDING')
@@ -0,0 +1,164 @@
+# profiles/profile_cache.py
+
+from datetime import date
+from threading import Lock
+
+from cachetools import LRUCache
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.json_utils import UJSONRenderer
+from .models import ProfileImage, UserProfile
+from .serializers import ProfileSerializer
+
+# 프로세스 내 캐시에 보관할 프로필 수
+PROFILE_CACHE_SIZE = getattr(settings, 'PROFILE_CACHE_SIZE', 5000)
+# 워커끼리 공유할 캐시 (settings.CACHES의 별칭, 예: 파일/DB 캐시). None이면 프로세스 내 캐시만 사용
+PROFILE_CACHE_ALIAS = getattr(settings, 'PROFILE_CACHE_ALIAS', None)
+PROFILE_CACHE_TTL = getattr(settings, 'PROFILE_CACHE_TTL', 600)
+
+# user_id -> (버전, 렌더링된 JSON 바이트)
+# 버전이 다르면 쓰지 않으므로, 다른 워커에서 프로필이 바뀌어도 오래된 응답이 나가지 않음
+_local = LRUCache(maxsize=PROFILE_CACHE_SIZE)
+_lock = Lock()
+_renderer = UJSONRenderer()
+
+
+def _shared():
+    return caches[PROFILE_CACHE_ALIAS] if PROFILE_CACHE_ALIAS else None
+
+
+def _shared_key(user_id):
+    return f"profile:{user_id}"
+
+
+def profile_version(user_id):
+    """
+    프로필 응답 버전 (수정 시각 + 사진 수 + 마지막 사진 ID) - 인덱스를 타는 쿼리 1번
+    Return: 프로필이 없으면 None
+    """
+    row = (
+        UserProfile.objects.filter(user_id=user_id)
+        .annotate(image_count=Count('images'), last_image_id=Max('images__id'))
+        .values_list('updated_at', 'image_count', 'last_image_id')[:1]
+    )
+    return row[0] if row else None
+
+
+def request_profile_version(request, user_id):
+    """같은 요청 안에서는(ETag 확인 → 뷰) 버전 조회를 한 번만 함"""
+    versions = getattr(request, '_profile_versions', None)
+    if versions is None:
+        versions = request._profile_versions = {}
+    if user_id not in versions:
+        versions[user_id] = profile_version(user_id)
+    return versions[user_id]
+
+
+def _version_of(profile):
+    """이미 불러온 프로필(사진 prefetch)의 버전 - profile_version과 같은 값"""
+    images = profile.images.all()
+    return (profile.updated_at, len(images), max((img.id for img in images), default=None))
+
+
+def _entry_version(version):
+    # 나이가 응답에 들어가므로 날짜가 바뀌면 다시 렌더링
+    return (*version, date.today().isoformat())
+
+
+def can_serve(request):
+    """캐시된 바이트를 그대로 보낼 수 있는 요청인지 (들여쓰기 없는 JSON 응답)"""
+    renderer = request.accepted_renderer
+    return isinstance(renderer, UJSONRenderer) and renderer.get_indent(request.accepted_media_type, {}) is None
+
+
+def get(user_id, version):
+    """
+    캐시된 프로필 JSON (프로세스 내 캐시 → 공유 캐시 순서)
+    version: profile_version 결과. 버전이 다르면 None
+    """
+    key = _entry_version(version)
+    with _lock:
+        entry = _local.get(user_id)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+
+    shared = _shared()
+    if shared is None:
+        return None
+    entry = shared.get(_shared_key(user_id))
+    if entry is None or entry[0] != key:
+        return None
+    with _lock:
+        _local[user_id] = entry
+    return entry[1]
+
+
+def _entry(profile):
+    return (_entry_version(_version_of(profile)), _renderer.render(ProfileSerializer(profile).data))
+
+
+def render(profile):
+    """ProfileSerializer 결과를 JSON 바이트로 렌더링해 캐시에 저장 (사진은 prefetch된 상태여야 함)"""
+    entry = _entry(profile)
+    with _lock:
+        _local[profile.user_id] = entry
+    shared = _shared()
+    if shared is not None:
+        shared.set(_shared_key(profile.user_id), entry, PROFILE_CACHE_TTL)
+    return entry[1]
+
+
+def load(user_id):
+    """DB에서 프로필을 읽어 렌더링 (쿼리 2번). 프로필이 없으면 None"""
+    profile = UserProfile.objects.filter(user_id=user_id).prefetch_related('images').first()
+    return render(profile) if profile is not None else None
+
+
+def warm(profiles):
+    """
+    후보 목록(추천 등)의 프로필을 한꺼번에 렌더링해 캐시에 채움 - 추가 쿼리 없음
+    profiles: 사진을 prefetch한 UserProfile 목록. 최신 버전이 이미 있으면 건너뜀
+    """
+    entries = {}
+    for profile in profiles:
+        key = _entry_version(_version_of(profile))
+        with _lock:
+            entry = _local.get(profile.user_id)
+        if entry is not None and entry[0] == key:
+            continue
+        entries[profile.user_id] = _entry(profile)
+
+    if not entries:
+        return
+    with _lock:
+        _local.update(entries)
+    shared = _shared()
+    if shared is not None:
+        shared.set_many({_shared_key(user_id): entry for user_id, entry in entries.items()}, PROFILE_CACHE_TTL)
+
+
+def invalidate(user_id):
+    with _lock:
+        _local.pop(user_id, None)
+    shared = _shared()
+    if shared is not None:
+        shared.delete(_shared_key(user_id))
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_cache(sender, instance, **kwargs):
+    invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=ProfileImage)
+@receiver(post_delete, sender=ProfileImage)
+def invalidate_profile_image_cache(sender, instance, **kwargs):
+    """사진 저장/삭제 시 (일괄 처리는 시그널이 없으므로 sync_profile_images에서 직접 무효화)"""
+    user_id = UserProfile.objects.filter(pk=instance.profile_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        invalidate(user_id)
@@ -13,7 +13,7 @@ from rest_framework.validators import UniqueValidator
 class ProfileImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProfileImage
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'detail', 'thumbnail']
 
 # 2. 사용자 프로필 관리용 시리얼라이저
 class ProfileSerializer(serializers.ModelSerializer):
@@ -21,7 +21,7 @@ class ProfileSerializer(serializers.ModelSerializer):
     [GET, POST] 사용자 프로필 전체를 조회하거나 생성(AI 생성)할 때 사용함
     """
     images = ProfileImageSerializer(many=True, read_only=True)
-    user_id = serializers.IntegerField(source='user.id', read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
     age = serializers.ReadOnlyField()
 
     class Meta:
@@ -176,6 +176,7 @@ class SimpleProfileSerializer(serializers.ModelSerializer):
         fields = ['user_id', 'nickname', 'image', 'age', 'location_city', 'location_district', 'mbti']
 
     def get_image(self, obj):
-        if obj.images.exists():
-            return obj.images.first().image.url
-        return None
\ No newline at end of file
+        # 목록에서는 작은 썸네일 사용 (이전에 올린 사진은 원본)
+        # images를 prefetch_related한 목록에서는 추가 쿼리 없이 첫 사진 사용
+        images = obj.images.all()
+        return images[0].thumbnail_url if images else None
\ No newline at end of file
@@ -14,7 +14,16 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def save_user_profile(sender, instance, **kwargs):
-    """유저 모델이 저장될 때, 프로필 정보도 함께 저장"""
-    if hasattr(instance, "profile"):
-        instance.profile.save()
+def save_user_profile(sender, instance, update_fields=None, **kwargs):
+    """
+    유저 모델이 저장될 때, 함께 불러와 수정한 프로필이 있으면 바뀐 컬럼만 저장
+    - 불러온 적 없는 프로필은 바뀐 것도 없으므로 조회하지 않음 (hasattr는 매번 SELECT를 일으킴)
+    - 로그인 시 last_login만 갱신하는 저장은 프로필과 무관하므로 건너뜀
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    if not sender.profile.is_cached(instance):
+        return
+    profile = instance.profile
+    if profile is not None:
+        profile.save()
@@ -1,2 +1,335 @@
 # profiles/tests.py
-from django.test import TestCase
+import tempfile
+import time
+from datetime import date
+from unittest.mock import patch
+
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import image_utils, invalidation_utils
+from api.test_utils import Fixture, QueryBudgetTestCase, User
+from . import auth_cache, image_files, profile_cache
+from .models import ProfileImage, UserProfile
+from .serializers import ProfileSerializer
+
+
+class ProfileQueryBudgetTests(QueryBudgetTestCase):
+    """프로필 API 쿼리 수"""
+
+    query_budgets = {
+        'my_profile': 1,  # 버전 확인 1번 (ETag와 응답 캐시가 같이 사용)
+        'user_profile_detail': 1,
+        'user-status-check': 0,
+        'report_chat_user': 4,
+        'report_profile_user': 2,
+    }
+
+    def test_my_profile(self):
+        self.assertQueryBudget('my_profile', lambda f: self.client.get(reverse('my_profile')))
+
+    def test_profile_detail(self):
+        self.assertQueryBudget(
+            'user_profile_detail',
+            lambda f: self.client.get(reverse('user_profile_detail', args=[f.others[0].id])),
+        )
+
+    def test_my_profile_not_modified(self):
+        get = lambda etag: self.client.get(reverse('my_profile'), HTTP_IF_NONE_MATCH=etag or "")
+        etag = self.assertNotModified(get)
+
+        # 프로필을 고치면 ETag가 바뀜
+        self.client.patch(reverse('my_profile'), {'job': '디자이너'}, format='json')
+        self.assertEqual(get(etag).status_code, 200)
+
+    def test_profile_detail_not_modified(self):
+        def get(etag):
+            url = reverse('user_profile_detail', args=[self.fixture.others[0].id])
+            return self.client.get(url, HTTP_IF_NONE_MATCH=etag or "")
+        self.assertNotModified(get)
+
+    def test_status_check(self):
+        self.assertQueryBudget('user-status-check', lambda f: self.client.get(reverse('user-status-check')))
+
+    def test_report_chat_user(self):
+        self.assertQueryBudget(
+            'report_chat_user',
+            lambda f: self.client.post(reverse('report_chat_user', args=[f.others[0].id]), {'reason': 'SPAM'}),
+        )
+
+    def test_report_profile_user(self):
+        self.assertQueryBudget(
+            'report_profile_user',
+            lambda f: self.client.post(reverse('report_profile_user', args=[f.others[0].id]), {'reason': 'SPAM'}),
+        )
+
+
+class ProfileDirtyFieldTests(TestCase):
+    """프로필 변경 추적 (바뀐 컬럼만 저장)"""
+
+    def setUp(self):
+        self.user = Fixture().me
+        self.profile = UserProfile.objects.get(user=self.user)
+
+    def test_save_without_changes_skips_query(self):
+        updated_at = self.profile.updated_at
+        with self.assertNumQueries(0):
+            self.profile.save()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.updated_at, updated_at)
+
+    def test_save_updates_only_changed_columns(self):
+        self.profile.job = "디자이너"
+        self.profile.hobbies.append("요리")  # JSON 필드 제자리 수정도 감지
+        with CaptureQueriesContext(connection) as captured:
+            self.profile.save()
+        (sql,) = [query["sql"] for query in captured.captured_queries]
+        self.assertIn('"job"', sql)
+        self.assertIn('"hobbies"', sql)
+        self.assertIn('"updated_at"', sql)
+        self.assertNotIn('"nickname"', sql)
+
+        with self.assertNumQueries(0):
+            self.profile.save()
+        self.assertEqual(UserProfile.objects.get(pk=self.profile.pk).hobbies[-1], "요리")
+
+    def test_last_login_update_keeps_auth_cache(self):
+        auth_cache.get_user(self.user.pk)
+        self.user.save(update_fields=["last_login"])
+        self.assertIsNotNone(auth_cache.get_cached_user(self.user.pk))
+        self.user.save()
+        self.assertIsNone(auth_cache.get_cached_user(self.user.pk))
+
+    def test_birth_date_follows_year_month_day(self):
+        self.profile.year, self.profile.month, self.profile.day = 1995, 2, 28
+        self.profile.save()
+        self.assertEqual(UserProfile.objects.get(pk=self.profile.pk).birth_date, date(1995, 2, 28))
+
+        self.profile.day = 30  # 없는 날짜
+        self.profile.save(update_fields=['day'])
+        self.assertIsNone(UserProfile.objects.get(pk=self.profile.pk).birth_date)
+
+    def test_is_matchable_follows_profile_and_images(self):
+        self.assertTrue(UserProfile.objects.get(pk=self.profile.pk).is_matchable)
+
+        self.profile.profile_text = ""
+        self.profile.save()
+        self.assertFalse(UserProfile.objects.get(pk=self.profile.pk).is_matchable)
+
+        self.profile.profile_text = "다시 채운 소개글"
+        self.profile.save()
+        self.assertTrue(UserProfile.objects.get(pk=self.profile.pk).is_matchable)
+
+        for image in self.profile.images.all():
+            image.delete()
+        self.assertFalse(UserProfile.objects.get(pk=self.profile.pk).is_matchable)
+
+    def test_unrelated_change_skips_matchable_refresh(self):
+        self.profile.job = "디자이너"
+        with self.assertNumQueries(1):
+            self.profile.save()
+
+
+class ProfileCacheTests(TestCase):
+    """프로필 응답 캐시 (렌더링된 JSON 재사용 / 변경 시 무효화)"""
+
+    def setUp(self):
+        self.fixture = Fixture().grow(2)
+        self.other = self.fixture.others[0]
+        self.url = reverse('user_profile_detail', args=[self.other.id])
+        profile_cache.invalidate(self.other.id)
+
+    def expected(self):
+        profile = UserProfile.objects.get(user=self.other)
+        return ProfileSerializer(profile).data
+
+    def test_cached_body_matches_serializer(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second["Content-Type"], "application/json")
+        self.assertEqual(second.json(), self.expected())
+
+    def test_profile_and_image_changes_invalidate(self):
+        self.client.get(self.url)
+
+        profile = UserProfile.objects.get(user=self.other)
+        profile.nickname = "바뀐닉네임"
+        profile.save()
+        self.assertEqual(self.client.get(self.url).json()["nickname"], "바뀐닉네임")
+
+        ProfileImage.objects.filter(profile=profile).first().delete()
+        self.assertEqual(len(self.client.get(self.url).json()["images"]), 1)
+
+    def test_stale_entry_is_not_served(self):
+        """다른 워커에서 바뀐 경우(시그널 없음)도 버전이 다르면 다시 렌더링"""
+        self.client.get(self.url)
+        UserProfile.objects.filter(user=self.other).update(job="디자이너", updated_at=timezone.now())
+        self.assertEqual(self.client.get(self.url).json()["job"], "디자이너")
+
+    def test_warm(self):
+        profiles = list(UserProfile.objects.filter(user__in=self.fixture.others).prefetch_related('images'))
+        with self.assertNumQueries(0):
+            profile_cache.warm(profiles)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json(), self.expected())
+
+
+class ProfileImageFileTests(TestCase):
+    """내용 해시로 공유하는 사진 파일 정리 (마지막으로 쓰던 레코드가 삭제될 때 / 정리 명령)"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.fixture = Fixture().grow(2)
+        self.profiles = list(UserProfile.objects.filter(user__in=self.fixture.others))
+        self.names = self.store("a" * 64)
+
+    def store(self, digest):
+        results = {name: (b"img-" + name.encode(), "jpg") for name in ("full", "detail", "thumbnail")}
+        return image_utils.store_content_addressed(results, digest, image_files.PREFIX)
+
+    def attach(self, profile, digest, names):
+        return ProfileImage.objects.create(
+            profile=profile, content_hash=digest, order=9,
+            image=names["full"], detail=names["detail"], thumbnail=names["thumbnail"],
+        )
+
+    def exists(self, names):
+        return [default_storage.exists(name) for name in names.values()]
+
+    def test_shared_files_deleted_with_last_reference(self):
+        first = self.attach(self.profiles[0], "a" * 64, self.names)
+        second = self.attach(self.profiles[1], "a" * 64, self.names)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.exists(self.names), [True, True, True])  # 다른 프로필이 아직 사용 중
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.profile.images.filter(content_hash="a" * 64).delete()
+        self.assertEqual(self.exists(self.names), [False, False, False])
+
+    def test_images_without_hash_keep_files(self):
+        image = self.attach(self.profiles[0], "", self.names)
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+        self.assertEqual(self.exists(self.names), [True, True, True])
+
+    def test_sweep_removes_only_unreferenced(self):
+        self.attach(self.profiles[0], "a" * 64, self.names)
+        orphan = self.store("b" * 64)
+
+        # 방금 만든 파일은 저장 중인 업로드일 수 있으므로 건드리지 않음
+        self.assertEqual(image_files.sweep(min_age_hours=1)[1], [])
+
+        checked, removed = image_files.sweep(min_age_hours=0, dry_run=True)
+        self.assertEqual((checked, sorted(removed)), (6, sorted(orphan.values())))
+        self.assertEqual(self.exists(orphan), [True, True, True])
+
+        image_files.sweep(min_age_hours=0)
+        self.assertEqual(self.exists(orphan), [False, False, False])
+        self.assertEqual(self.exists(self.names), [True, True, True])
+
+
+class AuthCacheTests(TestCase):
+    """JWT 검증 / 유저 조회 캐시와 무효화 (같은 프로세스는 시그널 / 다른 워커는 무효화 알림)"""
+
+    def setUp(self):
+        auth_cache._users.clear()
+        auth_cache._tokens.clear()
+        # 무효화 알림을 구독 중인 워커로 가정
+        listening = patch('profiles.auth_cache.invalidation_utils.can_cache', return_value=True)
+        listening.start()
+        self.addCleanup(listening.stop)
+        self.user = User.objects.create_user(username='auth_cache_user', password='pw')
+
+    def test_user_snapshot_reused_without_queries(self):
+        first = auth_cache.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            second = auth_cache.get_user(str(self.user.pk))
+        self.assertEqual(second.pk, self.user.pk)
+        self.assertIsNot(first, second)  # 요청마다 새 인스턴스
+
+    def test_save_and_delete_invalidate(self):
+        auth_cache.get_user(self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(auth_cache.get_user(self.user.pk).is_active)
+
+        self.user.delete()
+        self.assertIsNone(auth_cache.get_cached_user(self.user.pk))
+        with self.assertRaises(User.DoesNotExist):
+            auth_cache.get_user(self.user.pk)
+
+    def test_save_broadcasts_invalidation(self):
+        with patch('profiles.auth_cache.invalidation_utils.publish') as publish:
+            self.user.set_password('new-pw')
+            self.user.save()
+            self.user.save(update_fields=['last_login'])  # 로그인 시각만 바뀐 저장은 알리지 않음
+        publish.assert_called_once_with("auth_user", str(self.user.pk))
+
+    def test_deactivated_elsewhere_rejected_after_broadcast(self):
+        auth_cache.get_user(self.user.pk)
+        # 다른 워커에서 비활성화 (이 프로세스의 시그널은 일어나지 않고, 알림만 도착)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertTrue(auth_cache.get_user(self.user.pk).is_active)  # 캐시는 아직 예전 값
+        invalidation_utils.dispatch({"name": "auth_user", "payload": str(self.user.pk)})
+        self.assertFalse(auth_cache.get_user(self.user.pk).is_active)
+
+    def test_not_cached_until_listening(self):
+        with patch('profiles.auth_cache.invalidation_utils.can_cache', return_value=False):
+            auth_cache.get_user(self.user.pk)
+            self.assertIsNone(auth_cache.get_cached_user(self.user.pk))
+            with self.assertNumQueries(1):
+                auth_cache.get_user(self.user.pk)
+
+    def test_invalidation_during_lookup_is_not_cached(self):
+        real_get = User.objects.get
+
+        def get_then_invalidate(**kwargs):
+            user = real_get(**kwargs)
+            auth_cache.invalidate_user(user.pk)  # 조회 도중 다른 요청이 유저를 수정한 상황
+            return user
+
+        with patch.object(User.objects, 'get', side_effect=get_then_invalidate):
+            auth_cache.get_user(self.user.pk)
+        self.assertIsNone(auth_cache.get_cached_user(self.user.pk))
+
+    def test_token_validated_once_until_expiry(self):
+        calls = []
+
+        def validate(raw):
+            calls.append(raw)
+            return {'user_id': str(self.user.pk), 'exp': exp}
+
+        exp = time.time() + 60
+        auth_cache.get_validated_token(b'live-token', validate)
+        auth_cache.get_validated_token('live-token', validate)
+        self.assertEqual(len(calls), 1)
+
+        exp = time.time() - 1
+        auth_cache.get_validated_token('expired-token', validate)
+        auth_cache.get_validated_token('expired-token', validate)
+        self.assertEqual(len(calls), 3)
+
+    def test_deactivated_user_rejected_on_next_request(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertNotEqual(client.get(reverse('my_profile')).status_code, 401)
+
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertEqual(client.get(reverse('my_profile')).status_code, 401)
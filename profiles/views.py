@@ -1,10 +1,14 @@
 # profiles/views.py
 import json
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from datetime import date, timedelta
 
 import openai
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
@@ -16,8 +20,12 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from api import image_utils, metrics
+from api.etag_utils import conditional_get, make_etag
 from api.geo_utils import get_lat_lon
 from api.saju_calculator import calculate_saju
+from . import profile_cache
+from .matchable import refresh_matchable
 from .models import ProfileImage, UserProfile, UserReport
 from .serializers import (
     MyTokenObtainPairSerializer,
@@ -60,6 +68,95 @@ class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
 
 
+def sync_profile_images(profile, uploads):
+    """
+    업로드된 사진 목록으로 프로필 사진을 맞춤 (바뀐 사진만 추가/삭제)
+    uploads: 내용 해시 -> 원본 바이트 (순서 = 사진 순서, 중복 제거된 상태)
+    - 이미 있는 사진은 그대로 두고 순서만 갱신
+    - 새 사진은 같은 내용을 이전에 처리한 적이 있으면 파일을 재사용, 없으면 프로세스 풀에서 변환
+    """
+    existing = {img.content_hash: img for img in profile.images.all() if img.content_hash}
+
+    # 1. 새로 처리해야 할 사진 (다른 프로필이나 이전에 올린 같은 사진은 파일 재사용)
+    new_hashes = [digest for digest in uploads if digest not in existing]
+    known = {
+        img.content_hash: img
+        for img in ProfileImage.objects.filter(content_hash__in=new_hashes, thumbnail__gt="")
+    }
+    to_process = [digest for digest in new_hashes if digest not in known]
+    results = image_utils.process_many(
+        [uploads[digest] for digest in to_process], image_utils.PROFILE_IMAGE_VARIANTS
+    )
+    stored = {
+        digest: image_utils.store_content_addressed(result, digest, "profile_images")
+        for digest, result in zip(to_process, results)
+    }
+
+    # 2. DB 반영 (삭제 / 순서 변경 / 추가)
+    created, reordered = [], []
+    for order, digest in enumerate(uploads):
+        if digest in existing:
+            img = existing[digest]
+            if img.order != order:
+                img.order = order
+                reordered.append(img)
+        elif digest in known:
+            src = known[digest]
+            created.append(ProfileImage(
+                profile=profile, content_hash=digest, order=order,
+                image=src.image.name, detail=src.detail.name, thumbnail=src.thumbnail.name,
+            ))
+        else:
+            names = stored[digest]
+            created.append(ProfileImage(
+                profile=profile, content_hash=digest, order=order,
+                image=names["full"], detail=names["detail"], thumbnail=names["thumbnail"],
+            ))
+
+    with transaction.atomic():
+        deleted, _ = profile.images.exclude(content_hash__in=list(uploads)).delete()
+        if reordered:
+            ProfileImage.objects.bulk_update(reordered, ["order"])
+        if created:
+            ProfileImage.objects.bulk_create(created)
+        # 사진이 바뀌면 프로필 수정 시각도 갱신 (목록 ETag가 상대 프로필 수정 시각으로 판단하므로)
+        if deleted or reordered or created:
+            profile.updated_at = timezone.now()
+            UserProfile.objects.filter(pk=profile.pk).update(updated_at=profile.updated_at)
+            profile.remember_saved_values(['updated_at'])
+            # 일괄 처리(bulk_create/update, update)는 시그널이 없으므로 직접 무효화 / 후보 여부 갱신
+            profile_cache.invalidate(profile.user_id)
+            refresh_matchable([profile.pk])
+
+
+def my_profile_etag(request):
+    version = profile_cache.request_profile_version(request, request.user.id)
+    return make_etag(request, *version, daily=True) if version else None
+
+
+def profile_detail_etag(request, user_id):
+    version = profile_cache.request_profile_version(request, user_id)
+    return make_etag(request, user_id, *version, daily=True) if version else None
+
+
+def cached_profile_response(request, user_id):
+    """
+    프로필 조회 응답 (렌더링된 JSON을 캐시에서 꺼내 그대로 전송, 캐시에 있으면 버전 확인 쿼리 1번)
+    Return: 프로필이 없으면 None
+    """
+    version = profile_cache.request_profile_version(request, user_id)
+    if version is None:
+        return None
+    if not profile_cache.can_serve(request):
+        # 브라우저블 API / 들여쓰기 JSON은 캐시 없이 직렬화
+        profile = UserProfile.objects.prefetch_related('images').get(user_id=user_id)
+        return Response(ProfileSerializer(profile).data, status=status.HTTP_200_OK)
+    body = profile_cache.get(user_id, version) or profile_cache.load(user_id)
+    if body is None:
+        return None
+    return HttpResponse(body, content_type=request.accepted_renderer.media_type)
+
+
 class ProfileView(APIView):
     """
     프로필 조회 / 저장(이미지+AI 소개글 생성) / 소개글 수정
@@ -67,16 +164,15 @@ class ProfileView(APIView):
 
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(my_profile_etag)
     def get(self, request):
-        try:
-            profile = request.user.profile
-        except UserProfile.DoesNotExist:
+        response = cached_profile_response(request, request.user.id)
+        if response is None:
             return Response(
                 {"error": "프로필이 존재하지 않습니다."},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        serializer = ProfileSerializer(profile)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return response
 
     def post(self, request):
         profile, _ = UserProfile.objects.get_or_create(user=request.user)
@@ -155,9 +251,23 @@ class ProfileView(APIView):
                         status=status.HTTP_400_BAD_REQUEST,
                     )
 
-                profile.images.all().delete()
-                for img in images:
-                    ProfileImage.objects.create(profile=profile, image=img)
+                # 사진마다 내용 해시 계산 (같은 사진을 여러 번 올린 경우 하나만 사용)
+                try:
+                    uploads = {}
+                    for img in images:
+                        raw = image_utils.read_upload(img)
+                        uploads.setdefault(image_utils.content_hash(raw), raw)
+                    if len(uploads) < 2:
+                        raise image_utils.ImageRejected("서로 다른 프로필 사진을 최소 2장 이상 등록해야 합니다.")
+
+                    sync_profile_images(profile, uploads)
+                except image_utils.ImageRejected as e:
+                    return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                except (FutureTimeoutError, BrokenProcessPool):
+                    return Response(
+                        {"error": "이미지 처리가 지연되고 있습니다. 잠시 후 다시 시도해주세요."},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    )
             else:
                 return Response(
                     {"error": "프로필 사진은 필수입니다."},
@@ -214,15 +324,16 @@ class ProfileView(APIView):
         prompt = "\n".join(prompt_lines)
 
         try:
-            response = openai.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a dating profile expert"},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.8,
-                max_tokens=300,
-            )
+            with metrics.span("openai", "profile_text"):
+                response = openai.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": "You are a dating profile expert"},
+                        {"role": "user", "content": prompt},
+                    ],
+                    temperature=0.8,
+                    max_tokens=300,
+                )
             profile.profile_text = response.choices[0].message.content.strip().strip(
                 '"'
             )
@@ -419,15 +530,16 @@ class ProfileRegenerateView(APIView):
         prompt = "\n".join(prompt_lines)
 
         try:
-            response = openai.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a dating profile expert"},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.8,
-                max_tokens=300,
-            )
+            with metrics.span("openai", "profile_regenerate"):
+                response = openai.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": "You are a dating profile expert"},
+                        {"role": "user", "content": prompt},
+                    ],
+                    temperature=0.8,
+                    max_tokens=300,
+                )
             profile.profile_text = response.choices[0].message.content.strip().strip(
                 '"'
             )
@@ -457,13 +569,12 @@ class UserProfileDetailView(APIView):
 
     permission_classes = [permissions.AllowAny]
 
+    @conditional_get(profile_detail_etag)
     def get(self, request, user_id):
-        profile = get_object_or_404(UserProfile, user__id=user_id)
-        serializer = ProfileSerializer(profile)
-        return Response(
-            serializer.data,
-            status=status.HTTP_200_OK
-        )
+        response = cached_profile_response(request, user_id)
+        if response is None:
+            raise Http404
+        return response
 
 
 @api_view(["POST"])
@@ -625,18 +736,19 @@ class MatchSummaryView(APIView):
         )
 
         try:
-            completion = openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You write concise Korean dating match blurbs that compare two people.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.8,
-                max_tokens=220,
-            )
+            with metrics.span("openai", "match_summary"):
+                completion = openai.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You write concise Korean dating match blurbs that compare two people.",
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                    temperature=0.8,
+                    max_tokens=220,
+                )
             content = completion.choices[0].message.content.strip().strip('"')
         except Exception as e:
             return Response(
@@ -688,7 +800,7 @@ def report_chat_user(request, target_id):
     """
     [POST] 채팅방에서 사용자 신고하기
     - 채팅방 이름(room_name)을 통해 상대방을 자동 식별
-    - 해당 채팅방의 최근 대화 내역(20개)을 자동으로 첨부하여 저장
+    - 해당 채팅방의 최근 대화 내역(20개)을 메시지 ID로 첨부하여 저장
     """
     reporter = request.user
 
@@ -710,39 +822,23 @@ def report_chat_user(request, target_id):
     # 2. 채팅방 찾기
     room = ChatRoom.objects.filter(participants=reporter).filter(participants=target_user).first()
 
-    # 3. 채팅 로그 수집
-    chat_log = ""
-    try:
-        # 최근 메시지 20개를 시간 역순으로 가져와서 다시 시간순 정렬
-        recent_messages = Message.objects.filter(room=room).order_by('-timestamp')[:20]
-        recent_messages = reversed(recent_messages)
-
-        # 로그 문자열 생성
-        log_lines = []
-        for msg in recent_messages:
-            sender_name = msg.sender.username
-            time_str = msg.timestamp.strftime("%Y-%m-%d %H:%M")
-            log_lines.append(f"[{time_str}] {sender_name}: {msg.content}")
-
-        if log_lines:
-            chat_log = "\n".join(log_lines)
-        else:
-            chat_log = "(대화 내역 없음)"
-
-    except:
-        # 방이 없어도 신고는 가능하지만 로그 없음을 명시함
-        chat_log = "(채팅방이 존재하지 않거나 대화 내역이 없습니다."
+    # 3. 최근 메시지 20개의 ID만 첨부 (대화 내용은 관리자 화면에서 조회)
+    chat_message_ids = []
+    if room is not None:
+        chat_message_ids = list(
+            Message.objects.filter(room=room).order_by('-id').values_list('id', flat=True)[:20]
+        )
+        chat_message_ids.reverse()
 
     # 4. 데이터 검증 및 저장
     serializer = UserReportSerializer(data=request.data)
     if serializer.is_valid():
-        final_description = f"=== [시스템 자동 첨부: 최근 대화 로그] ===\n{chat_log}"
-
         UserReport.objects.create(
             reporter=reporter,
             reported_user=target_user,
             reason=serializer.validated_data['reason'],
-            description=final_description,
+            description="(채팅방에서의 신고)",
+            chat_message_ids=chat_message_ids,
             source='CHAT'
         )
         return Response(